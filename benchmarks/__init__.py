@@ -0,0 +1 @@
+"""Benchmark the parse, extract, aggregate and report stages using synthetic RimWorld saves"""
@@ -0,0 +1,91 @@
+"""Run the benchmarks or compare two benchmark records from the command line
+
+Usage:
+python -m benchmarks run --output benchmarks/results/current.json
+python -m benchmarks compare benchmarks/results/baseline.json benchmarks/results/current.json
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+
+from benchmarks import harness
+from benchmarks import synthetic
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    """Return the parser of the command line arguments
+
+    Parameters:
+    None
+
+    Returns:
+    argparse.ArgumentParser: The parser of the command line arguments
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Benchmark a synthetic series of saves")
+    run_parser.add_argument("--output", required=True, help="The JSON file to write results to")
+    run_parser.add_argument("--preset", choices=sorted(synthetic.SCALE_PRESETS), default="demo",
+                            help="The scale preset of the synthetic saves")
+    run_parser.add_argument("--plant-count", type=int, help="Override the preset's plant count")
+    run_parser.add_argument("--pawn-count", type=int, help="Override the preset's pawn count")
+    run_parser.add_argument("--tale-count", type=int, help="Override the preset's tale count")
+    run_parser.add_argument("--series-length", type=int, default=3)
+    run_parser.add_argument("--rounds", type=int, default=3)
+    compare_parser = subparsers.add_parser("compare", help="Compare two benchmark records")
+    compare_parser.add_argument("baseline", help="The JSON file of the baseline results")
+    compare_parser.add_argument("current", help="The JSON file of the current results")
+    compare_parser.add_argument("--threshold", type=float, default=1.1,
+                                help="The allowed ratio of current to baseline time")
+
+    return parser
+
+
+def main(arguments: list) -> int:
+    """Run the command given by the command line arguments
+
+    Parameters:
+    arguments (list): The command line arguments, excluding the program name
+
+    Returns:
+    int: The exit status, which is 1 if the compare command detected a regression
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    options = get_argument_parser().parse_args(arguments)
+
+    if options.command == "compare":
+        regressions = harness.compare_results(
+            baseline=harness.read_results(options.baseline),
+            current=harness.read_results(options.current),
+            threshold=options.threshold
+        )
+
+        for stage_name, baseline_time, current_time, ratio in regressions:
+            logging.error("Regression in %s: %.6fs -> %.6fs (x%.2f)", stage_name, baseline_time,
+                          current_time, ratio)
+
+        return int(len(regressions) > 0)
+
+    scale = dict(synthetic.SCALE_PRESETS[options.preset])
+    overrides = {
+        "plant_count": options.plant_count,
+        "pawn_count": options.pawn_count,
+        "tale_count": options.tale_count,
+    }
+    scale.update({name: count for name, count in overrides.items() if count is not None})
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        record = harness.run_benchmarks(work_dir=work_dir, scale=scale,
+                                        series_length=options.series_length,
+                                        rounds=options.rounds)
+
+    harness.write_results(record=record, output_path=options.output)
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main(sys.argv[1:]))
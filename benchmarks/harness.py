@@ -0,0 +1,246 @@
+"""Time each stage of loading, aggregating and reporting on saves and record the results as JSON"""
+
+import gzip
+import json
+import logging
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import synthetic
+from save import DATASET_NAMES
+from save import Save
+from save import SaveSeries
+from save.prescan import get_reduced_document
+import view.summary_report
+
+SERIES_REGEX_PATTERN = r"benchmark\s\d{1,10}"
+
+
+def time_callable(function: callable, rounds: int) -> dict:
+    """Call a function repeatedly and return statistics about the wall time of each call
+
+    Parameters:
+    function (callable): The function to call without arguments
+    rounds (int): The number of times to call the function
+
+    Returns:
+    dict: The number of rounds and the minimum, median and mean wall time in seconds
+    """
+    timings = []
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+    }
+
+
+def time_import(module_name: str) -> dict:
+    """Return statistics about the time taken to import a module in a fresh interpreter
+
+    Parameters:
+    module_name (str): The name of the module to import
+
+    Returns:
+    dict: The cumulative import time in seconds reported by python -X importtime
+    """
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module_name}"]
+    result = subprocess.run(command, capture_output=True, check=True, text=True)
+    import_time_line = [
+        line for line in result.stderr.splitlines() if line.rstrip().endswith(f"| {module_name}")
+    ][-1]
+
+    import_time = int(import_time_line.split("|")[1]) / 1000000
+
+    return {"rounds": 1, "min": import_time, "median": import_time, "mean": import_time}
+
+
+def benchmark_save_stages(save_path: pathlib.Path, rounds: int) -> dict:
+    """Time the decompress, parse, extract and transform stages of creating a Save object
+
+    Parameters:
+    save_path (pathlib.Path): The path of the gzip compressed save file to load
+    rounds (int): The number of times to run each stage
+
+    Returns:
+    dict: The timing statistics of each stage, keyed by the stage name
+    """
+    with open(save_path, "rb") as save_file:
+        compressed_bytes = save_file.read()
+
+    save_bytes = gzip.decompress(compressed_bytes)
+    save = Save(path_to_save_file=save_path)
+    extractors = {
+        "mod": save.extract_mod_list,
+        "pawn": save.extract_pawn_data,
+        "plant": save.extract_plant_data,
+        "weather": save.extract_weather_data,
+    }
+    results = {
+        "save_decompress": time_callable(lambda: gzip.decompress(compressed_bytes), rounds),
+        "save_prescan": time_callable(lambda: get_reduced_document(save_bytes, DATASET_NAMES),
+                                      rounds),
+        "save_parse": time_callable(lambda: save.parser.parse(save_bytes), rounds),
+    }
+
+    # The extractors search the whole tree, which the save only keeps while it is open
+    with save.open_root():
+        for dataset_name, extractor in extractors.items():
+            results[f"save_extract_{dataset_name}"] = time_callable(extractor, rounds)
+
+        dataset_columns = {
+            dataset_name: extractor() for dataset_name, extractor in extractors.items()
+        }
+
+    def generate_dataframes() -> None:
+        save.data.dataset_columns = dataset_columns
+        save.generate_dataframes()
+
+    results["save_generate_dataframes"] = time_callable(generate_dataframes, rounds)
+    results["save_transform_pawn"] = time_callable(save.transform_pawn_dataframe, rounds)
+    results["save_transform_plant"] = time_callable(save.transform_plant_dataframe, rounds)
+    results["save_total"] = time_callable(lambda: Save(path_to_save_file=save_path), rounds)
+
+    return results
+
+
+def benchmark_series(save_dir_path: pathlib.Path, rounds: int) -> dict:
+    """Time loading a series of saves, aggregating their datasets and generating the report
+
+    Parameters:
+    save_dir_path (pathlib.Path): The directory containing the series of save files
+    rounds (int): The number of times to run each stage
+
+    Returns:
+    dict: The timing statistics of each stage, keyed by the stage name
+    """
+    def load_series() -> SaveSeries:
+        return SaveSeries(save_dir_path=save_dir_path,
+                          save_file_regex_pattern=SERIES_REGEX_PATTERN)
+
+    series = load_series()
+
+    def generate_report() -> None:
+        view.summary_report.generate_summary_report(
+            save_dir_path=save_dir_path,
+            file_regex_pattern=SERIES_REGEX_PATTERN,
+            output_path=save_dir_path / "summary_report.html"
+        )
+
+    return {
+        "series_load": time_callable(load_series, rounds),
+        "series_aggregate": time_callable(series.aggregate_dataframes, rounds),
+        "report_generate": time_callable(generate_report, rounds),
+    }
+
+
+def run_benchmarks(work_dir: pathlib.Path, scale: dict, series_length: int, rounds: int) -> dict:
+    """Generate a synthetic series of saves and benchmark every stage of processing them
+
+    Parameters:
+    work_dir (pathlib.Path): The directory where the synthetic save files are written
+    scale (dict): The counts overriding the demo scale preset of the synthetic saves
+    series_length (int): The number of saves in the synthetic series
+    rounds (int): The number of times to run each stage
+
+    Returns:
+    dict: The benchmark record with the environment, the parameters and the stage timings
+    """
+    save_paths = synthetic.write_series(save_dir_path=work_dir, series_length=series_length,
+                                        scale=scale, file_name_format="benchmark {}.rws.gz")
+    logging.info("Generated %d synthetic saves in %s", len(save_paths), work_dir)
+    results = {
+        "import_save": time_import("save"),
+        "import_view": time_import("view.summary_report"),
+    }
+    results.update(benchmark_save_stages(save_path=save_paths[-1], rounds=rounds))
+    results.update(benchmark_series(save_dir_path=pathlib.Path(work_dir), rounds=rounds))
+
+    return {
+        "commit": get_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python_version": platform.python_version(),
+        "parameters": {**scale, "series_length": series_length, "rounds": rounds},
+        "results": results,
+    }
+
+
+def get_commit() -> str:
+    """Return the hash of the checked out git commit, or an empty string outside a git repo
+
+    Parameters:
+    None
+
+    Returns:
+    str: The hash of the checked out git commit
+    """
+    result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, check=False,
+                            text=True)
+
+    return result.stdout.strip()
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> list:
+    """Compare two benchmark records and return the stages that regressed beyond the threshold
+
+    Parameters:
+    baseline (dict): The benchmark record to compare against
+    current (dict): The benchmark record being checked for regressions
+    threshold (float): The allowed ratio of current to baseline minimum time, e.g. 1.1 for 10%
+
+    Returns:
+    list: A list of (stage name, baseline seconds, current seconds, ratio) tuples of regressions
+    """
+    regressions = []
+
+    for stage_name, current_stats in current["results"].items():
+        baseline_stats = baseline["results"].get(stage_name)
+
+        if baseline_stats is None or baseline_stats["min"] <= 0:
+            continue
+
+        ratio = current_stats["min"] / baseline_stats["min"]
+        logging.info("%s: %.6fs -> %.6fs (x%.2f)", stage_name, baseline_stats["min"],
+                     current_stats["min"], ratio)
+
+        if ratio > threshold:
+            regressions.append((stage_name, baseline_stats["min"], current_stats["min"], ratio))
+
+    return regressions
+
+
+def write_results(record: dict, output_path: pathlib.Path) -> None:
+    """Write a benchmark record to a JSON file
+
+    Parameters:
+    record (dict): The benchmark record
+    output_path (pathlib.Path): The path of the JSON file to create
+
+    Returns:
+    None
+    """
+    with open(output_path, "w", encoding="utf_8") as output_file:
+        json.dump(record, output_file, indent=2)
+
+
+def read_results(input_path: pathlib.Path) -> dict:
+    """Read a benchmark record from a JSON file
+
+    Parameters:
+    input_path (pathlib.Path): The path of the JSON file
+
+    Returns:
+    dict: The benchmark record
+    """
+    with open(input_path, "r", encoding="utf_8") as input_file:
+        return json.load(input_file)
@@ -0,0 +1,384 @@
+"""Generate synthetic RimWorld save files at configurable scale for benchmarks and scale tests
+
+The saves follow the structure of real RimWorld 1.3 saves: a meta section with the mod list, the
+game's tickManager and taleManager, a world section, and maps with a weatherManager, compressed
+grid data and things of several classes. A SyntheticColony evolves between saves so that a
+series of saves keeps the same thing IDs while plants grow, die and spawn, like autosaves do.
+Generation is deterministic for a given scale and seed.
+"""
+
+import base64
+import gzip
+import pathlib
+import random
+
+PLANT_DEFINITIONS = [
+    "Plant_Grass",
+    "Plant_TallGrass",
+    "Plant_Bush",
+    "Plant_Brambles",
+    "Plant_TreeOak",
+    "Plant_TreePoplar",
+    "Plant_Dandelion",
+    "Plant_Potato",
+]
+BUILDING_DEFINITIONS = ["Wall", "Door", "Bed", "TableButcher", "SolarGenerator", "Battery"]
+ITEM_DEFINITIONS = ["Steel", "WoodLog", "MealSimple", "ComponentIndustrial", "Silver", "Cloth"]
+ANIMAL_DEFINITIONS = ["Muffalo", "Chicken", "Cow", "Husky", "Alpaca"]
+WEATHER_DEFINITIONS = ["Clear", "Rain", "Fog", "FoggyRain", "DryThunderstorm", "SnowGentle"]
+STUFF_DEFINITIONS = ["BlocksGranite", "BlocksSlate", "WoodLog", "Steel"]
+SCALE_PRESETS = {
+    "tiny": {
+        "map_count": 1,
+        "plant_count": 200,
+        "building_count": 50,
+        "item_count": 20,
+        "animal_count": 3,
+        "pawn_count": 3,
+        "tale_count": 9,
+        "mod_count": 5,
+        "filler_bytes": 1000,
+        "save_interval_ticks": 60000,
+    },
+    "demo": {
+        "map_count": 1,
+        "plant_count": 11000,
+        "building_count": 3300,
+        "item_count": 200,
+        "animal_count": 30,
+        "pawn_count": 10,
+        "tale_count": 30,
+        "mod_count": 40,
+        "filler_bytes": 1000000,
+        "save_interval_ticks": 60000,
+    },
+    "late_game": {
+        "map_count": 3,
+        "plant_count": 100000,
+        "building_count": 30000,
+        "item_count": 5000,
+        "animal_count": 200,
+        "pawn_count": 40,
+        "tale_count": 2000,
+        "mod_count": 200,
+        "filler_bytes": 5000000,
+        "save_interval_ticks": 60000,
+    },
+}
+
+
+class SyntheticColony:
+    """Hold the state of a synthetic colony that can be advanced in time and written as a save"""
+    def __init__(self, scale: dict = None, seed: int = 0) -> None:
+        """Initialize the colony with the requested number of things, pawns and tales
+
+        Parameters:
+        scale (dict): Counts overriding those of the demo scale preset, e.g. {"plant_count": 10}
+        seed (int): The seed of the random number generator
+
+        Returns:
+        None
+        """
+        self.scale = {**SCALE_PRESETS["demo"], **(scale or {})}
+        self.rng = random.Random(seed)
+        self.game_time_ticks = 617500
+        self.next_thing_id = 1000
+        self.tales = []
+        self.maps = []
+
+        for map_index in range(self.scale["map_count"]):
+            self.maps.append({
+                "weather": [self.rng.choice(WEATHER_DEFINITIONS) for _ in range(2)] + [0],
+                "plants": [self.get_new_plant(map_index) for _ in range(
+                    self.get_share_of_count("plant_count", map_index))],
+                "things": self.get_new_things(map_index),
+            })
+
+        for _ in range(self.scale["tale_count"]):
+            self.add_tale()
+
+    def get_share_of_count(self, count_name: str, map_index: int) -> int:
+        """Return the part of a total count placed on the given map, spreading it evenly
+
+        Parameters:
+        count_name (str): The name of the count in the scale, e.g. plant_count
+        map_index (int): The index of the map
+
+        Returns:
+        int: The count of things on the map
+        """
+        map_count = self.scale["map_count"]
+
+        return self.scale[count_name] // map_count + (
+            map_index < self.scale[count_name] % map_count)
+
+    def get_new_thing_id(self, definition: str) -> str:
+        """Return a new unique thing ID for the given definition
+
+        Parameters:
+        definition (str): The def of the thing
+
+        Returns:
+        str: The thing ID, made of the def and a number unique within the save
+        """
+        self.next_thing_id += 1
+
+        return f"{definition}{self.next_thing_id}"
+
+    def get_position(self) -> str:
+        """Return a random position on a 250 by 250 map
+
+        Parameters:
+        None
+
+        Returns:
+        str: The position in the format used by RimWorld, e.g. (12, 0, 34)
+        """
+        return f"({self.rng.randrange(250)}, 0, {self.rng.randrange(250)})"
+
+    def get_new_plant(self, map_index: int) -> list:
+        """Return the state of a newly spawned plant
+
+        Parameters:
+        map_index (int): The index of the map the plant is spawned on
+
+        Returns:
+        list: The plant's def, ID, map index, position, growth and age in ticks
+        """
+        definition = self.rng.choice(PLANT_DEFINITIONS)
+
+        return [definition, self.get_new_thing_id(definition), map_index, self.get_position(),
+                round(self.rng.random(), 7), self.rng.randint(0, 5000000)]
+
+    def get_new_things(self, map_index: int) -> list:
+        """Return the XML of the buildings, items and animals on a map
+
+        Parameters:
+        map_index (int): The index of the map
+
+        Returns:
+        list: The XML of each thing
+        """
+        things = []
+
+        for _ in range(self.get_share_of_count("building_count", map_index)):
+            definition = self.rng.choice(BUILDING_DEFINITIONS)
+            things.append(
+                f'<thing Class="Building"><def>{definition}</def>'
+                f"<id>{self.get_new_thing_id(definition)}</id><map>{map_index}</map>"
+                f"<pos>{self.get_position()}</pos><health>{self.rng.randint(50, 300)}</health>"
+                f"<stuff>{self.rng.choice(STUFF_DEFINITIONS)}</stuff>"
+                '<questTags IsNull="True" /></thing>'
+            )
+
+        for _ in range(self.get_share_of_count("item_count", map_index)):
+            definition = self.rng.choice(ITEM_DEFINITIONS)
+            things.append(
+                f'<thing Class="ThingWithComps"><def>{definition}</def>'
+                f"<id>{self.get_new_thing_id(definition)}</id><map>{map_index}</map>"
+                f"<pos>{self.get_position()}</pos><health>{self.rng.randint(10, 100)}</health>"
+                f"<stackCount>{self.rng.randint(1, 75)}</stackCount></thing>"
+            )
+
+        for _ in range(self.get_share_of_count("animal_count", map_index)):
+            definition = self.rng.choice(ANIMAL_DEFINITIONS)
+            things.append(
+                f'<thing Class="Pawn"><def>{definition}</def>'
+                f"<id>{self.get_new_thing_id(definition)}</id><map>{map_index}</map>"
+                f"<pos>{self.get_position()}</pos><kindDef>{definition}</kindDef>"
+                '<name IsNull="True" /><mindState><lastJobTag>Idle</lastJobTag></mindState>'
+                f"<ageTracker><ageBiologicalTicks>{self.rng.randint(0, 9000000)}"
+                "</ageBiologicalTicks></ageTracker></thing>"
+            )
+
+        return things
+
+    def add_tale(self) -> None:
+        """Add a tale dated at the current in-game time, about one of the colonists
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        tale_number = len(self.tales) + 1
+        pawn_number = self.rng.randrange(self.scale["pawn_count"])
+        date = self.rng.randint(max(self.game_time_ticks - self.scale["save_interval_ticks"], 0),
+                                self.game_time_ticks)
+
+        # Every other tale is an unrelated major threat, which the pawn extraction has to skip
+        if tale_number % 2 == 0:
+            self.tales.append(
+                f"<li><def>MajorThreat</def><id>{tale_number}</id><date>{date}</date>"
+                '<surroundings IsNull="True" /><customLabel>raid</customLabel></li>'
+            )
+            return
+
+        age = 18 + pawn_number % 50 + self.game_time_ticks // 3600000
+        self.tales.append(
+            f'<li Class="Tale_SinglePawn"><def>CollapseDodged</def><id>{tale_number}</id>'
+            f"<uses>1</uses><date>{date}</date><surroundings><tile>{pawn_number}</tile>"
+            f"<temperature>{self.rng.uniform(-20, 40):.5f}</temperature>"
+            "<weather>Clear</weather><roomRole>None</roomRole></surroundings>"
+            f"<pawnData><pawn>Thing_Android3Tier{100000 + pawn_number}</pawn>"
+            "<kind>AndroidT3Colonist</kind><faction>Faction_17</faction>"
+            f"<gender>Male</gender><age>{age}</age><chronologicalAge>{age}</chronologicalAge>"
+            '<relationInfo /><name Class="NameTriple">'
+            f"<first>First{pawn_number}</first><nick>Nick{pawn_number}</nick>"
+            f"<last>Last{pawn_number}</last></name></pawnData></li>"
+        )
+
+    def advance(self) -> None:
+        """Advance the colony by one save interval, growing, removing and spawning plants
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        interval = self.scale["save_interval_ticks"]
+        self.game_time_ticks += interval
+
+        for map_index, map_state in enumerate(self.maps):
+            map_state["weather"] = [self.rng.choice(WEATHER_DEFINITIONS), map_state["weather"][0],
+                                    self.rng.randint(0, interval)]
+            surviving_plants = [plant for plant in map_state["plants"] if self.rng.random() > 0.05]
+
+            for plant in surviving_plants:
+                plant[4] = round(min(plant[4] + self.rng.uniform(0, 0.1), 1.0), 7)
+                plant[5] += interval
+
+            spawn_count = len(map_state["plants"]) - len(surviving_plants)
+            map_state["plants"] = surviving_plants + [
+                self.get_new_plant(map_index) for _ in range(spawn_count)
+            ]
+
+        for _ in range(max(self.scale["tale_count"] // 10, 1)):
+            self.add_tale()
+
+    def get_filler(self, label: int) -> str:
+        """Return incompressible base64 data standing in for the compressed grids of a save
+
+        Parameters:
+        label (int): A number distinguishing the filler data of each section
+
+        Returns:
+        str: The base64 encoded filler data
+        """
+        filler_rng = random.Random(self.game_time_ticks * 1000 + label)
+
+        return base64.b64encode(filler_rng.randbytes(self.scale["filler_bytes"] * 3 // 4)).decode()
+
+    def get_map_xml(self, map_index: int) -> str:
+        """Return the XML of a map with its weather, compressed grids and things
+
+        Parameters:
+        map_index (int): The index of the map
+
+        Returns:
+        str: The XML of the map
+        """
+        map_state = self.maps[map_index]
+        weather_current, weather_last, weather_age = map_state["weather"]
+        plants = "\n".join(
+            f'<thing Class="Plant"><def>{definition}</def><id>{thing_id}</id><map>{map_id}</map>'
+            f'<pos>{position}</pos><health>100</health><questTags IsNull="True" />'
+            f"<growth>{growth}</growth><age>{age}</age></thing>"
+            for definition, thing_id, map_id, position, growth, age in map_state["plants"]
+        )
+
+        return (
+            f"<li><uniqueID>{map_index}</uniqueID>"
+            f"<mapInfo><size>(250, 1, 250)</size><parent>WorldObject_{map_index}</parent></mapInfo>"
+            f"<weatherManager><curWeather>{weather_current}</curWeather>"
+            f"<lastWeather>{weather_last}</lastWeather><curWeatherAge>{weather_age}"
+            "</curWeatherAge><growthSeasonMemory><growthSeasonUntilTick>-1"
+            "</growthSeasonUntilTick></growthSeasonMemory></weatherManager>\n"
+            f"<compressedThingMapDeflate>{self.get_filler(map_index + 1)}"
+            "</compressedThingMapDeflate>\n"
+            f"<things>\n{plants}\n" + "\n".join(map_state["things"]) + "\n</things></li>\n"
+        )
+
+    def get_save_xml(self) -> str:
+        """Return the XML document of a save of the colony at its current in-game time
+
+        Parameters:
+        None
+
+        Returns:
+        str: The XML document of the save
+        """
+        mod_count = self.scale["mod_count"]
+        mod_ids = "".join(["<li>ludeon.rimworld</li>"] + [
+            f"<li>synthetic.mod{index}</li>" for index in range(1, mod_count)])
+        mod_steam_ids = "".join(["<li>0</li>"] + [
+            f"<li>{2000000000 + index}</li>" for index in range(1, mod_count)])
+        mod_names = "".join(["<li>Core</li>"] + [
+            f"<li>Synthetic Mod {index}</li>" for index in range(1, mod_count)])
+        tales = "\n".join(self.tales)
+        maps = "".join(self.get_map_xml(map_index) for map_index in range(len(self.maps)))
+
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n<savegame>\n'
+            "<meta><gameVersion>1.3.3200 rev726</gameVersion>"
+            f"<modIds>{mod_ids}</modIds><modSteamIds>{mod_steam_ids}</modSteamIds>"
+            f"<modNames>{mod_names}</modNames></meta>\n"
+            "<game><currentMapIndex>0</currentMapIndex>"
+            f"<tickManager><ticksGame>{self.game_time_ticks}</ticksGame>"
+            "<gameStartAbsTick>617500</gameStartAbsTick><startingYear>5500</startingYear>"
+            f"</tickManager>\n<taleManager><tales>\n{tales}\n</tales></taleManager>\n"
+            f"<world><grid><tileBiomeDeflate>{self.get_filler(0)}</tileBiomeDeflate></grid>"
+            "</world>\n"
+            f"<maps>\n{maps}</maps>\n</game>\n</savegame>\n"
+        )
+
+
+def write_save(path: pathlib.Path, save_xml: str) -> pathlib.Path:
+    """Write the XML document of a save to disk, gzip compressing it if the path ends with .gz
+
+    Parameters:
+    path (pathlib.Path): The path of the save file to create, ending with .rws or .rws.gz
+    save_xml (str): The XML document of the save
+
+    Returns:
+    pathlib.Path: The path of the created save file
+    """
+    path = pathlib.Path(path)
+
+    # RimWorld writes its saves as UTF-8 with a byte order mark
+    if path.suffix == ".gz":
+        with gzip.open(path, "wt", encoding="utf_8_sig") as save_file:
+            save_file.write(save_xml)
+    else:
+        path.write_text(save_xml, encoding="utf_8_sig")
+
+    return path
+
+
+def write_series(save_dir_path: pathlib.Path, series_length: int, scale: dict = None,
+                 seed: int = 0, file_name_format: str = "synthetic {}.rws.gz") -> list:
+    """Write a series of saves of one synthetic colony, advancing it in time between saves
+
+    Parameters:
+    save_dir_path (pathlib.Path): The directory where the save files are created
+    series_length (int): The number of saves in the series
+    scale (dict): Counts overriding those of the demo scale preset, e.g. {"plant_count": 10}
+    seed (int): The seed of the random number generator
+    file_name_format (str): The format of the file names, filled with the save's number
+
+    Returns:
+    list: The paths of the created save files, in chronological order
+    """
+    colony = SyntheticColony(scale=scale, seed=seed)
+    save_paths = []
+
+    for save_number in range(1, series_length + 1):
+        if save_number > 1:
+            colony.advance()
+
+        save_path = pathlib.Path(save_dir_path) / file_name_format.format(save_number)
+        save_paths.append(write_save(path=save_path, save_xml=colony.get_save_xml()))
+
+    return save_paths
@@ -1,436 +1,758 @@
-"""Extract XML data from a RimWorld save file and return elements"""
+"""Load a series of RimWorld save files and combine their datasets over in-game time"""
 
-import gzip
+import functools
 import logging
-import multiprocessing
 import os
 import pathlib
 import re
-import xml.etree.ElementTree
 
 from bunch import Bunch
-import pandas
-import wcmatch.pathlib
 
+from save.datasets import COLONY_DATASET_NAMES, DATASET_NAMES, INTERNED_COLUMNS
+from save.datasets import NUMERIC_COLUMNS, PLANT_SKETCH_DATASETS
+from save.datasets import get_numeric_column, get_thing_aggregates
+from save.datasets import transform_pawn, transform_plant, transform_plant_sketch, transform_thing
+from save.deduplication import find_duplicates, find_superseded
+from save.diagnostics import Diagnostics
+from save.diff import diff_snapshots
+from save.interning import InternTable
+from save.lazy_import import lazy_import
+from save.lifecycle import PlantLifecycle
+from save.metrics import Metrics
+from save.mod_list import ModListVersions
+from save.parser import get_parser_backend
+from save.plant_history import PlantHistory
+from save.record import SnapshotColumns
+from save.save_file import Save
+from save.tasks import TaskRunner
+from save.timeline import TickIndex
+from save.transport import SharedColumns, release_task_segments
+
+# Heavy dependencies are only imported once the code path that needs them runs, so importing the
+# package and extracting XML data inside worker processes does not pay for them
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+wcmatch_pathlib = lazy_import("wcmatch.pathlib")
+
+
+class SaveSeries:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    """Manage the ELT process for a series of RimWorld game save files"""
+    def __init__(self, save_dir_path: pathlib.Path,  # pylint: disable=too-many-arguments
+                 save_file_regex_pattern: str, parser: object = "auto", datasets: list = None,
+                 equal_ticks_policy: str = "keep_all", timeout: float = None,
+                 retries: int = 0, aggregate: bool = True) -> None:
+        """Initialize the SaveSeries object
+
+        Save files holding the same document as an earlier save are only loaded once, and recorded
+        in the aliases property, as are the saves dropped by the equal ticks policy. The remaining
+        saves are kept in order of their in-game time, which the tick_index property indexes.
 
-class Save:
-    """Extract the XML data from a RimWorld save file and return the elements"""
-    def __init__(self, path_to_save_file: pathlib.Path, preserve_root: bool = False) -> None:
-        """Initialize the Save object by parsing the root XML object using ElementTree
+        The mod dataset holds each distinct mod list once, with the mod_list_version of its rows,
+        and the mod_lists property holds the version of the mod list of each snapshot and the mods
+        added and removed over time. get_mod_snapshots returns the mod rows of every snapshot.
+
+        Each save is loaded by a task of its own, so a save that fails to load, e.g. a truncated
+        file, or runs past the timeout is left out of the series and reported in the errors
+        property, keyed by its base name, while the other saves are aggregated as usual.
 
         Parameters:
-        path_to_save_file (pathlib.Path): The path to the RimWorld save file to be loaded
-        preserve_root (bool): Keeps the XML root element available for access if True
+        save_dir_path (pathlib.Path): The directory containing the RimWorld save files
+        save_file_regex_pattern (str): A regex pattern matching a series of associated save files
+        parser (object): The parser backend or its name used to load each save, see Save
+        datasets (list): The names of the datasets to extract, all of DATASET_NAMES if None, or
+            save.datasets.APPROXIMATE_DATASET_NAMES to keep counts and a sample of the plants, and
+            may include the animal, item and building datasets of COLONY_DATASET_NAMES
+        equal_ticks_policy (str): How different saves with the same in-game time are handled:
+            keep_all, the default, keeps each of them as a snapshot, while keep_newest or
+            keep_oldest keep one by modification time and log a warning for each dropped save
+        timeout (float): The seconds an attempt to load a save may take, or None for no limit
+        retries (int): The number of times a save that failed to load is loaded again
+        aggregate (bool): Load the saves and aggregate their datasets, or only find the saves of the
+            series if False, e.g. to load them one at a time with iter_saves
 
         Returns:
         None
         """
-        self.data = Bunch()
-        self.data.path = path_to_save_file
-        self.data.file_base_name = os.path.basename(self.data.path)
-
-        # Parse the XML document and get the root
-        if os.path.splitext(self.data.path)[1] == ".gz":
-            # Handle gzip compressed files
-            with gzip.open(self.data.path, "rb") as save_file:
-                self.data.root = xml.etree.ElementTree.parse(save_file).getroot()
-        else:
-            self.data.root = xml.etree.ElementTree.parse(self.data.path).getroot()
-
-        # Extract singular data points
-        self.data.file_size = os.path.getsize(self.data.path)
-        self.data.game_version = self.data.root.find("./meta/gameVersion").text
-        self.data.game_time_ticks = int(self.data.root.find(".//tickManager/ticksGame").text)
-
-        # Extract datasets into a temporary location during processing
-        self.data.dictionary_list = {
-            "mod": self.extract_mod_list(),
-            "pawn": self.extract_pawn_data(),
-            "plant": self.extract_plant_data(),
-            "weather": self.extract_weather_data(),
+        self.dictionary = {}
+        self.aliases = {}
+        self.errors = {}
+        self.task_policy = {"timeout": timeout, "retries": retries}
+        self.intern_tables = {}
+        self.mod_lists = ModListVersions()
+        self.plant_history = PlantHistory()
+        self.plant_history_saves = []
+        self.tick_index = None
+        self.equal_ticks_policy = equal_ticks_policy
+        logging.debug("Initializing SaveSeries object with arguments:\n\tsave_dir_path = %s\n\t\
+            regex = %s", save_dir_path, save_file_regex_pattern)
+        self.save_dir_path = save_dir_path
+        self.save_file_regex_pattern = save_file_regex_pattern
+        self.save_options = {
+            "parser": get_parser_backend(parser),
+            "datasets": list(DATASET_NAMES if datasets is None else datasets),
         }
+        self.metrics = Metrics()
+        self.diagnostics = Diagnostics()
 
-        # Delete the root object to free up memory
-        if not preserve_root:
-            del self.data.root
+        with self.metrics.span("scan") as span:
+            self.scan_save_file_dir()
+            span["rows"] = len(self.dictionary)
 
-        # Generate pandas DataFrames from each dataset initialized as a list of dictionaries
-        self.generate_dataframes()
+        self.alias_duplicates()
+        self.data = Bunch()
 
-        # Delete the list of dictionaries for each dataset to reduce memory usage
-        del self.data.dictionary_list
+        if aggregate:
+            self.load_save_data()
+            self.alias_superseded()
+            self.aggregate_dataframes()
 
-        # Apply transformations to DataFrames
-        self.transform_pawn_dataframe()
-        self.transform_plant_dataframe()
+    def add_aliases(self, aliases: dict) -> None:
+        """Remove saves from the series, recording the save that stands in for each of them
 
-        logging.info("Finished creating new Save object from file: %s", self.data.path)
+        Parameters:
+        aliases (dict): The base name of the save standing in for each removed save, keyed by the
+            removed save's base name
 
-    @staticmethod
-    def add_value_to_dictionary_from_xml_with_null_handling(
-            dictionary: dict, xml_element: xml.etree.ElementTree.Element,
-            parent_element: xml.etree.ElementTree.Element, column_name: str) -> None:
-        """Add a value to to key, column name, to the given dictionary source from xml_element
+        Returns:
+        None
+        """
+        for alias, save_base_name in aliases.items():
+            del self.dictionary[alias]
+            self.aliases[alias] = save_base_name
+
+        # Point aliases of a removed save to the save standing in for it
+        for alias, save_base_name in self.aliases.items():
+            while save_base_name in self.aliases:
+                save_base_name = self.aliases[save_base_name]
+
+            self.aliases[alias] = save_base_name
+
+    def alias_duplicates(self) -> None:
+        """Remove the saves that hold the same document as an earlier save, before loading them
 
         Parameters:
-        dictionary (dict): The dictionary to add the value to
-        xml_element (xml.etree.ElementTree.Element): The source XML element for the current row
-        parent_element (xml.etree.ElementTree.Element): The parent element of the source element
-        column_name (str): The name of the key/column to add to the dictionary
+        None
 
         Returns:
         None
         """
-        if xml_element is None:
-            dictionary[column_name] = None
-            xml_content_dump = ""
+        with self.metrics.span("deduplicate") as span:
+            duplicates = find_duplicates(self.dictionary)
+            span["rows"] = len(duplicates)
 
-            for child in parent_element:
-                xml_content_dump += (
-                    f"<{child.tag} {{attribs = {child.attrib}}}>{child.text}</{child.tag}>\n"
-                )
+        if duplicates:
+            logging.info("Skipping saves identical to an earlier save: %s", duplicates)
 
-            logging.debug("XML content with undefined %s\n%s", column_name, xml_content_dump)
-        elif isinstance(xml_element, xml.etree.ElementTree.Element):
-            dictionary[column_name] = xml_element.text
+        self.add_aliases(duplicates)
 
-    def add_values_to_dictionary(self, dictionary: dict, xpath_pattern_key_list: list,
-                                 parent_element: xml.etree.ElementTree.Element) -> None:
-        """Add values to the given dictionary given the input list of xpath_patterns and target keys
+    def alias_superseded(self) -> None:
+        """Remove the loaded saves dropped by the equal ticks policy
 
         Parameters:
-        dictionary (dict): The dictionary to add the entries to
-        xpath_pattern_key_list (list): A list of tuples of XPath patterns and associated key names
-        parent_element (xml.etree.ElementTree.Element): The parent XML element containing the data
+        None
 
         Returns:
         None
         """
-        for target_key, xpath_pattern in xpath_pattern_key_list:
-            self.add_value_to_dictionary_from_xml_with_null_handling(
-                dictionary=dictionary,
-                xml_element=parent_element.find(xpath_pattern),
-                parent_element=parent_element,
-                column_name=target_key
-            )
+        superseded = find_superseded(self.dictionary, self.equal_ticks_policy)
+
+        for save_base_name, kept_save_base_name in superseded.items():
+            logging.warning("Dropping save %s, which has the same in-game time as %s, under the %s "
+                            "policy", save_base_name, kept_save_base_name, self.equal_ticks_policy)
 
-    def extract_mod_list(self) -> list:
-        """Extract the list of mods installed in the save game
+        self.add_aliases(superseded)
+
+    def aggregate_dataframes(self) -> None:
+        """Combine individual save datasets in order of their in-game time and index the time
 
         Parameters:
         None
 
         Returns:
-        list: A list of dictionaries with each installed mod's metadata
+        None
         """
-        mod_ids = self.data.root.findall("./meta/modIds")
-        mod_steam_ids = self.data.root.findall("./meta/modSteamIds")
-        mod_names = self.data.root.findall("./meta/modNames")
-        mod_list = []
-
-        for index, mod_id in enumerate(mod_ids[0]):
-            mod_info = {
-                "mod_id": mod_id.text,
-                "mod_name": mod_names[0][index].text,
-                "mod_steam_id": mod_steam_ids[0][index].text
+        # Validate that there are dataframes present to aggregate before continuing
+        if len(self.dictionary) < 1:
+            logging.error("0 source dataframes detected while attempting to aggregate frames")
+            assert len(self.dictionary) > 0
+
+        dataset_names = self.save_options["datasets"]
+        logging.debug("Aggregating datasets: %s", dataset_names)
+
+        # Sort the saves by in-game time, then name, so the rows of a time window are contiguous
+        self.dictionary = dict(sorted(self.dictionary.items(), key=lambda item: (
+            item[1]["save"].data.game_time_ticks, item[0])))
+        saves = [save_file_data["save"] for save_file_data in self.dictionary.values()]
+        self.tick_index = TickIndex([save.data.game_time_ticks for save in saves], {
+            dataset_name: [save.data.dataset_columns.get_row_count(dataset_name) for save in saves]
+            for dataset_name in dataset_names if dataset_name != "mod"
+        }, saves[0].data.game_start_ticks)
+
+        for dataset_name in dataset_names:
+            logging.debug("Aggregating snapshots of %s data", dataset_name)
+
+            with self.metrics.span(f"aggregate_{dataset_name}") as span:
+                self.data[dataset_name] = self.get_mod_dataframe() if dataset_name == "mod" \
+                    else self.get_series_dataframe(saves, dataset_name)
+                span["rows"] = len(self.data[dataset_name].index)
+
+            logging.info("Pandas dataframe combination operation complete for %s data",
+                         dataset_name)
+
+        # Point each save to its rows of the series, freeing the columns it was loaded with
+        dataframes = {dataset_name: self.data[dataset_name] for dataset_name in dataset_names}
+        layout = {
+            dataset_name: list(saves[0].data.dataset_columns.layout[dataset_name])
+            for dataset_name in dataset_names
+        }
+
+        for position, save in enumerate(saves):
+            row_slices = {
+                dataset_name: self.tick_index.get_row_slice(dataset_name, position, position + 1)
+                for dataset_name in self.tick_index.offsets
             }
-            mod_list.append(mod_info)
 
-        return mod_list
+            if "mod" in dataset_names:
+                row_slices["mod"] = self.mod_lists.get_row_slice(
+                    self.mod_lists.snapshot_versions[position])
+
+            save.data.update(dataframe_builder=None, dataset_columns=SnapshotColumns(
+                dataframes, row_slices, layout, save.data.game_time_ticks))
 
-    def extract_pawn_data(self) -> list:
-        """Return a list of dictionaries containing pawn data
+    def get_plant_history(self) -> PlantHistory:
+        """Return the plants of the series stored as the changes between snapshots, see PlantHistory
+
+        The history is only built when it is first asked for, as the plant dataset already holds
+        every row, and is then kept in the series. Each later call only adds the plants of the
+        snapshots ingested since, unless a save it holds was replaced or left out of the series, or
+        a new save is earlier than its last snapshot, which builds it again. Of several saves with
+        the same in-game time, only the first is stored.
 
         Parameters:
         None
 
         Returns:
-        list: The list of dictionaries containing pawn data
+        PlantHistory: The history of the plants of the series
         """
-        pawn_data_elements = self.data.root.findall(".//li[@Class='Tale_SinglePawn']")
-        pawn_data = []
+        saves = [save_file_data["save"] for save_file_data in self.dictionary.values()]
 
-        for element in pawn_data_elements:
-            current_pawn = {
-                "pawn_id": element.find(".//pawnData/pawn").text,
-                "tale_date": element.find(".//date").text,
-            }
-            xpath_pattern_key_list = [
-                ("pawn_name_nick", ".//pawnData/name/nick"),
-                ("pawn_name_last", ".//pawnData/name/last"),
-                ("pawn_biological_age", ".//pawnData/age"),
-                ("pawn_chronological_age", ".//pawnData/chronologicalAge"),
-                ("pawn_ambient_temperature", ".//surroundings/temperature"),
-                ("pawn_name_first", ".//pawnData/name/first"),
-            ]
-            self.add_values_to_dictionary(
-                dictionary=current_pawn,
-                xpath_pattern_key_list=xpath_pattern_key_list,
-                parent_element=element
-            )
-            current_pawn["pawn_name_full"] = (
-                f"{current_pawn['pawn_name_first']} "
-                f"\"{current_pawn['pawn_name_nick']}\" "
-                f"{current_pawn['pawn_name_last']}"
-            )
-            pawn_data.append(current_pawn)
-
-        return pawn_data
-
-    def extract_plant_data(self) -> list:
-        """Return a list of dictionaries containing plant data
+        with self.metrics.span("plant_history"):
+            self.update_plant_history(saves)
+
+        return self.plant_history
+
+    def update_plant_history(self, saves: list) -> None:
+        """Add the plants of the new snapshots to the plant history, after those already stored
 
         Parameters:
-        None
+        saves (list): The Save objects of the series, in order
 
         Returns:
-        list: The list of dictionaries containing plant data
+        None
         """
-        search_pattern = ".//thing[@Class='Plant']"
-        xml_elements = self.data.root.findall(search_pattern)
-        plant_data = []
+        stored_count = len(self.plant_history_saves)
 
-        for element in xml_elements:
-            current_element_data = {
-                "plant_id": element.find(".//id").text,
-            }
-            xpath_pattern_key_list = [
-                ("plant_definition", ".//def"),
-                ("plant_map_id", ".//map"),
-                ("plant_position", ".//pos"),
-                ("plant_growth", ".//growth"),
-                ("plant_age", ".//age"),
-            ]
-            self.add_values_to_dictionary(
-                dictionary=current_element_data,
-                xpath_pattern_key_list=xpath_pattern_key_list,
-                parent_element=element
-            )
-            plant_data.append(current_element_data)
-
-        return plant_data
-
-    def extract_weather_data(self) -> dict:
-        """Return the weather data for the current map
+        if len(saves) < stored_count or any(
+                save is not stored_save
+                for save, stored_save in zip(saves, self.plant_history_saves)):
+            self.plant_history = PlantHistory()
+            stored_count = 0
+
+        for position in range(stored_count, len(saves)):
+            time_ticks = int(self.tick_index.time_ticks[position])
+
+            if not self.plant_history.snapshots or \
+                    time_ticks > self.plant_history.snapshots[-1]["time_ticks"]:
+                self.plant_history.append(time_ticks, self.data.plant.iloc[
+                    self.tick_index.get_row_slice("plant", position, position + 1)])
+
+        self.plant_history_saves = saves
+
+    def get_mod_dataframe(self) -> "pandas.core.frame.DataFrame":
+        """Return the rows of each distinct mod list of the series once, versioning each snapshot
+
+        The version of the mod list of each save is kept in its entry of the dictionary, so only the
+        mod lists of new saves are hashed.
 
         Parameters:
         None
 
         Returns:
-        dict: A dictionary containing weather data for the current map
+        pandas.core.frame.DataFrame: The rows of each version of the mod list, see ModListVersions
         """
-        element = self.data.root.find(".//weatherManager")
-        weather_data = {
-            "weather_current": element.find(".//curWeather").text,
-            "weather_current_age": element.find(".//curWeatherAge").text,
-            "weather_last": element.find(".//lastWeather").text,
-        }
+        for save_file_data in self.dictionary.values():
+            if "mod_list_version" not in save_file_data:
+                save_file_data["mod_list_version"] = self.mod_lists.add(
+                    save_file_data["save"].data.dataset_columns["mod"])
+
+        self.mod_lists.set_snapshots([
+            save_file_data["mod_list_version"] for save_file_data in self.dictionary.values()
+        ], self.tick_index.time_ticks)
 
-        # Nest the weather dictionary inside a list to maintain list of dictionaries as the return
-        weather_data_list = [weather_data]
+        return self.mod_lists.dataframe
 
-        return weather_data_list
+    def get_series_dataframe(self, saves: list,
+                             dataset_name: str) -> "pandas.core.frame.DataFrame":
+        """Return the DataFrame of a dataset across saves, read from each save's shared columns
 
-    def generate_dataframes(self) -> None:
-        """Generate pandas DataFrames for each dataset
+        Each column is allocated once for all rows of the series, and the rows of each save are
+        written into it straight from the save's shared memory segment, the numeric columns as typed
+        arrays. The result matches concatenating the DataFrames of the saves, including the index,
+        except that the interned columns are categorical, with the series' intern table of the
+        column as categories.
 
         Parameters:
-        None
+        saves (list): The Save objects of the series, in order
+        dataset_name (str): The name of the dataset
 
         Returns:
+        pandas.core.frame.DataFrame: The DataFrame of the dataset across saves
+        """
+        row_counts = [save.data.dataset_columns.get_row_count(dataset_name) for save in saves]
+        stops = numpy.cumsum(row_counts)
+        starts = stops - row_counts
+        numeric_columns = NUMERIC_COLUMNS.get(dataset_name, {})
+        columns = {}
+
+        for column_name in saves[0].data.dataset_columns.layout[dataset_name]:
+            if column_name in INTERNED_COLUMNS.get(dataset_name, []):
+                columns[column_name] = self.get_interned_column(saves, dataset_name, column_name)
+                continue
+
+            if column_name in numeric_columns:
+                columns[column_name] = self.get_typed_column(saves, dataset_name, column_name,
+                                                             stops)
+                continue
+
+            columns[column_name] = numpy.empty(stops[-1], dtype=object)
+
+            for save, start, stop in zip(saves, starts, stops):
+                save.data.dataset_columns.read_column(dataset_name, column_name,
+                                                      columns[column_name][start:stop])
+
+        # Number the rows of each save from 0, as concatenating the DataFrames of the saves would
+        index = numpy.arange(stops[-1]) - numpy.repeat(starts, row_counts)
+        dataframe = pandas.DataFrame(columns, index=index, copy=False)
+        dataframe["time_ticks"] = numpy.repeat([save.data.game_time_ticks for save in saves],
+                                               row_counts)
+
+        if dataset_name == "pawn":
+            transform_pawn(dataframe, numpy.repeat(numpy.arange(len(saves)), row_counts))
+        elif dataset_name == "plant":
+            transform_plant(dataframe)
+        elif dataset_name in PLANT_SKETCH_DATASETS:
+            transform_plant_sketch(dataframe, dataset_name)
+        elif dataset_name in COLONY_DATASET_NAMES:
+            transform_thing(dataframe, dataset_name)
+
+        return dataframe
+
+    def get_plant_lifecycle(self) -> PlantLifecycle:
+        """Return the spawns, removals, growth rates and survival of the plants across the series
+
+        Parameters:
         None
+
+        Returns:
+        PlantLifecycle: The lifecycle analytics of the plant data, with a snapshot per save
         """
-        # Validate the input list length
-        assert 1 <= len(self.data.dictionary_list) <= 100
+        row_counts = numpy.diff(self.tick_index.offsets["plant"])
 
-        logging.debug("Generating pandas DataFrames for %d datasets\n%s",
-                      len(self.data.dictionary_list), list(self.data.dictionary_list))
+        return PlantLifecycle(self.data.plant, self.tick_index.time_ticks,
+                              numpy.repeat(numpy.arange(len(self.tick_index)), row_counts))
 
-        for dataset_name, dataset in self.data.dictionary_list.items():
-            # Validate the input dictionary and keys
-            assert isinstance(dataset, list)
-            assert isinstance(dataset_name, str)
+    def get_thing_aggregates(self, dataset_name: str) -> "pandas.core.frame.DataFrame":
+        """Return the number of things of each definition in each snapshot, with their totals
 
-            # Generate the pandas dataframe from the list of dictionaries in dictionary_list
-            self.data[dataset_name] = pandas.DataFrame(dataset)
+        Parameters:
+        dataset_name (str): The name of a thing dataset of the series, e.g. item
 
-            # Add a time dimension for in-game time based on ticks passed
-            self.data[dataset_name]["time_ticks"] = self.data.game_time_ticks
+        Returns:
+        pandas.core.frame.DataFrame: The aggregates of each definition in each snapshot, see
+            save.datasets.get_thing_aggregates
+        """
+        return get_thing_aggregates(self.data[dataset_name], dataset_name)
 
-    def transform_pawn_dataframe(self) -> None:
-        """Apply transformations to the pawn DataFrame
+    @staticmethod
+    def get_typed_column(saves: list, dataset_name: str, column_name: str,
+                         stops: "numpy.ndarray") -> object:
+        """Return a numeric column across saves, copying the typed values of each save into it
 
         Parameters:
-        None
+        saves (list): The Save objects of the series, in order
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column, one of save.datasets.NUMERIC_COLUMNS
+        stops (numpy.ndarray): The position after the last row of each save
 
         Returns:
-        None
+        object: The column, see save.datasets.get_numeric_column
+        """
+        dtype = NUMERIC_COLUMNS[dataset_name][column_name]
+        values = numpy.empty(stops[-1], dtype=dtype)
+        mask = numpy.empty(stops[-1], dtype=bool)
+
+        for save, start, stop in zip(saves, numpy.concatenate([[0], stops[:-1]]), stops):
+            save.data.dataset_columns.read_numeric(dataset_name, column_name, values[start:stop],
+                                                   mask[start:stop])
+
+        return get_numeric_column(numpy.ma.MaskedArray(values, mask), dtype)
+
+    def get_interned_column(self, saves: list, dataset_name: str,
+                            column_name: str) -> "pandas.Categorical":
+        """Return an interned column across saves, mapping the codes of each save to the series'
+
+        Only the distinct values of each save are looked up in the intern table of the column, and
+        the code of each row is then mapped with an array lookup.
+
+        Parameters:
+        saves (list): The Save objects of the series, in order
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+
+        Returns:
+        pandas.Categorical: The column, with the intern table of the column as categories
         """
-        # Convert the tale_date column from a string to an integer
-        dataframe = self.data.pawn
-        dataframe["tale_date_integer"] = dataframe["tale_date"].astype(int)
-        dataframe.drop(columns=["tale_date"])
-        dataframe.rename(columns={"tale_date_integer": "tale_date"})
+        intern_table = self.intern_tables.setdefault(column_name, InternTable())
+        column_codes = []
+
+        for save in saves:
+            values, codes = save.data.dataset_columns.read_codes(dataset_name, column_name)
 
-        # Determine the current record (latest chronological) for each unique pawn
-        dataframe["tale_date_max"] = dataframe.groupby(["pawn_id"])["tale_date"].transform(max)
-        dataframe["current_record"] = dataframe["tale_date_max"] == dataframe["tale_date"]
-        dataframe["is_humanoid_colonist"] = dataframe["pawn_id"].str.contains("Thing_Android")
+            # Append the code of missing values, -1, so save codes of -1 map to it
+            column_codes.append(numpy.append(intern_table.get_codes(values), -1)[codes])
 
-    def transform_plant_dataframe(self) -> None:
-        """Transform the plants DataFrame by adding calculated columns
+        return intern_table.get_categorical(numpy.concatenate(column_codes))
+
+    @property
+    def latest_save(self) -> Save:
+        """Return the chronologically latest save, the first by name if several share its time
 
         Parameters:
         None
 
         Returns:
-        None
+        Save: The Save object containing the latest sava data
         """
-        # Create a column by converting plant_growth to a float and multiplying it by 100
-        dataframe = self.data.plant
-        dataframe["plant_growth_percentage"] = dataframe["plant_growth"].astype(float) * 100
+        max_time_value = self.tick_index.time_ticks[-1]
+        position, _ = self.tick_index.get_range(max_time_value, max_time_value)
+        latest_save_name, save_file_data = list(self.dictionary.items())[position]
+        logging.info("Identified save, %s, as the latest save, with %d ticks", latest_save_name,
+                     max_time_value)
 
-        # Bin the percentage values in ranges for visualization and summarized reporting
-        bins = range(0, 101, 5)
-        dataframe["plant_growth_bin"] = pandas.cut(dataframe["plant_growth_percentage"],
-                                                   bins, labels=bins[1:])
+        return save_file_data["save"]
 
+    def get_snapshots(self, start: int, stop: int) -> Bunch:
+        """Return the rows of a range of snapshots of each dataset, sliced without copying
 
-class SaveSeries:
-    """Manage the ELT process for a series of RimWorld game save files"""
-    def __init__(self, save_dir_path: pathlib.Path, save_file_regex_pattern: str) -> None:
-        """Initialize the SaveSeries object
+        Parameters:
+        start (int): The position of the first snapshot
+        stop (int): The position after the last snapshot
+
+        Returns:
+        Bunch: The DataFrame of each dataset, keyed by the dataset name
+        """
+        return Bunch({
+            dataset_name: self.get_rows(dataset_name, numpy.arange(start, stop))[0]
+            if dataset_name == "mod" else self.data[dataset_name].iloc[
+                self.tick_index.get_row_slice(dataset_name, start, stop)]
+            for dataset_name in self.save_options["datasets"]
+        })
+
+    def get_rows(self, dataset_name: str, positions: "numpy.ndarray") -> tuple:
+        """Return the rows of a dataset of a sequence of snapshots, which may repeat
+
+        The rows of the mod dataset are expanded from the version of the mod list of each snapshot.
 
         Parameters:
-        save_dir_path (pathlib.Path): The directory containing the RimWorld save files
-        save_file_regex_pattern (str): A regex pattern matching a series of associated save files
+        dataset_name (str): The name of the dataset
+        positions (numpy.ndarray): The position of each snapshot
 
         Returns:
-        None
+        tuple: The DataFrame of the rows of every snapshot in turn, and the number of rows of each
         """
-        self.dictionary = {}
-        logging.debug("Initializing SaveSeries object with arguments:\n\tsave_dir_path = %s\n\t\
-            regex = %s", save_dir_path, save_file_regex_pattern)
-        self.save_dir_path = save_dir_path
-        self.save_file_regex_pattern = save_file_regex_pattern
-        self.scan_save_file_dir()
-        self.load_save_data()
-        self.data = Bunch()
-        self.aggregate_dataframes()
+        if dataset_name != "mod":
+            rows, row_counts = self.tick_index.get_rows(dataset_name, positions)
 
-    def aggregate_dataframes(self) -> None:
-        """Combine individual save datasets and group using a time dimension
+            return self.data[dataset_name].iloc[rows], row_counts
+
+        rows, row_counts = self.mod_lists.get_rows(positions)
+
+        return self.data.mod.iloc[rows].assign(
+            time_ticks=numpy.repeat(self.tick_index.time_ticks[positions], row_counts)), row_counts
+
+    def get_mod_snapshots(self) -> "pandas.core.frame.DataFrame":
+        """Return the mod rows of every snapshot, expanded from the version of its mod list
+
+        The rows match concatenating the mod DataFrames of the saves, with the mod_list_version of
+        each row, so they can be filtered by time like the rows of the other datasets.
 
         Parameters:
         None
 
         Returns:
-        None
+        pandas.core.frame.DataFrame: The mod rows of every snapshot in turn, with its time_ticks
         """
-        # Validate that there are dataframes present to aggregate before continuing
-        if len(self.dictionary) < 1:
-            logging.error("0 source dataframes detected while attempting to aggregate frames")
-            assert len(self.dictionary) > 0
+        return self.get_rows("mod", numpy.arange(len(self.tick_index)))[0]
 
-        # Get only the keys (names of datasets) from one of the stored save datasets
-        dataset_names = [
-            "mod",
-            "pawn",
-            "plant",
-            "weather",
-        ]
-        logging.debug("Aggregating datasets: %s", dataset_names)
+    def diff(self, start_ticks: int, stop_ticks: int) -> Bunch:
+        """Return the changes of each dataset between the snapshots as of two in-game times
 
-        for dataset_name in dataset_names:
-            logging.debug("Aggregating snapshots of %s data", dataset_name)
-            frame_combine_list = []
+        The rows of both snapshots are sliced from the series, and their interned columns are
+        compared by their codes.
+
+        Parameters:
+        start_ticks (int): The in-game time of the earlier snapshot, see as_of
+        stop_ticks (int): The in-game time of the later snapshot, see as_of
 
-            for save_file_name, save_file_data in self.dictionary.items():
-                logging.debug("Adding data from save file, %s, to %s data aggregation:\n%s",
-                              save_file_name, dataset_name, save_file_data["path"])
-                current_dataframe = save_file_data["save"].data[dataset_name]
-                frame_combine_list.append(current_dataframe)
+        Returns:
+        Bunch: The rows added, removed and changed of each dataset, keyed by the dataset name, see
+            save.diff.diff_dataset
+        """
+        return diff_snapshots(self.as_of(start_ticks), self.as_of(stop_ticks))
 
-            logging.debug("Concatenating pandas dataframes into singular frame for %s data",
-                          dataset_name)
-            self.data[dataset_name] = pandas.concat(frame_combine_list)
-            logging.info("Pandas dataframe combination operation complete for %s data",
-                         dataset_name)
+    def between(self, start_ticks: int, stop_ticks: int) -> Bunch:
+        """Return the rows of the snapshots within a time window
 
-    @property
-    def latest_save(self) -> Save:
-        """Return the chronologically latest save by reading the in-game time of each save
+        Parameters:
+        start_ticks (int): The earliest in-game time of the window, included
+        stop_ticks (int): The latest in-game time of the window, included
+
+        Returns:
+        Bunch: The DataFrame of each dataset, keyed by the dataset name
+        """
+        return self.get_snapshots(*self.tick_index.get_range(start_ticks, stop_ticks))
+
+    def as_of(self, time_ticks: int) -> Bunch:
+        """Return the rows of the latest snapshot at or before a time
+
+        Parameters:
+        time_ticks (int): The in-game time
+
+        Returns:
+        Bunch: The DataFrame of each dataset, keyed by the dataset name, holding the last of the
+            snapshots of the same time if the equal ticks policy keeps them all
+        """
+        position = int(self.tick_index.get_as_of(time_ticks))
+
+        if position < 0:
+            raise KeyError(f"The series has no snapshot at or before {time_ticks} ticks")
+
+        return self.get_snapshots(position, position + 1)
+
+    def nearest(self, time_ticks: int) -> Bunch:
+        """Return the rows of the snapshot closest to a time, the earlier one if tied
+
+        Parameters:
+        time_ticks (int): The in-game time
+
+        Returns:
+        Bunch: The DataFrame of each dataset, keyed by the dataset name, holding the last of the
+            snapshots of the same time if the equal ticks policy keeps them all
+        """
+        position = self.tick_index.get_nearest(time_ticks)
+
+        return self.get_snapshots(position, position + 1)
+
+    def resample(self, interval_ticks: int) -> Bunch:
+        """Return the rows of the latest snapshot as of evenly spaced in-game times
+
+        A snapshot is repeated for each sample until the next snapshot, and skipped if the next
+        snapshot comes before the next sample.
+
+        Parameters:
+        interval_ticks (int): The in-game time between samples, e.g. timeline.TICKS_PER_DAY
+
+        Returns:
+        Bunch: The DataFrame of each dataset, keyed by the dataset name, with the time of the sample
+            of each row in a sample_ticks column
+        """
+        sample_ticks = self.tick_index.get_grid(interval_ticks)
+        positions = self.tick_index.get_as_of(sample_ticks)
+        samples = Bunch()
+
+        for dataset_name in self.save_options["datasets"]:
+            rows, row_counts = self.get_rows(dataset_name, positions)
+            samples[dataset_name] = rows.assign(sample_ticks=numpy.repeat(sample_ticks, row_counts))
+
+        return samples
+
+    def __getstate__(self) -> dict:
+        """Return the state to pickle for the worker processes, which only need the save paths
+
+        The loaded saves, DataFrames and metrics are left out, so sending tasks to the workers stays
+        cheap as the series grows and the workers never attach to the shared columns of the saves.
 
         Parameters:
         None
 
         Returns:
-        Save: The Save object containing the latest sava data
+        dict: The state of the object
         """
-        max_time_value = 0
-        latest_save = None
-        latest_save_name = None
-
-        for save_name, save in self.dictionary.items():
-            current_save = save["save"]
-            current_time_value = current_save.data.game_time_ticks
-            logging.debug("Checking in-game time for save: %s", save_name)
-            logging.debug("save.data.game_time_ticks > max_time_ticks_value == %s",
-                          current_time_value > max_time_value)
-
-            if current_time_value > max_time_value:
-                logging.debug("New max time ticks value identified = %d", current_time_value)
-                max_time_value = current_time_value
-                latest_save = current_save
-                latest_save_name = save_name
+        return {
+            "dictionary": {
+                save_base_name: {"path": save_file_data["path"]}
+                for save_base_name, save_file_data in self.dictionary.items()
+            },
+            "save_options": self.save_options,
+        }
 
-        logging.info("Identified save, %s, as the latest save, with %d ticks", latest_save_name,
-                     max_time_value)
+    def ingest(self, save_paths: list) -> list:
+        """Load new or rewritten save files into the series and aggregate the datasets again
+
+        A rewritten save that fails to load keeps its earlier snapshot in the series, with the
+        failure recorded in the errors property. If loading raises, the series is left as it was.
+
+        Parameters:
+        save_paths (list): The paths of the save files, which replace any saves of the same name
+
+        Returns:
+        list: The base names of the ingested saves
+        """
+        previous_dictionary = dict(self.dictionary)
+        previous_aliases = dict(self.aliases)
+        previous_errors = dict(self.errors)
+        save_base_names = []
+
+        for save_path in save_paths:
+            base_name = os.path.basename(save_path)
+            self.aliases.pop(base_name, None)
+            self.errors.pop(base_name, None)
+            self.dictionary[base_name] = {"path": save_path}
+            save_base_names.append(base_name)
+
+        # The aliases of a rewritten save no longer hold its document, so they are loaded again
+        for alias, save_base_name in list(self.aliases.items()):
+            if save_base_name in save_base_names:
+                del self.aliases[alias]
+                self.dictionary[alias] = {"path": pathlib.Path(self.save_dir_path) / alias}
+
+        logging.info("Ingesting saves: %s", save_base_names)
+
+        try:
+            self.alias_duplicates()
+            self.load_save_data([
+                save_base_name for save_base_name, save_file_data in self.dictionary.items()
+                if "save" not in save_file_data
+            ])
+        except Exception:
+            self.dictionary = previous_dictionary
+            self.aliases = previous_aliases
+            self.errors = previous_errors
+            raise
+
+        # A rewritten save that failed to load keeps its earlier snapshot, with its error recorded
+        for save_base_name in save_base_names:
+            previous_save_file_data = previous_dictionary.get(save_base_name, {})
+
+            if save_base_name in self.errors and "save" in previous_save_file_data:
+                self.dictionary[save_base_name] = previous_save_file_data
+
+        self.alias_superseded()
+        self.aggregate_dataframes()
+
+        return save_base_names
+
+    def is_series_save_file(self, save_path: pathlib.Path) -> bool:
+        """Return True if the file is a save whose name matches save_file_regex_pattern
+
+        Parameters:
+        save_path (pathlib.Path): The path of the file
+
+        Returns:
+        bool: Whether the file belongs to the series
+        """
+        base_name = os.path.basename(save_path)
 
-        return latest_save
+        return base_name.endswith((".rws", ".rws.gz")) \
+            and re.match(self.save_file_regex_pattern, base_name) is not None
 
-    def load_save_data(self) -> None:
+    def load_save_data(self, save_base_names: list = None) -> None:
         """Iterate through the save file list and store each in a Save object
 
         Parameters:
-        None
+        save_base_names (list): The base names of the saves to load, all saves if None
 
         Returns:
         None
         """
-        logging.debug("Creating worker pool")
-
-        with multiprocessing.Pool() as pool:
-            result = pool.map(self.load_save_data_worker_task, list(self.dictionary.keys()))
+        result = list(self.iter_saves(save_base_names))
 
-        logging.info("All work given to the worker pool has been completed (%d tasks)",
-                     len(result))
         logging.debug("result = %s", result)
         logging.debug("Joining results from worker pool tasks")
 
         for save in result:
             self.dictionary[save.data.file_base_name]["save"] = save
+            self.metrics.add_child(save.data.file_base_name, save.data.metrics)
+            self.diagnostics.merge(save.data.diagnostics)
+
+        if self.diagnostics.missing_counts:
+            logging.info("Missing values across the series: %s", self.diagnostics.summarize())
 
         logging.debug("Successfully loaded save data using worker pool")
 
-    def load_save_data_worker_task(self, save_base_name: str) -> Save:
+    def iter_saves(self, save_base_names: list = None) -> iter:
+        """Load saves in worker tasks, yielding each Save as soon as its task completes
+
+        The saves are not stored in the series, so a consumer that drops each save before asking for
+        the next one holds only the saves of the tasks that completed together, usually one.
+
+        Parameters:
+        save_base_names (list): The base names of the saves to load, all saves if None
+
+        Returns:
+        iter: An iterator of the loaded Save objects, in the order their tasks complete
+        """
+        save_base_names = list(self.dictionary) if save_base_names is None else save_base_names
+        cpu_count = os.cpu_count() or 1
+
+        # A single task would leave every other core idle, so a lone save is split across every
+        # core instead, while several saves are loaded a save per task, so no task starts a pool
+        workers = cpu_count if len(save_base_names) == 1 else 1
+        runner = TaskRunner(functools.partial(self.load_save_data_worker_task, workers=workers),
+                            processes=cpu_count // workers, cleanup=release_task_segments,
+                            **self.task_policy)
+        loaded_count = 0
+
+        with self.metrics.span("pool_dispatch", rows=len(save_base_names)):
+            for save_base_name, save in runner.run(save_base_names):
+                # Time reading and unpickling each result in this process, from when it arrives
+                received_time, receive_seconds = runner.receive_times[save_base_name]
+                self.metrics.add_span("ipc", start=received_time, wall_seconds=receive_seconds,
+                                      save=save_base_name)
+                loaded_count += 1
+                yield save
+
+        logging.info("All tasks given to the workers have been completed (%d loaded, %d failed)",
+                     loaded_count, len(runner.failures))
+
+        # Leave the saves that failed to load out of the series, reporting why
+        for save_base_name, failure in runner.failures.items():
+            del self.dictionary[save_base_name]
+            self.errors[save_base_name] = failure
+
+    def load_save_data_worker_task(self, save_base_name: str, workers: int = 1) -> Save:
         """Execute the load operation for a single save file
 
         Parameters:
         save_base_name (str): The base name of the save, which is used as the reference key
+        workers (int): The number of processes extracting partitions of the save, see Save
 
         Returns:
         Save: The loaded Save object
         """
         logging.debug("Worker starting to process save: %s", save_base_name)
         save_path = self.dictionary[save_base_name]["path"]
-        current_save = Save(path_to_save_file=save_path)
-        logging.debug("Worker is finished processing save: %s", save_base_name)
-        logging.debug("Showing current view of self.dictionary.keys() = \n%s",
-                      self.dictionary.keys())
 
-        for key, value in self.dictionary.items():
-            logging.debug("Keys for save, %s: %s", key, value.keys())
+        # The DataFrames are generated in the parent process on first access, so the worker only
+        # extracts the XML data and never has to import pandas
+        current_save = Save(path_to_save_file=save_path, defer_dataframes=True, workers=workers,
+                            **self.save_options)
+
+        # Return the extracted columns through shared memory instead of pickling every value
+        with current_save.data.metrics.span("share"):
+            current_save.data.dataset_columns = SharedColumns(current_save.data.dataset_columns,
+                                                              INTERNED_COLUMNS, NUMERIC_COLUMNS)
+        logging.debug("Worker is finished processing save: %s", save_base_name)
 
         return current_save
 
@@ -443,20 +765,12 @@ class SaveSeries:
         Returns:
         None
         """
-        saves_all = list(wcmatch.pathlib.Path(self.save_dir_path).glob(["*.rws", "*.rws.gz"]))
+        saves_all = list(wcmatch_pathlib.Path(self.save_dir_path).glob(["*.rws", "*.rws.gz"]))
         logging.debug("saves_all = %s", saves_all)
         logging.debug("Using regex pattern for search = %s", self.save_file_regex_pattern)
-
-        for save_path in saves_all:
-            if re.match(self.save_file_regex_pattern, os.path.basename(save_path)):
-                logging.debug("Match found in file base name: %s", os.path.basename(save_path))
-            else:
-                logging.debug("Match NOT found in file base name: %s", os.path.basename(save_path))
-
-        pattern = self.save_file_regex_pattern
-        saves_filtered = [
-            save_path for save_path in saves_all if re.match(pattern, os.path.basename(save_path))
-        ]
+        saves_filtered = sorted(
+            save_path for save_path in saves_all if self.is_series_save_file(save_path)
+        )
         logging.debug("saves_filtered = %s", saves_filtered)
 
         if len(saves_filtered) < 1:
@@ -0,0 +1,405 @@
+"""Define the fields of each dataset of a save, where the fields are extracted from and how the
+extracted columns are completed and transformed into DataFrames
+"""
+
+import functools
+import xml.etree.ElementTree
+
+from save.extraction import FieldExtractor, get_row_count
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+# The paths of child tags of each field, relative to the element matched for each row
+PAWN_EXTRACTOR = FieldExtractor({
+    "pawn_id": "pawnData/pawn",
+    "tale_date": "date",
+    "pawn_name_nick": "pawnData/name/nick",
+    "pawn_name_last": "pawnData/name/last",
+    "pawn_biological_age": "pawnData/age",
+    "pawn_chronological_age": "pawnData/chronologicalAge",
+    "pawn_ambient_temperature": "surroundings/temperature",
+    "pawn_name_first": "pawnData/name/first",
+})
+PLANT_EXTRACTOR = FieldExtractor({
+    "plant_id": "id",
+    "plant_definition": "def",
+    "plant_map_id": "map",
+    "plant_position": "pos",
+    "plant_growth": "growth",
+    "plant_age": "age",
+})
+WEATHER_EXTRACTOR = FieldExtractor({
+    "weather_current": "curWeather",
+    "weather_current_age": "curWeatherAge",
+    "weather_last": "lastWeather",
+})
+ANIMAL_EXTRACTOR = FieldExtractor({
+    "animal_id": "id",
+    "animal_definition": "def",
+    "animal_map_id": "map",
+    "animal_position": "pos",
+    "animal_age_biological_ticks": "ageTracker/ageBiologicalTicks",
+})
+ITEM_EXTRACTOR = FieldExtractor({
+    "item_id": "id",
+    "item_definition": "def",
+    "item_map_id": "map",
+    "item_position": "pos",
+    "item_stack_count": "stackCount",
+    "item_hit_points": "health",
+})
+BUILDING_EXTRACTOR = FieldExtractor({
+    "building_id": "id",
+    "building_definition": "def",
+    "building_map_id": "map",
+    "building_position": "pos",
+    "building_hit_points": "health",
+})
+
+DATASET_NAMES = ["mod", "pawn", "plant", "weather"]
+
+# The datasets of the things on the maps, which are told apart by the Class attribute of each thing
+# element and extracted in the same traversal of the things, see get_element_dataset. The animal,
+# item and building datasets are only extracted when they are asked for.
+THING_EXTRACTORS = {
+    "plant": PLANT_EXTRACTOR,
+    "animal": ANIMAL_EXTRACTOR,
+    "item": ITEM_EXTRACTOR,
+    "building": BUILDING_EXTRACTOR,
+}
+ROW_EXTRACTORS = {"pawn": PAWN_EXTRACTOR, **THING_EXTRACTORS, "weather": WEATHER_EXTRACTOR}
+COLONY_DATASET_NAMES = ["animal", "item", "building"]
+
+# The Class attributes of the things of the item dataset
+ITEM_CLASSES = ("Thing", "ThingWithComps", "Apparel", "Medicine", "MinifiedThing")
+
+# The child element only humanlike pawns hold, e.g. colonists, visitors and modded races such as
+# androids, as animals hold a single name or none. Their other children, e.g. story, skills, guest
+# and royalty, are held by animals too.
+HUMANLIKE_NAME_PATH = "name[@Class='NameTriple']"
+
+# The tags of the other elements holding a row of a dataset each
+ROW_TAG_DATASETS = {"li": "pawn", "weatherManager": "weather"}
+
+# The integer columns of the thing datasets, and how each is aggregated per snapshot
+THING_AGGREGATES = {
+    "animal": {"animal_age_biological_ticks": "mean"},
+    "item": {"item_stack_count": "sum", "item_hit_points": "mean"},
+    "building": {"building_hit_points": "mean"},
+}
+
+# The datasets summarizing the plant rows in bounded memory instead of keeping each row, see
+# save.sketch, and the datasets of the approximate mode, which uses them in place of the plant rows
+PLANT_SKETCH_DATASETS = ["plant_species", "plant_growth", "plant_sample"]
+APPROXIMATE_DATASET_NAMES = ["mod", "pawn", *PLANT_SKETCH_DATASETS, "weather"]
+
+# The columns of each dataset that a series stores as integer codes into its intern tables
+INTERNED_COLUMNS = {
+    "pawn": ["pawn_id"],
+    "plant": ["plant_id", "plant_definition"],
+    "plant_species": ["plant_definition"],
+    "plant_sample": ["plant_id", "plant_definition"],
+    "animal": ["animal_id", "animal_definition"],
+    "item": ["item_id", "item_definition"],
+    "building": ["building_id", "building_definition"],
+}
+
+# The numeric columns of each dataset and the NumPy type each is parsed into from its text, as soon
+# as the columns leave the extraction. Missing values are NaN in a float64 column, and an int64
+# column becomes a nullable Int64 column of the DataFrames.
+NUMERIC_COLUMNS = {
+    "pawn": {"tale_date": "int64"},
+    "plant": {"plant_growth": "float64", "plant_age": "int64"},
+    "plant_species": {"plant_count": "int64"},
+    "plant_growth": {"plant_growth_bin": "int64", "plant_count": "int64"},
+    "plant_sample": {"plant_growth": "float64", "plant_age": "int64"},
+    "weather": {"weather_current_age": "int64"},
+    "animal": {"animal_age_biological_ticks": "int64"},
+    "item": {"item_stack_count": "int64", "item_hit_points": "int64"},
+    "building": {"building_hit_points": "int64"},
+}
+
+# The columns of each dataset that snapshots are compared on, see save.diff, starting with the key
+# identifying a row of the dataset
+DIFF_COLUMNS = {
+    "mod": ["mod_id", "mod_name", "mod_steam_id"],
+    "pawn": PAWN_EXTRACTOR.column_names,
+    "weather": ["weather_map_id", *WEATHER_EXTRACTOR.column_names],
+    "plant_species": ["plant_definition", "plant_count"],
+    "plant_growth": ["plant_growth_bin", "plant_count"],
+    **{
+        dataset_name: extractor.column_names
+        for dataset_name, extractor in THING_EXTRACTORS.items()
+    },
+}
+
+# The edges of the plant growth percentage bins, each labeled by its upper edge
+PLANT_GROWTH_BINS = range(0, 101, 5)
+
+# The elements the streaming path extracts each dataset from, as lists of (tag, Class attribute
+# value) tuples, besides the meta and tickManager elements holding the game version and time. The
+# buildings have too many classes to list, including those of mods, so every thing is streamed.
+STREAM_TARGETS = {
+    "mod": [("meta", None)],
+    "pawn": [("li", "Tale_SinglePawn")],
+    "plant": [("thing", "Plant")],
+    "weather": [("weatherManager", None)],
+    "animal": [("thing", "Pawn")],
+    "item": [("thing", class_name) for class_name in ITEM_CLASSES],
+    "building": [("thing", None)],
+}
+
+
+def get_extracted_dataset_names(dataset_names: list) -> list:
+    """Return the datasets extracted from the document to produce the given datasets
+
+    Parameters:
+    dataset_names (list): The names of the datasets
+
+    Returns:
+    list: The dataset names in order, with the plant dataset in place of the plant sketch datasets
+    """
+    return list(dict.fromkeys(
+        "plant" if dataset_name in PLANT_SKETCH_DATASETS else dataset_name
+        for dataset_name in dataset_names
+    ))
+
+
+@functools.lru_cache(maxsize=None)
+def get_thing_dataset(class_name: str) -> str:
+    """Return the dataset of a thing given its Class attribute
+
+    Parameters:
+    class_name (str): The Class attribute of the thing element, or None
+
+    Returns:
+    str: The name of the dataset, or None if the thing belongs to none, e.g. filth or rock
+    """
+    if class_name == "Plant":
+        return "plant"
+
+    if class_name == "Pawn":
+        return "animal"
+
+    if class_name in ITEM_CLASSES:
+        return "item"
+
+    # Building classes may be namespaced by a mod, e.g. Rimefeller.Building_Pipe
+    if (class_name or "").rpartition(".")[2].startswith("Building"):
+        return "building"
+
+    return None
+
+
+def get_element_dataset(element: xml.etree.ElementTree.Element) -> str:
+    """Return the dataset an element holds a row of
+
+    Parameters:
+    element (xml.etree.ElementTree.Element): A thing element, or another element of ROW_TAG_DATASETS
+
+    Returns:
+    str: The name of the dataset, or None if the element belongs to none
+    """
+    if element.tag != "thing":
+        return ROW_TAG_DATASETS.get(element.tag)
+
+    dataset_name = get_thing_dataset(element.get("Class"))
+
+    if dataset_name == "animal" and element.find(HUMANLIKE_NAME_PATH) is not None:
+        return None
+
+    return dataset_name
+
+
+def add_pawn_name_full(pawn_data: dict) -> dict:
+    """Add the full name column, combining the first, nick and last names, to the pawn data
+
+    Parameters:
+    pawn_data (dict): The list of values of each column of pawn data, keyed by column name
+
+    Returns:
+    dict: The pawn data, with the pawn_name_full column added
+    """
+    pawn_data["pawn_name_full"] = [
+        f"{first} \"{nick}\" {last}" for first, nick, last in zip(
+            pawn_data["pawn_name_first"], pawn_data["pawn_name_nick"],
+            pawn_data["pawn_name_last"])
+    ]
+
+    return pawn_data
+
+
+def add_weather_map_id(weather_data: dict) -> dict:
+    """Add the map of each row of weather data, which is the position of the map in the save
+
+    Parameters:
+    weather_data (dict): The list of values of each column of weather data, one row per map
+
+    Returns:
+    dict: The columns of weather data with the weather_map_id column added
+    """
+    weather_data["weather_map_id"] = [str(index) for index in range(get_row_count(weather_data))]
+
+    return weather_data
+
+
+def parse_numeric_column(values: list, dtype: str) -> "numpy.ma.MaskedArray":
+    """Return the values of a numeric column, extracted as text, as a masked NumPy array
+
+    Only NumPy is needed, so worker processes parse their columns without importing pandas.
+
+    Parameters:
+    values (list): The values of the column, strings or None
+    dtype (str): The NumPy data type of the column, see NUMERIC_COLUMNS
+
+    Returns:
+    numpy.ma.MaskedArray: The values, masking the missing values, which are stored as NaN in a
+        float64 array and as 0 in an int64 array
+    """
+    if None in values:
+        values = [numpy.nan if value is None else value for value in values]
+
+    array = numpy.array(values, dtype=numpy.float64)
+    mask = numpy.isnan(array)
+
+    if dtype != "float64":
+        array = numpy.where(mask, 0, array).astype(dtype)
+
+    return numpy.ma.MaskedArray(array, mask)
+
+
+def get_numeric_column(values: object, dtype: str) -> object:
+    """Return a numeric column as the array of a DataFrame column, parsing it if it is text
+
+    Parameters:
+    values (object): The values, as a list of strings or None, or as a masked array, see
+        parse_numeric_column
+    dtype (str): The NumPy data type of the column, see NUMERIC_COLUMNS
+
+    Returns:
+    object: The float64 NumPy array of the values, or the nullable integer array of the values,
+        which wraps the arrays of the values and mask without copying them
+    """
+    if not isinstance(values, numpy.ma.MaskedArray):
+        values = parse_numeric_column(values, dtype)
+
+    if dtype == "float64":
+        return values.data
+
+    return pandas.arrays.IntegerArray(values.data, numpy.ma.getmaskarray(values))
+
+
+def get_game_time(tick_manager: xml.etree.ElementTree.Element) -> dict:
+    """Return the in-game time of a save and the absolute tick its game started at
+
+    Parameters:
+    tick_manager (xml.etree.ElementTree.Element): The tickManager element of the save
+
+    Returns:
+    dict: The game_time_ticks and game_start_ticks, which is 0 if the save does not record it
+    """
+    return {
+        "game_time_ticks": int(tick_manager.find("ticksGame").text),
+        "game_start_ticks": int(tick_manager.findtext("gameStartAbsTick", "0")),
+    }
+
+
+def transform_pawn(dataframe: "pandas.core.frame.DataFrame",
+                   save_keys: "numpy.ndarray" = None) -> None:
+    """Apply transformations to a pawn DataFrame, of a single save or of a series of saves
+
+    Parameters:
+    dataframe (pandas.core.frame.DataFrame): The pawn DataFrame, which is changed in place
+    save_keys (numpy.ndarray): The position of the save each row comes from, or None if the rows all
+        come from one save, so that the current record of each pawn is determined per save
+
+    Returns:
+    None
+    """
+    # Convert the tale_date column from a string to an integer
+    dataframe["tale_date_integer"] = dataframe["tale_date"].astype(int)
+    dataframe.drop(columns=["tale_date"])
+    dataframe.rename(columns={"tale_date_integer": "tale_date"})
+
+    # Determine the current record (latest chronological) for each unique pawn
+    group_keys = ["pawn_id"] if save_keys is None else [save_keys, dataframe["pawn_id"]]
+    dataframe["tale_date_max"] = dataframe.groupby(group_keys, observed=True)["tale_date"]\
+        .transform(max)
+    dataframe["current_record"] = dataframe["tale_date_max"] == dataframe["tale_date"]
+    dataframe["is_humanoid_colonist"] = dataframe["pawn_id"].str.contains("Thing_Android")
+
+
+def transform_plant(dataframe: "pandas.core.frame.DataFrame") -> None:
+    """Transform a plant DataFrame by adding calculated columns
+
+    Parameters:
+    dataframe (pandas.core.frame.DataFrame): The plant DataFrame, which is changed in place
+
+    Returns:
+    None
+    """
+    # Create a column by converting plant_growth to a float and multiplying it by 100
+    dataframe["plant_growth_percentage"] = dataframe["plant_growth"].astype(float) * 100
+
+    # Bin the percentage values in ranges for visualization and summarized reporting
+    dataframe["plant_growth_bin"] = pandas.cut(dataframe["plant_growth_percentage"],
+                                               PLANT_GROWTH_BINS, labels=PLANT_GROWTH_BINS[1:])
+
+
+def transform_plant_sketch(dataframe: "pandas.core.frame.DataFrame", dataset_name: str) -> None:
+    """Transform a DataFrame of a plant sketch dataset, converting the counts from text
+
+    Parameters:
+    dataframe (pandas.core.frame.DataFrame): The DataFrame, which is changed in place
+    dataset_name (str): The name of the dataset, one of PLANT_SKETCH_DATASETS
+
+    Returns:
+    None
+    """
+    if dataset_name == "plant_sample":
+        transform_plant(dataframe)
+        return
+
+    for column_name in ["plant_growth_bin", "plant_count"]:
+        if column_name in dataframe.columns:
+            dataframe[column_name] = dataframe[column_name].astype("int64")
+
+
+def transform_thing(dataframe: "pandas.core.frame.DataFrame", dataset_name: str) -> None:
+    """Transform a DataFrame of an animal, item or building dataset, converting its integer columns
+
+    Parameters:
+    dataframe (pandas.core.frame.DataFrame): The DataFrame, which is changed in place
+    dataset_name (str): The name of the dataset, one of COLONY_DATASET_NAMES
+
+    Returns:
+    None
+    """
+    for column_name in THING_AGGREGATES[dataset_name]:
+        dataframe[column_name] = pandas.to_numeric(dataframe[column_name]).astype("Int64")
+
+
+def get_thing_aggregates(dataframe: "pandas.core.frame.DataFrame",
+                         dataset_name: str) -> "pandas.core.frame.DataFrame":
+    """Return the number of things of each definition in each snapshot, with their totals
+
+    Parameters:
+    dataframe (pandas.core.frame.DataFrame): The DataFrame of a thing dataset, of a save or series
+    dataset_name (str): The name of the dataset, one of THING_EXTRACTORS
+
+    Returns:
+    pandas.core.frame.DataFrame: The time_ticks, the definition and the count of each definition
+        in each snapshot, plus the sum or mean of each integer column, see THING_AGGREGATES
+    """
+    definition_column = f"{dataset_name}_definition"
+    aggregations = {f"{dataset_name}_count": (f"{dataset_name}_id", "count")}
+    aggregations.update({
+        column_name: (column_name, function)
+        for column_name, function in THING_AGGREGATES.get(dataset_name, {}).items()
+    })
+
+    return dataframe.groupby(["time_ticks", definition_column], observed=True)\
+        .agg(**aggregations)\
+        .reset_index()
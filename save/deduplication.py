@@ -0,0 +1,152 @@
+"""Find save files of a series that hold the same snapshot, so each snapshot is parsed only once
+
+Copies of a save, and saves written again without the game advancing, hold identical documents.
+Hashing every file would read and decompress each of them twice, so files are first grouped by the
+size of their document, which is cheap to probe: the size of a plain save file, or the size stored
+in the trailer of a gzip compressed one. Only the files sharing a size are hashed, which compares
+their decompressed documents exactly, whatever the compression settings or gzip headers.
+
+Saves with different documents but the same in-game time, such as a save written again after a
+setting changed, are separate files of the same snapshot, and are handled under one of the
+EQUAL_TICKS_POLICIES once their time is known.
+"""
+
+import gzip
+import hashlib
+import os
+import struct
+
+# Keep every save, or only the most recently or least recently modified save, of a snapshot time
+EQUAL_TICKS_POLICIES = ("keep_all", "keep_newest", "keep_oldest")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_document_size(save_path: str) -> int:
+    """Return the size of the XML document of a save file without decompressing it
+
+    Parameters:
+    save_path (str): The path to the save file
+
+    Returns:
+    int: The size of the document in bytes, modulo 2 ** 32 for gzip compressed files, or None if
+        the file cannot be read, e.g. a gzip file shorter than its trailer left by a killed autosave
+    """
+    if os.path.splitext(save_path)[1] != ".gz":
+        return os.path.getsize(save_path)
+
+    # The last 4 bytes of a gzip file hold the size of the uncompressed data
+    try:
+        with open(save_path, "rb") as save_file:
+            save_file.seek(-4, os.SEEK_END)
+
+            return struct.unpack("<I", save_file.read(4))[0]
+    except OSError:
+        return None
+
+
+def get_document_digest(save_path: str) -> str:
+    """Return a digest of the XML document of a save file, decompressing it if needed
+
+    Parameters:
+    save_path (str): The path to the save file
+
+    Returns:
+    str: The hexadecimal BLAKE2b digest of the document, or None if the file cannot be read, e.g.
+        a truncated gzip file, which is left to fail when the save is loaded
+    """
+    digest = hashlib.blake2b()
+    open_function = gzip.open if os.path.splitext(save_path)[1] == ".gz" else open
+
+    try:
+        with open_function(save_path, "rb") as save_file:
+            for chunk in iter(lambda: save_file.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except (EOFError, OSError):
+        return None
+
+    return digest.hexdigest()
+
+
+def find_duplicates(dictionary: dict) -> dict:
+    """Return the saves whose document is identical to that of an earlier save in the dictionary
+
+    The probed size and digest of each save are cached in its entry of the dictionary.
+
+    Parameters:
+    dictionary (dict): The entry of each save, holding its path, keyed by the save's base name
+
+    Returns:
+    dict: The base name of the earlier save holding the same document, keyed by the base name of
+        each duplicate save
+    """
+    sizes = {}
+
+    for save_base_name, save_file_data in dictionary.items():
+        if "document_size" not in save_file_data:
+            save_file_data["document_size"] = get_document_size(save_file_data["path"])
+
+        # A save that cannot be read is never a duplicate, and fails when its task loads it
+        if save_file_data["document_size"] is not None:
+            sizes.setdefault(save_file_data["document_size"], []).append(save_base_name)
+
+    duplicates = {}
+
+    for save_base_names in sizes.values():
+        if len(save_base_names) < 2:
+            continue
+
+        digests = {}
+
+        for save_base_name in save_base_names:
+            save_file_data = dictionary[save_base_name]
+
+            if "document_digest" not in save_file_data:
+                save_file_data["document_digest"] = get_document_digest(save_file_data["path"])
+
+            digest = save_file_data["document_digest"]
+
+            # A save that cannot be read is never a duplicate of another save
+            if digest is None:
+                continue
+
+            duplicates_of = digests.setdefault(digest, save_base_name)
+
+            if duplicates_of != save_base_name:
+                duplicates[save_base_name] = duplicates_of
+
+    return duplicates
+
+
+def find_superseded(dictionary: dict, policy: str) -> dict:
+    """Return the loaded saves that the policy drops because another save has the same time
+
+    Parameters:
+    dictionary (dict): The entry of each save, holding its path and loaded Save object, keyed by
+        the save's base name
+    policy (str): How saves with the same in-game time are handled, see EQUAL_TICKS_POLICIES
+
+    Returns:
+    dict: The base name of the save that is kept instead, keyed by the base name of each dropped
+        save
+    """
+    assert policy in EQUAL_TICKS_POLICIES
+
+    if policy == "keep_all":
+        return {}
+
+    snapshots = {}
+
+    for save_base_name, save_file_data in dictionary.items():
+        game_time_ticks = save_file_data["save"].data.game_time_ticks
+        snapshots.setdefault(game_time_ticks, []).append(save_base_name)
+
+    superseded = {}
+
+    for save_base_names in snapshots.values():
+        # Order the saves of the snapshot from the least to the most recently modified
+        save_base_names = sorted(save_base_names, key=lambda save_base_name: (
+            os.path.getmtime(dictionary[save_base_name]["path"]), save_base_name))
+        kept_save_base_name = save_base_names.pop(-1 if policy == "keep_newest" else 0)
+        superseded.update(dict.fromkeys(save_base_names, kept_save_base_name))
+
+    return superseded
@@ -0,0 +1,90 @@
+"""Tally values missing from the XML data and sample the XML of the affected elements on demand"""
+
+import logging
+import xml.etree.ElementTree
+
+# Sampled XML dumps of elements with missing values are only emitted on this logger, and only when
+# it is enabled for the DEBUG level, e.g. logging.getLogger("save.xml_dump").setLevel("DEBUG")
+XML_DUMP_LOGGER = logging.getLogger("save.xml_dump")
+XML_DUMP_SAMPLE_SIZE = 5
+
+
+def get_xml_content_dump(parent_element: xml.etree.ElementTree.Element) -> str:
+    """Return the tag, attributes and text of each child of an element, one child per line
+
+    Parameters:
+    parent_element (xml.etree.ElementTree.Element): The element whose children are dumped
+
+    Returns:
+    str: The XML content dump
+    """
+    return "".join(
+        f"<{child.tag} {{attribs = {child.attrib}}}>{child.text}</{child.tag}>\n"
+        for child in parent_element
+    )
+
+
+class Diagnostics:
+    """Count the missing values of each dataset and column extracted from a save"""
+    def __init__(self) -> None:
+        """Initialize the Diagnostics object with no missing values counted
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.dataset_name = None
+        self.missing_counts = {}
+        self.dump_enabled = XML_DUMP_LOGGER.isEnabledFor(logging.DEBUG)
+
+    def record_missing(self, column_name: str, parent_element: xml.etree.ElementTree.Element,
+                       count: int = 1) -> None:
+        """Count a missing value in the current dataset, dumping a sample of the XML if enabled
+
+        Parameters:
+        column_name (str): The name of the column the value is missing from
+        parent_element (xml.etree.ElementTree.Element): The element the value was expected in
+        count (int): The number of missing values to add to the tally
+
+        Returns:
+        None
+        """
+        key = (self.dataset_name, column_name)
+        total = self.missing_counts.get(key, 0) + count
+        self.missing_counts[key] = total
+
+        if self.dump_enabled and total <= XML_DUMP_SAMPLE_SIZE and parent_element is not None:
+            XML_DUMP_LOGGER.debug("XML content with undefined %s (sample %d of at most %d)\n%s",
+                                  column_name, total, XML_DUMP_SAMPLE_SIZE,
+                                  get_xml_content_dump(parent_element))
+
+    def merge(self, other: "Diagnostics") -> None:
+        """Add the missing value tallies of another Diagnostics object to this one
+
+        Parameters:
+        other (Diagnostics): The Diagnostics object to merge, e.g. that of one save in a series
+
+        Returns:
+        None
+        """
+        for key, count in other.missing_counts.items():
+            self.missing_counts[key] = self.missing_counts.get(key, 0) + count
+
+    def summarize(self) -> dict:
+        """Return the missing value counts nested by dataset name and then column name
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The count of missing values of each column of each dataset
+        """
+        summary = {}
+
+        for (dataset_name, column_name), count in sorted(self.missing_counts.items(),
+                                                         key=lambda item: str(item[0])):
+            summary.setdefault(dataset_name, {})[column_name] = count
+
+        return summary
@@ -0,0 +1,193 @@
+"""Compare the datasets of two snapshots, listing the rows added, removed and changed between them
+
+The rows of each dataset are identified by a key column, e.g. plant_id, whose values are coded with
+integers and sorted, so the rows of both snapshots are matched by a merge of two sorted integer
+arrays instead of a join on strings. The snapshots of a series already hold the interned columns as
+codes into the same intern table, which are used as is, and the DataFrames a save has generated are
+reused, so comparing saves never parses them again.
+
+A row whose key is missing can not be matched and is left out, and a key found in several rows of a
+snapshot, e.g. a pawn with many tales, is compared on its last row, after the pawn rows are reduced
+to the current record of each pawn. The weather transitions of a map are the changes of its
+weather_current column, and a mod is added or removed when its mod_id is.
+"""
+
+from bunch import Bunch
+
+from save.datasets import DIFF_COLUMNS
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+CHANGE_COLUMNS = ("column_name", "before", "after")
+
+
+def is_coded_alike(before: "pandas.core.series.Series", after: "pandas.core.series.Series") -> bool:
+    """Return True if two columns are categorical with the same categories, so their codes compare
+
+    Parameters:
+    before (pandas.core.series.Series): The column of the earlier snapshot
+    after (pandas.core.series.Series): The column of the later snapshot
+
+    Returns:
+    bool: Whether the codes of both columns stand for the same values
+    """
+    return isinstance(before.dtype, pandas.CategoricalDtype) \
+        and isinstance(after.dtype, pandas.CategoricalDtype) \
+        and before.cat.categories.equals(after.cat.categories)
+
+
+def get_key_codes(before: "pandas.core.series.Series", after: "pandas.core.series.Series") -> tuple:
+    """Return integer codes of the keys of two snapshots, equal for equal keys
+
+    Parameters:
+    before (pandas.core.series.Series): The key column of the earlier snapshot
+    after (pandas.core.series.Series): The key column of the later snapshot
+
+    Returns:
+    tuple: The code of each row of each snapshot, or -1 for a missing key
+    """
+    if is_coded_alike(before, after):
+        return before.cat.codes.to_numpy(), after.cat.codes.to_numpy()
+
+    codes, _ = pandas.factorize(numpy.concatenate([before.to_numpy(dtype=object),
+                                                   after.to_numpy(dtype=object)]))
+
+    return codes[:len(before.index)], codes[len(before.index):]
+
+
+def get_sorted_keys(codes: "numpy.ndarray") -> tuple:
+    """Return the distinct keys of a snapshot in order, and the last row of each
+
+    Parameters:
+    codes (numpy.ndarray): The key code of each row, or -1 for a missing key
+
+    Returns:
+    tuple: The sorted array of distinct key codes, and the position of the last row of each key
+    """
+    order = numpy.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    is_last = numpy.append(sorted_codes[1:] != sorted_codes[:-1], True) & (sorted_codes >= 0)
+
+    return sorted_codes[is_last], order[is_last]
+
+
+def match_keys(before_codes: "numpy.ndarray", after_codes: "numpy.ndarray") -> tuple:
+    """Match the rows of two snapshots by key, merging their sorted key codes
+
+    Parameters:
+    before_codes (numpy.ndarray): The key code of each row of the earlier snapshot
+    after_codes (numpy.ndarray): The key code of each row of the later snapshot
+
+    Returns:
+    tuple: The positions of the removed rows of the earlier snapshot, of the added rows of the later
+        snapshot, and of the rows of each snapshot whose key is in both, in the same order
+    """
+    before_keys, before_rows = get_sorted_keys(before_codes)
+    after_keys, after_rows = get_sorted_keys(after_codes)
+    positions = numpy.searchsorted(after_keys, before_keys)
+    matched = positions < len(after_keys)
+    matched[matched] = after_keys[positions[matched]] == before_keys[matched]
+    kept = numpy.zeros(len(after_keys), dtype=bool)
+    kept[positions[matched]] = True
+
+    return before_rows[~matched], after_rows[~kept], before_rows[matched], \
+        after_rows[positions[matched]]
+
+
+def get_changed_rows(before: "pandas.core.series.Series", after: "pandas.core.series.Series") -> \
+        "numpy.ndarray":
+    """Return whether the value of each pair of matched rows differs, a missing value equal to one
+
+    Parameters:
+    before (pandas.core.series.Series): The values of the matched rows of the earlier snapshot
+    after (pandas.core.series.Series): The values of the matched rows of the later snapshot
+
+    Returns:
+    numpy.ndarray: Whether each value changed
+    """
+    if is_coded_alike(before, after):
+        return before.cat.codes.to_numpy() != after.cat.codes.to_numpy()
+
+    before_missing = before.isna().to_numpy()
+    after_missing = after.isna().to_numpy()
+    changed = before_missing != after_missing
+    present = ~(before_missing | after_missing)
+    changed[present] = before.to_numpy(dtype=object)[present] != \
+        after.to_numpy(dtype=object)[present]
+
+    return changed
+
+
+def get_diff_rows(dataset_name: str, dataframe: "pandas.core.frame.DataFrame") -> \
+        "pandas.core.frame.DataFrame":
+    """Return the rows of a dataset that are compared, the current record of each pawn for pawns
+
+    Parameters:
+    dataset_name (str): The name of the dataset
+    dataframe (pandas.core.frame.DataFrame): The DataFrame of the dataset of a snapshot
+
+    Returns:
+    pandas.core.frame.DataFrame: The rows to compare
+    """
+    if dataset_name == "pawn":
+        return dataframe[dataframe["current_record"].to_numpy(dtype=bool)]
+
+    return dataframe
+
+
+def diff_dataset(dataset_name: str, before: "pandas.core.frame.DataFrame",
+                 after: "pandas.core.frame.DataFrame") -> Bunch:
+    """Return the rows of a dataset added, removed and changed between two snapshots
+
+    Parameters:
+    dataset_name (str): The name of the dataset, one of DIFF_COLUMNS
+    before (pandas.core.frame.DataFrame): The DataFrame of the dataset of the earlier snapshot
+    after (pandas.core.frame.DataFrame): The DataFrame of the dataset of the later snapshot
+
+    Returns:
+    Bunch: The added rows of the later snapshot, the removed rows of the earlier snapshot, and the
+        changed values, with the key, column_name, and the values before and after of each change
+    """
+    key, *column_names = DIFF_COLUMNS[dataset_name]
+    before = get_diff_rows(dataset_name, before)
+    after = get_diff_rows(dataset_name, after)
+    removed, added, before_rows, after_rows = match_keys(*get_key_codes(before[key], after[key]))
+    keys = after[key].iloc[after_rows].to_numpy(dtype=object)
+    changes = []
+
+    for column_name in column_names:
+        before_values = before[column_name].iloc[before_rows]
+        after_values = after[column_name].iloc[after_rows]
+        changed = get_changed_rows(before_values, after_values)
+        changes.append(pandas.DataFrame({
+            key: keys[changed],
+            "column_name": column_name,
+            "before": before_values.to_numpy(dtype=object)[changed],
+            "after": after_values.to_numpy(dtype=object)[changed],
+        }, columns=[key, *CHANGE_COLUMNS]))
+
+    return Bunch(
+        added=after.iloc[numpy.sort(added)],
+        removed=before.iloc[numpy.sort(removed)],
+        changed=pandas.concat(changes, ignore_index=True),
+    )
+
+
+def diff_snapshots(before: dict, after: dict) -> Bunch:
+    """Return the changes of each dataset that both snapshots hold and that can be compared
+
+    Parameters:
+    before (dict): The DataFrame of each dataset of the earlier snapshot, keyed by the dataset name,
+        e.g. a Bunch returned by SaveSeries.as_of
+    after (dict): The DataFrame of each dataset of the later snapshot, keyed by the dataset name
+
+    Returns:
+    Bunch: The changes of each dataset, see diff_dataset, keyed by the dataset name
+    """
+    return Bunch({
+        dataset_name: diff_dataset(dataset_name, before[dataset_name], after[dataset_name])
+        for dataset_name in before
+        if dataset_name in after and dataset_name in DIFF_COLUMNS
+    })
@@ -0,0 +1,277 @@
+"""Export the datasets of a series of saves to a file per dataset, writing each save as it loads
+
+Each save is written as soon as its worker task completes and is then dropped, so the rows of the
+series are never concatenated and exporting an archive of hundreds of saves holds about one save at
+a time. The formats are:
+    parquet: A Parquet file per dataset, with a row group per snapshot
+    arrow: An Arrow IPC file per dataset, with a record batch per snapshot
+    csv: A CSV file per dataset, the fallback when pyarrow is not installed
+
+The text columns of the Parquet and Arrow files, e.g. IDs and definitions, are dictionary encoded.
+The schema of each file is taken from the column types of the first snapshot with rows, rather than
+from its values: the extracted columns, which are objects or categoricals of text, are always text,
+even when a snapshot holds no value of them, and the transformed columns keep their numeric types.
+Snapshots without rows that come before it are written once the schema is known. The snapshots are
+written in
+the order their saves finish loading, and the saves of the same time are all exported, as the equal
+ticks policy of the series needs every save loaded to choose one.
+"""
+
+import argparse
+import importlib.util
+import logging
+import pathlib
+
+from save import SaveSeries
+from save.lazy_import import lazy_import
+
+pandas = lazy_import("pandas")
+pyarrow = lazy_import("pyarrow") if importlib.util.find_spec("pyarrow") else None
+pyarrow_ipc = lazy_import("pyarrow.ipc") if pyarrow else None
+pyarrow_parquet = lazy_import("pyarrow.parquet") if pyarrow else None
+
+FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+
+def get_export_format(export_format: str = "auto") -> str:
+    """Return the name of an export format, using Parquet for auto when pyarrow is installed
+
+    Parameters:
+    export_format (str): The name of the format: auto, parquet, arrow or csv
+
+    Returns:
+    str: The name of the format
+    """
+    if export_format == "auto":
+        return "csv" if pyarrow is None else "parquet"
+
+    if export_format not in FILE_EXTENSIONS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    if export_format != "csv" and pyarrow is None:
+        raise ValueError(f"The {export_format} export format requires pyarrow")
+
+    return export_format
+
+
+def is_text_column(column: "pandas.core.series.Series") -> bool:
+    """Return True if a column is typed as text, or categories of text, whatever its values
+
+    Parameters:
+    column (pandas.core.series.Series): The column
+
+    Returns:
+    bool: Whether the column is exported as dictionary encoded text
+    """
+    dtype = column.cat.categories.dtype if isinstance(column.dtype, pandas.CategoricalDtype) \
+        else column.dtype
+
+    return pandas.api.types.is_string_dtype(dtype)
+
+
+def get_schema(dataframe: "pandas.core.frame.DataFrame") -> "pyarrow.Schema":
+    """Return the schema of the export file of a dataset, given the DataFrame of a snapshot
+
+    Text columns are dictionary encoded with the same index type in every snapshot, and the other
+    columns keep the type of their dtype, so later snapshots are cast to the same types.
+
+    Parameters:
+    dataframe (pandas.core.frame.DataFrame): The DataFrame of a snapshot of the dataset
+
+    Returns:
+    pyarrow.Schema: The schema
+    """
+    text_type = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+
+    return pyarrow.schema([
+        field.with_type(text_type) if is_text_column(dataframe[field.name]) else field
+        for field in pyarrow.Schema.from_pandas(dataframe, preserve_index=False)
+    ])
+
+
+class ExportWriter:
+    """Append the rows of each snapshot of each dataset to the export file of the dataset"""
+    def __init__(self, output_dir_path: pathlib.Path, export_format: str = "auto") -> None:
+        """Initialize the ExportWriter object, which opens the file of a dataset on its first write
+
+        Parameters:
+        output_dir_path (pathlib.Path): The directory to write the files to, which is created if
+            needed
+        export_format (str): The name of the format, see get_export_format
+
+        Returns:
+        None
+        """
+        self.output_dir_path = pathlib.Path(output_dir_path)
+        self.export_format = get_export_format(export_format)
+        self.paths = {}
+        self.schemas = {}
+        self.writers = {}
+        self.pending = {}
+        self.output_dir_path.mkdir(parents=True, exist_ok=True)
+
+    def open(self, dataset_name: str, dataframe: "pandas.core.frame.DataFrame") -> None:
+        """Open the Parquet or Arrow IPC file of a dataset, writing the snapshots held back so far
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        dataframe (pandas.core.frame.DataFrame): The DataFrame of the snapshot giving the schema,
+            the first one with rows if there is any
+
+        Returns:
+        None
+        """
+        schema = self.schemas[dataset_name] = get_schema(dataframe)
+        path = self.paths[dataset_name]
+        self.writers[dataset_name] = pyarrow_parquet.ParquetWriter(path, schema) \
+            if self.export_format == "parquet" else pyarrow_ipc.new_file(path, schema)
+
+        for pending_dataframe in self.pending.pop(dataset_name, []):
+            self.write_table(dataset_name, pending_dataframe)
+
+    def write_table(self, dataset_name: str, dataframe: "pandas.core.frame.DataFrame") -> None:
+        """Append the rows of a snapshot to the open file of a dataset, cast to its schema
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        dataframe (pandas.core.frame.DataFrame): The DataFrame of the snapshot
+
+        Returns:
+        None
+        """
+        table = pyarrow.Table.from_pandas(dataframe, schema=self.schemas[dataset_name],
+                                          preserve_index=False)
+
+        # Each snapshot is a row group, or a record batch, of its own
+        if self.export_format == "parquet":
+            self.writers[dataset_name].write_table(table, row_group_size=max(table.num_rows, 1))
+        else:
+            self.writers[dataset_name].write_table(table)
+
+    def write(self, dataset_name: str, dataframe: "pandas.core.frame.DataFrame") -> None:
+        """Append the rows of a snapshot of a dataset to its file
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        dataframe (pandas.core.frame.DataFrame): The DataFrame of the snapshot
+
+        Returns:
+        None
+        """
+        is_first = dataset_name not in self.paths
+
+        if is_first:
+            self.paths[dataset_name] = self.output_dir_path \
+                / f"{dataset_name}{FILE_EXTENSIONS[self.export_format]}"
+
+        if self.export_format == "csv":
+            dataframe.to_csv(self.paths[dataset_name], mode="w" if is_first else "a",
+                             header=is_first, index=False)
+            return
+
+        if dataset_name in self.writers:
+            self.write_table(dataset_name, dataframe)
+        elif dataframe.index.empty:
+            # The dtypes of a snapshot without rows may not be those of the dataset
+            self.pending.setdefault(dataset_name, []).append(dataframe)
+        else:
+            self.open(dataset_name, dataframe)
+            self.write_table(dataset_name, dataframe)
+
+    def close(self) -> None:
+        """Finish the Parquet and Arrow IPC files, writing their footers
+
+        The file of a dataset whose snapshots all lack rows takes its schema from the first one.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        for dataset_name, dataframes in list(self.pending.items()):
+            self.open(dataset_name, dataframes[0])
+
+        for writer in self.writers.values():
+            writer.close()
+
+        self.writers.clear()
+
+
+def export_series(series: SaveSeries, output_dir_path: pathlib.Path,
+                  export_format: str = "auto") -> dict:
+    """Load each save of a series and write its datasets to the export files, one save at a time
+
+    Parameters:
+    series (SaveSeries): The series, e.g. created with aggregate set to False to only find its saves
+    output_dir_path (pathlib.Path): The directory to write the file of each dataset to
+    export_format (str): The name of the format, see get_export_format
+
+    Returns:
+    dict: The path of the file of each dataset, keyed by the dataset name
+    """
+    writer = ExportWriter(output_dir_path, export_format)
+
+    try:
+        for save in series.iter_saves():
+            for dataset_name in series.save_options["datasets"]:
+                writer.write(dataset_name, save.data[dataset_name])
+
+            logging.info("Exported save: %s", save.data.file_base_name)
+    finally:
+        writer.close()
+
+    return writer.paths
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    """Return the parser of the command line arguments of the export
+
+    Parameters:
+    None
+
+    Returns:
+    argparse.ArgumentParser: The argument parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m save.export",
+        description="Export the datasets of a series of RimWorld saves to a file per dataset")
+    parser.add_argument("save_dir_path", metavar="DIRECTORY", help="The directory of the saves")
+    parser.add_argument("save_file_regex_pattern", metavar="REGEX",
+                        help="A regex pattern matching the saves of the series")
+    parser.add_argument("output_dir_path", metavar="OUTPUT",
+                        help="The directory to write the files to")
+    parser.add_argument("--format", default="auto", choices=["auto", *FILE_EXTENSIONS],
+                        help="The format of the files, Parquet if pyarrow is installed for auto")
+    parser.add_argument("--datasets", nargs="+", metavar="NAME",
+                        help="The datasets to export, all of the default datasets if omitted")
+
+    return parser
+
+
+def main(arguments: list = None) -> int:
+    """Export the series given on the command line
+
+    Parameters:
+    arguments (list): The command line arguments, or None to read them from sys.argv
+
+    Returns:
+    int: The exit status, which is 1 if a save failed to load
+    """
+    options = get_argument_parser().parse_args(arguments)
+    series = SaveSeries(options.save_dir_path, options.save_file_regex_pattern,
+                        datasets=options.datasets, aggregate=False)
+    paths = export_series(series, options.output_dir_path, options.format)
+
+    for dataset_name, path in paths.items():
+        logging.info("Exported the %s dataset to %s", dataset_name, path)
+
+    for save_base_name, failure in series.errors.items():
+        logging.error("Failed to export save %s: %s", save_base_name, failure)
+
+    return 1 if series.errors else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
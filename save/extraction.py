@@ -0,0 +1,198 @@
+"""Extract the columns of a dataset from XML elements in a single pass over their children"""
+
+import xml.etree.ElementTree
+
+from save.diagnostics import Diagnostics, XML_DUMP_SAMPLE_SIZE
+
+# Stands in for the missing text of a matched child while its row is filled, so the child is not
+# replaced by a later match as an unmatched field would be
+NO_TEXT = object()
+
+
+def get_row_count(columns: dict) -> int:
+    """Return the number of rows of a dataset stored as columns
+
+    Parameters:
+    columns (dict): The list of values of each column, keyed by the column name
+
+    Returns:
+    int: The number of rows, or 0 if the dataset has no columns
+    """
+    return len(next(iter(columns.values()), []))
+
+
+class FieldExtractor:
+    """Route the child elements of each matched element to columns using precomputed tag paths
+
+    Each field is given as a path of child tags relative to the matched element, e.g. pawnData/pawn.
+    The paths are compiled once into nested tag routes, so extracting a row walks the direct
+    children of the element once, only descending into children that lead to a field. Unlike a
+    .//tag search, this never matches an element with the same tag nested elsewhere in the row.
+    """
+    def __init__(self, field_paths: dict) -> None:
+        """Initialize the FieldExtractor object by compiling the tag routes of the fields
+
+        Parameters:
+        field_paths (dict): The path of child tags of each column, keyed by the column name
+
+        Returns:
+        None
+        """
+        self.column_names = list(field_paths)
+        self.routes = {}
+
+        for column_index, path in enumerate(field_paths.values()):
+            routes = self.routes
+            *parent_tags, tag = path.split("/")
+
+            for parent_tag in parent_tags:
+                routes = routes.setdefault(parent_tag, {})
+
+            routes[tag] = column_index
+
+    def fill_row(self, element: xml.etree.ElementTree.Element, buffers: list, row: int) -> None:
+        """Write the values of one matched element's fields into the given row of the column buffers
+
+        Parameters:
+        element (xml.etree.ElementTree.Element): The matched XML element
+        buffers (list): The list of column buffers
+        row (int): The index of the row being filled
+
+        Returns:
+        None
+        """
+        if self.fill_fields(element, self.routes, buffers, row):
+            # The matched children without text are missing values, like unmatched fields
+            for buffer in buffers:
+                if buffer[row] is NO_TEXT:
+                    buffer[row] = None
+
+    def fill_fields(self, element: xml.etree.ElementTree.Element, routes: dict, buffers: list,
+                    row: int) -> bool:
+        """Write the values of the fields routed from an element's children into a row of buffers
+
+        Parameters:
+        element (xml.etree.ElementTree.Element): The element, or a child of it on a field's path
+        routes (dict): The routes from child tags to column indexes or to nested routes
+        buffers (list): The list of column buffers
+        row (int): The index of the row being filled
+
+        Returns:
+        bool: Whether a matched child had no text, which is left as NO_TEXT in its buffer
+        """
+        no_text = False
+
+        for child in element:
+            route = routes.get(child.tag)
+
+            if route is None:
+                continue
+
+            if route.__class__ is int:
+                # Keep the first matching child, like Element.find does, even if it has no text
+                if buffers[route][row] is None:
+                    text = child.text
+
+                    if text is None:
+                        buffers[route][row] = NO_TEXT
+                        no_text = True
+                    else:
+                        buffers[route][row] = text
+            elif self.fill_fields(child, route, buffers, row):
+                no_text = True
+
+        return no_text
+
+    def extract(self, elements: list, diagnostics: Diagnostics = None) -> dict:
+        """Return the columns of the fields extracted from each element
+
+        Missing values are left as None and tallied per column in the diagnostics, which is done
+        after the extraction loop so the loop itself does no bookkeeping.
+
+        Parameters:
+        elements (list): The matched XML elements, one per row
+        diagnostics (Diagnostics): The diagnostics to tally missing values in, if any
+
+        Returns:
+        dict: The list of values of each column, keyed by the column name
+        """
+        row_count = len(elements)
+        buffers = [[None] * row_count for _ in self.column_names]
+
+        for row, element in enumerate(elements):
+            self.fill_row(element, buffers, row)
+
+        return self.get_columns(buffers, diagnostics, elements)
+
+    def new_buffers(self) -> list:
+        """Return empty column buffers to append rows to, e.g. while streaming
+
+        Parameters:
+        None
+
+        Returns:
+        list: One empty list per column
+        """
+        return [[] for _ in self.column_names]
+
+    def append_row(self, element: xml.etree.ElementTree.Element, buffers: list) -> None:
+        """Append the values of one element's fields to the column buffers, e.g. while streaming
+
+        Parameters:
+        element (xml.etree.ElementTree.Element): The matched XML element
+        buffers (list): The list of column buffers, see new_buffers
+
+        Returns:
+        None
+        """
+        row = len(buffers[0])
+
+        for buffer in buffers:
+            buffer.append(None)
+
+        self.fill_row(element, buffers, row)
+
+    def get_columns(self, buffers: list, diagnostics: Diagnostics = None,
+                    elements: list = None) -> dict:
+        """Return the column buffers keyed by column name, tallying their missing values
+
+        Parameters:
+        buffers (list): The list of column buffers
+        diagnostics (Diagnostics): The diagnostics to tally missing values in, if any
+        elements (list): The matched XML elements, one per row, or None if they were discarded
+
+        Returns:
+        dict: The list of values of each column, keyed by the column name
+        """
+        if diagnostics is not None:
+            self.record_missing_values(elements, buffers, diagnostics)
+
+        return dict(zip(self.column_names, buffers))
+
+    def record_missing_values(self, elements: list, buffers: list,
+                              diagnostics: Diagnostics) -> None:
+        """Tally the missing values of each column, passing a sample of the affected elements
+
+        Parameters:
+        elements (list): The matched XML elements, one per row, or None if they were discarded
+        buffers (list): The list of column buffers
+        diagnostics (Diagnostics): The diagnostics to tally missing values in
+
+        Returns:
+        None
+        """
+        for column_name, buffer in zip(self.column_names, buffers):
+            missing_count = buffer.count(None)
+
+            if missing_count == 0:
+                continue
+
+            if diagnostics.dump_enabled and elements is not None:
+                sample_rows = [row for row, value in enumerate(buffer) if value is None]
+
+                for row in sample_rows[:XML_DUMP_SAMPLE_SIZE]:
+                    diagnostics.record_missing(column_name, elements[row])
+
+                missing_count -= len(sample_rows[:XML_DUMP_SAMPLE_SIZE])
+
+            diagnostics.record_missing(column_name, None, count=missing_count)
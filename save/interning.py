@@ -0,0 +1,103 @@
+"""Map the IDs and definitions of a series to integer codes shared by every snapshot
+
+Thing IDs such as Plant_TreeOak123456 and definitions such as Plant_TreeOak repeat in every row of
+every snapshot. Each distinct string is stored once in an intern table, and the DataFrames of the
+series store a categorical column of integer codes into it, so joins, groupbys and deduplication
+across snapshots compare integers, and string operations only run once per distinct value.
+"""
+
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+# The kind of thing and the number of a thing ID, e.g. Plant_TreeOak and 123456
+ID_PATTERN = r"^(?P<kind>.*?)(?P<number>\d*)$"
+
+
+class InternTable:
+    """The distinct strings of a column across a series, each identified by an integer code"""
+    def __init__(self) -> None:
+        """Initialize an empty InternTable object
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.codes = {}
+        self.strings = []
+        self.categories_cache = None
+
+    def __len__(self) -> int:
+        """Return the number of distinct strings
+
+        Parameters:
+        None
+
+        Returns:
+        int: The number of distinct strings
+        """
+        return len(self.strings)
+
+    @property
+    def categories(self) -> "pandas.core.indexes.base.Index":
+        """Return the distinct strings in the order of their codes
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.indexes.base.Index: The string of each code, for display
+        """
+        if self.categories_cache is None or len(self.categories_cache) != len(self.strings):
+            self.categories_cache = pandas.Index(self.strings, dtype=object)
+
+        return self.categories_cache
+
+    def get_codes(self, strings: list) -> "numpy.ndarray":
+        """Return the code of each string, adding the strings that are new to the table
+
+        Parameters:
+        strings (list): The strings, which are usually the distinct values of a column
+
+        Returns:
+        numpy.ndarray: The int32 code of each string
+        """
+        for string in strings:
+            if string not in self.codes:
+                self.codes[string] = len(self.strings)
+                self.strings.append(string)
+
+        return numpy.fromiter((self.codes[string] for string in strings), dtype=numpy.int32,
+                              count=len(strings))
+
+    def get_categorical(self, codes: "numpy.ndarray") -> "pandas.Categorical":
+        """Return a column of codes as a categorical column whose categories are the table
+
+        Parameters:
+        codes (numpy.ndarray): The code of each row, or -1 for a missing value
+
+        Returns:
+        pandas.Categorical: The categorical column, which displays the strings
+        """
+        return pandas.Categorical.from_codes(codes, categories=self.categories)
+
+    def get_parts(self) -> "pandas.core.frame.DataFrame":
+        """Return the kind and number of each string, parsed as a thing ID
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The string, the kind prefix and the numeric suffix, which is
+            missing for strings that do not end with digits, indexed by code
+        """
+        parts = self.categories.str.extract(ID_PATTERN)
+
+        return pandas.DataFrame({
+            "string": self.categories,
+            "kind": parts["kind"],
+            "number": pandas.to_numeric(parts["number"]).astype("Int64"),
+        })
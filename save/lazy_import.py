@@ -0,0 +1,33 @@
+"""Defer importing heavy third-party modules until the code path that needs them runs"""
+
+import importlib.util
+import sys
+import types
+
+
+def lazy_import(module_name: str) -> types.ModuleType:
+    """Return a module whose code is only executed when one of its attributes is first accessed
+
+    Parameters:
+    module_name (str): The fully qualified name of the module to import, e.g. plotly.express
+
+    Returns:
+    types.ModuleType: The already imported module, or a lazily loaded stand-in for it
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.find_spec(module_name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    loader.exec_module(module)
+
+    # Bind a submodule to its package, as the import statement does
+    parent_name, _, child_name = module_name.rpartition(".")
+
+    if parent_name:
+        setattr(sys.modules[parent_name], child_name, module)
+
+    return module
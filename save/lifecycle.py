@@ -0,0 +1,231 @@
+"""Follow each plant across the snapshots of a series to analyze when plants spawn, grow and die
+
+Every row of the plant DataFrame of a series is coded with integers for its plant_id, definition
+and snapshot, and the rows are sorted by plant and then snapshot. Joining consecutive snapshots on
+plant_id then becomes a comparison of each row with the one before it: a row continues the life of
+the plant of the previous row if it is the same plant in the next snapshot. Spawns, removals,
+growth rates and lifetimes are all computed from these sorted arrays without looping over rows.
+
+A plant that is missing from a snapshot and present again later is counted as a new life. As saves
+only sample the colony, a plant is counted as removed in the first snapshot it is missing from, and
+the plants of the first snapshot have no known spawn time, so their lifetimes are counted from it.
+
+The snapshots of a series are told apart by their position in the series rather than by their time,
+as different saves may share an in-game time. A plant found in both of them is then the same life,
+and no growth rate is computed between them.
+"""
+
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+
+def get_kaplan_meier_curve(durations: "numpy.ndarray",
+                           observed: "numpy.ndarray") -> "pandas.core.frame.DataFrame":
+    """Return the Kaplan-Meier estimate of the share of lives lasting longer than each duration
+
+    Parameters:
+    durations (numpy.ndarray): The duration of each life in ticks
+    observed (numpy.ndarray): Whether the end of each life was observed, False if still alive
+
+    Returns:
+    pandas.core.frame.DataFrame: The number of lives at risk and ending at each distinct duration,
+        and the estimated survival after it
+    """
+    duration_ticks, inverse = numpy.unique(durations, return_inverse=True)
+    ended = numpy.bincount(inverse, weights=observed, minlength=len(duration_ticks))
+    exited = numpy.bincount(inverse, minlength=len(duration_ticks))
+    at_risk = len(durations) - numpy.concatenate([[0], numpy.cumsum(exited)[:-1]])
+
+    return pandas.DataFrame({
+        "duration_ticks": duration_ticks,
+        "at_risk": at_risk,
+        "deaths": ended.astype(int),
+        "survival": numpy.cumprod(1 - ended / at_risk),
+    })
+
+
+class PlantLifecycle:
+    """Spawns, removals, growth rates and survival of the plants of a series"""
+    def __init__(self, plant_dataframe: "pandas.core.frame.DataFrame",
+                 time_ticks: "numpy.ndarray" = None,
+                 snapshot_codes: "numpy.ndarray" = None) -> None:
+        """Initialize the PlantLifecycle object by coding and sorting the rows of every snapshot
+
+        Parameters:
+        plant_dataframe (pandas.core.frame.DataFrame): The plant rows of every snapshot, with their
+            time_ticks, e.g. SaveSeries.data.plant
+        time_ticks (numpy.ndarray): The in-game time of each snapshot in ascending order, or None to
+            take each distinct time_ticks of the rows as a snapshot
+        snapshot_codes (numpy.ndarray): The position in time_ticks of the snapshot of each row,
+            given with time_ticks
+
+        Returns:
+        None
+        """
+        if time_ticks is None:
+            time_ticks, snapshot_codes = numpy.unique(plant_dataframe["time_ticks"].to_numpy(),
+                                                      return_inverse=True)
+
+        self.time_ticks = numpy.asarray(time_ticks)
+        plant_codes = pandas.factorize(plant_dataframe["plant_id"])[0]
+        definition_codes, self.definitions = pandas.factorize(plant_dataframe["plant_definition"])
+        order = numpy.lexsort((snapshot_codes, plant_codes))
+        self.rows = {
+            "plant": plant_codes[order],
+            "snapshot": snapshot_codes[order],
+            "definition": definition_codes[order],
+            "growth": plant_dataframe["plant_growth"].to_numpy().astype(float)[order],
+        }
+
+        # Whether each row continues the life of the plant of the previous row
+        continues = numpy.zeros(len(order), dtype=bool)
+        continues[1:] = (self.rows["plant"][1:] == self.rows["plant"][:-1]) \
+            & (self.rows["snapshot"][1:] == self.rows["snapshot"][:-1] + 1)
+        self.rows["continues"] = continues
+
+    def count_by_snapshot(self, snapshot_codes: "numpy.ndarray",
+                          definition_codes: "numpy.ndarray") -> "numpy.ndarray":
+        """Return the number of rows of each snapshot and definition
+
+        Parameters:
+        snapshot_codes (numpy.ndarray): The snapshot code of each row
+        definition_codes (numpy.ndarray): The definition code of each row
+
+        Returns:
+        numpy.ndarray: The counts, with a row per snapshot and a column per definition
+        """
+        definition_count = len(self.definitions)
+        counts = numpy.bincount(snapshot_codes * definition_count + definition_codes,
+                                minlength=len(self.time_ticks) * definition_count)
+
+        return counts.reshape(len(self.time_ticks), definition_count)
+
+    def get_life_ends(self) -> "numpy.ndarray":
+        """Return whether each row is the last snapshot of the life of its plant
+
+        Parameters:
+        None
+
+        Returns:
+        numpy.ndarray: Whether the plant of each row is missing from the next snapshot, or the row
+            is in the last snapshot
+        """
+        return numpy.append(~self.rows["continues"][1:], True)
+
+    def get_spawns_and_removals(self) -> "pandas.core.frame.DataFrame":
+        """Return the number of plants of each definition that spawned and were removed
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The plants spawned since the previous snapshot and removed
+            since the previous snapshot, indexed by time_ticks and plant_definition, leaving out the
+            first snapshot and definitions with neither
+        """
+        rows = self.rows
+        spawned = ~rows["continues"] & (rows["snapshot"] > 0)
+        removed = self.get_life_ends() & (rows["snapshot"] < len(self.time_ticks) - 1)
+        index = pandas.MultiIndex.from_product([self.time_ticks, self.definitions],
+                                               names=["time_ticks", "plant_definition"])
+        counts = pandas.DataFrame({
+            "spawned": self.count_by_snapshot(rows["snapshot"][spawned],
+                                              rows["definition"][spawned]).ravel(),
+            # A plant missing from a snapshot is counted as removed in that snapshot
+            "removed": self.count_by_snapshot(rows["snapshot"][removed] + 1,
+                                              rows["definition"][removed]).ravel(),
+        }, index=index)
+
+        # The snapshots of the same time are counted together
+        counts = counts.groupby(level=index.names, sort=False).sum()
+
+        return counts[counts.any(axis=1)]
+
+    def get_growth_rates(self) -> "pandas.core.frame.DataFrame":
+        """Return the growth rate of each plant between each pair of consecutive snapshots
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The plant_definition, the time_ticks of the later snapshot and
+            the change in growth per tick of each plant present in both snapshots, leaving out the
+            snapshots of the same time as the one before them
+        """
+        rows = self.rows
+        later = numpy.flatnonzero(rows["continues"])
+        elapsed_ticks = numpy.diff(self.time_ticks)[rows["snapshot"][later] - 1]
+
+        # Snapshots of the same time have no time between them to grow in
+        later = later[elapsed_ticks > 0]
+        elapsed_ticks = elapsed_ticks[elapsed_ticks > 0]
+
+        return pandas.DataFrame({
+            "plant_definition": self.definitions[rows["definition"][later]],
+            "time_ticks": self.time_ticks[rows["snapshot"][later]],
+            "growth_rate": (rows["growth"][later] - rows["growth"][later - 1]) / elapsed_ticks,
+        })
+
+    def get_growth_rate_distribution(self) -> "pandas.core.frame.DataFrame":
+        """Return the distribution of the growth rates of the plants of each definition
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The count, mean, standard deviation, minimum, quartiles and
+            maximum of the growth per tick, indexed by plant_definition
+        """
+        return self.get_growth_rates().groupby("plant_definition")["growth_rate"].describe()
+
+    def get_lives(self) -> "pandas.core.frame.DataFrame":
+        """Return the span of each life of a plant across the snapshots
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The plant_definition, the time_ticks the life was first seen,
+            its duration_ticks until the first snapshot the plant was missing from, or until the
+            last snapshot, and whether its end was observed
+        """
+        rows = self.rows
+        starts = numpy.flatnonzero(~rows["continues"])
+        ends = numpy.flatnonzero(self.get_life_ends())
+        observed = rows["snapshot"][ends] < len(self.time_ticks) - 1
+        end_snapshots = numpy.minimum(rows["snapshot"][ends] + 1, len(self.time_ticks) - 1)
+        start_ticks = self.time_ticks[rows["snapshot"][starts]]
+
+        return pandas.DataFrame({
+            "plant_definition": self.definitions[rows["definition"][starts]],
+            "time_ticks": start_ticks,
+            "duration_ticks": self.time_ticks[end_snapshots] - start_ticks,
+            "observed": observed,
+        })
+
+    def get_survival_curve(self, by_definition: bool = False) -> "pandas.core.frame.DataFrame":
+        """Return the Kaplan-Meier estimate of the share of plants surviving each duration
+
+        Parameters:
+        by_definition (bool): Estimate the survival of the plants of each definition separately if
+            True
+
+        Returns:
+        pandas.core.frame.DataFrame: The lives at risk, deaths and survival at each duration_ticks,
+            with their plant_definition if estimated separately
+        """
+        lives = self.get_lives()
+
+        if not by_definition:
+            return get_kaplan_meier_curve(lives["duration_ticks"].to_numpy(),
+                                          lives["observed"].to_numpy())
+
+        curves = [
+            get_kaplan_meier_curve(group["duration_ticks"].to_numpy(),
+                                   group["observed"].to_numpy()).assign(plant_definition=name)
+            for name, group in lives.groupby("plant_definition")
+        ]
+
+        return pandas.concat(curves, ignore_index=True)
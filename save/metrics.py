@@ -0,0 +1,216 @@
+"""Record the wall time, CPU time, memory usage and row counts of each stage of processing saves
+
+The memory usage of a span is the resident set size of its process when the span ends, and the peak
+resident set size of the process so far, which the operating system only reports for the lifetime
+of the process. A stage that allocates less than an earlier stage of the same process therefore
+reports the earlier stage's peak, so the peak is named process_peak_rss_bytes rather than being
+attributed to the span.
+"""
+
+import contextlib
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+
+from save.lazy_import import lazy_import
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+psutil = lazy_import("psutil")
+
+
+def get_memory_usage() -> tuple:
+    """Return the current resident set size of the current process, and its peak since it started
+
+    Parameters:
+    None
+
+    Returns:
+    tuple: The current and the lifetime peak resident set size in bytes
+    """
+    memory_info = psutil.Process().memory_info()
+
+    if resource is None:  # pragma: no cover
+        return memory_info.rss, getattr(memory_info, "peak_wset", memory_info.rss)
+
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    peak_rss_scale = 1 if sys.platform == "darwin" else 1024
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * peak_rss_scale
+
+    return memory_info.rss, max(peak_rss, memory_info.rss)
+
+
+class Metrics:
+    """Collect timed spans around the stages of processing a save or a series of saves"""
+    def __init__(self) -> None:
+        """Initialize the Metrics object with no spans and no children
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.spans = []
+        self.children = {}
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes) -> dict:
+        """Time the code run inside the context and record it as a span
+
+        The yielded span is a dictionary to which the code being timed can add attributes, such as
+        the number of rows it produced.
+
+        Parameters:
+        name (str): The name of the stage being timed, e.g. extract_plant
+        attributes: Additional attributes to record with the span
+
+        Returns:
+        dict: The span being recorded
+        """
+        span = {"name": name, "pid": os.getpid(), "tid": threading.get_ident(),
+                "start": time.time(), **attributes}
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield span
+        finally:
+            span["wall_seconds"] = time.perf_counter() - wall_start
+            span["cpu_seconds"] = time.process_time() - cpu_start
+            span["rss_bytes"], span["process_peak_rss_bytes"] = get_memory_usage()
+            self.spans.append(span)
+
+    def add_span(self, name: str, start: float, wall_seconds: float, **attributes) -> dict:
+        """Record a span that was timed outside of the span context manager
+
+        Parameters:
+        name (str): The name of the stage that was timed, e.g. ipc
+        start (float): The time the stage started, in seconds since the epoch
+        wall_seconds (float): The wall time the stage took
+        attributes: Additional attributes to record with the span
+
+        Returns:
+        dict: The recorded span
+        """
+        span = {"name": name, "pid": os.getpid(), "tid": threading.get_ident(), "start": start,
+                "wall_seconds": wall_seconds, **attributes}
+        self.spans.append(span)
+
+        return span
+
+    def add_child(self, name: str, child: "Metrics") -> None:
+        """Attach the metrics of a sub-task, such as a single save within a series
+
+        Parameters:
+        name (str): The name identifying the sub-task, e.g. the save file's base name
+        child (Metrics): The metrics of the sub-task
+
+        Returns:
+        None
+        """
+        self.children[name] = child
+
+    def get_spans(self) -> list:
+        """Return the spans of these metrics and of all children, ordered by start time
+
+        Spans of children are copied and tagged with the child's name as their source.
+
+        Parameters:
+        None
+
+        Returns:
+        list: The spans, each a dictionary
+        """
+        spans = list(self.spans)
+
+        for child_name, child in self.children.items():
+            spans.extend({"source": child_name, **span} for span in child.get_spans())
+
+        return sorted(spans, key=lambda span: span["start"])
+
+    def summarize(self) -> dict:
+        """Return the totals of each stage across all spans, keyed by the stage name
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The count, total wall and CPU time, total rows and the highest process peak RSS of
+            each stage
+        """
+        summary = {}
+
+        for span in self.get_spans():
+            stage = summary.setdefault(span["name"], {"count": 0, "wall_seconds": 0.0,
+                                                      "cpu_seconds": 0.0, "rows": 0,
+                                                      "process_peak_rss_bytes": 0})
+            stage["count"] += 1
+            stage["wall_seconds"] += span["wall_seconds"]
+            stage["cpu_seconds"] += span.get("cpu_seconds", 0.0)
+            stage["rows"] += span.get("rows", 0)
+            stage["process_peak_rss_bytes"] = max(stage["process_peak_rss_bytes"],
+                                                  span.get("process_peak_rss_bytes", 0))
+
+        return summary
+
+    def to_dict(self) -> dict:
+        """Return the spans and the per-stage summary as a JSON serializable dictionary
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The spans and the summary
+        """
+        return {"spans": self.get_spans(), "summary": self.summarize()}
+
+    def to_chrome_trace(self) -> dict:
+        """Return the spans in the Chrome trace event format, viewable in chrome://tracing
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The trace, with one complete event per span
+        """
+        trace_events = []
+
+        for span in self.get_spans():
+            arguments = {
+                key: value for key, value in span.items()
+                if key not in ("name", "pid", "tid", "start", "wall_seconds")
+            }
+            trace_events.append({
+                "name": span["name"],
+                "cat": "rimhistory",
+                "ph": "X",
+                "ts": span["start"] * 1000000,
+                "dur": span["wall_seconds"] * 1000000,
+                "pid": span["pid"],
+                "tid": span["tid"],
+                "args": arguments,
+            })
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write(self, output_path: pathlib.Path, trace_format: str = "json") -> None:
+        """Write the metrics to a file as JSON or as a Chrome trace
+
+        Parameters:
+        output_path (pathlib.Path): The path of the file to create
+        trace_format (str): Either json, for to_dict, or chrome, for to_chrome_trace
+
+        Returns:
+        None
+        """
+        exporters = {"json": self.to_dict, "chrome": self.to_chrome_trace}
+
+        with open(output_path, "w", encoding="utf_8") as output_file:
+            json.dump(exporters[trace_format](), output_file, indent=2)
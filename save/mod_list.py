@@ -0,0 +1,199 @@
+"""Keep each distinct mod list of a series once, and track the mods added and removed over time
+
+The mod list of a colony rarely changes between saves, so a series stores each distinct mod list as
+a version, identified by a hash of its mod IDs, names and Steam IDs, and each snapshot refers to the
+version of its save. The mod DataFrame of the series holds the rows of each version once, with their
+mod_list_version, and the rows of a range of snapshots are only expanded from their versions when
+they are queried, e.g. by SaveSeries.get_mod_snapshots.
+
+Comparing the versions of consecutive snapshots by mod ID gives the mods added and removed, which
+only has to look at the rows of the snapshots where the version changes. A change of the load order
+alone creates a new version without adding or removing any mod.
+"""
+
+import hashlib
+
+from save.lazy_import import lazy_import
+from save.timeline import get_range_rows
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+MOD_COLUMNS = ("mod_id", "mod_name", "mod_steam_id")
+CHANGE_COLUMNS = ("time_ticks", "mod_list_version", "change", *MOD_COLUMNS)
+
+
+def get_mod_list_digest(columns: dict) -> str:
+    """Return a digest of a mod list, which is the same for mod lists with the same rows in order
+
+    Parameters:
+    columns (dict): The values of each column of the mod list, keyed by the column name
+
+    Returns:
+    str: The hexadecimal BLAKE2b digest of the mod list
+    """
+    digest = hashlib.blake2b()
+
+    for column_name in MOD_COLUMNS:
+        digest.update(repr(list(columns[column_name])).encode())
+
+    return digest.hexdigest()
+
+
+class ModListVersions:
+    """The distinct mod lists of a series, and the version of the mod list of each snapshot"""
+    def __init__(self) -> None:
+        """Initialize an empty ModListVersions object
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.versions = {}
+        self.version_columns = []
+        self.offsets = numpy.zeros(1, dtype=numpy.int64)
+        self.snapshot_versions = numpy.zeros(0, dtype=numpy.int64)
+        self.time_ticks = numpy.zeros(0, dtype=numpy.int64)
+        self.dataframe_cache = None
+
+    def __len__(self) -> int:
+        """Return the number of distinct mod lists
+
+        Parameters:
+        None
+
+        Returns:
+        int: The number of versions
+        """
+        return len(self.version_columns)
+
+    def add(self, columns: dict) -> int:
+        """Return the version of a mod list, adding the mod list if it is new
+
+        Parameters:
+        columns (dict): The values of each column of the mod list, keyed by the column name
+
+        Returns:
+        int: The version of the mod list, numbered from 0 in the order the versions were added
+        """
+        digest = get_mod_list_digest(columns)
+
+        if digest not in self.versions:
+            self.versions[digest] = len(self.version_columns)
+            self.version_columns.append({
+                column_name: list(columns[column_name]) for column_name in MOD_COLUMNS
+            })
+            self.offsets = numpy.append(self.offsets,
+                                        self.offsets[-1] + len(columns[MOD_COLUMNS[0]]))
+
+        return self.versions[digest]
+
+    def set_snapshots(self, snapshot_versions: list, time_ticks: "numpy.ndarray") -> None:
+        """Set the version of the mod list of each snapshot of the series
+
+        Parameters:
+        snapshot_versions (list): The version of each snapshot, in order of their in-game time
+        time_ticks (numpy.ndarray): The in-game time of each snapshot in ticks
+
+        Returns:
+        None
+        """
+        self.snapshot_versions = numpy.asarray(snapshot_versions, dtype=numpy.int64)
+        self.time_ticks = numpy.asarray(time_ticks, dtype=numpy.int64)
+
+    @property
+    def dataframe(self) -> "pandas.core.frame.DataFrame":
+        """Return the rows of every version once, numbered from 0 within each version
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The mod ID, name and Steam ID of each mod of each version, and
+            the mod_list_version of its row
+        """
+        if self.dataframe_cache is None or len(self.dataframe_cache.index) != self.offsets[-1]:
+            counts = numpy.diff(self.offsets)
+            self.dataframe_cache = pandas.DataFrame({
+                **{
+                    column_name: numpy.array([
+                        value for columns in self.version_columns for value in columns[column_name]
+                    ], dtype=object)
+                    for column_name in MOD_COLUMNS
+                },
+                "mod_list_version": numpy.repeat(numpy.arange(len(counts)), counts),
+            }, index=numpy.arange(self.offsets[-1]) - numpy.repeat(self.offsets[:-1], counts))
+
+        return self.dataframe_cache
+
+    def get_snapshot_versions(self) -> "pandas.core.frame.DataFrame":
+        """Return the version of the mod list of each snapshot
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The time_ticks and mod_list_version of each snapshot, in order
+        """
+        return pandas.DataFrame({"time_ticks": self.time_ticks,
+                                 "mod_list_version": self.snapshot_versions})
+
+    def get_row_slice(self, version: int) -> slice:
+        """Return the rows of a version in the DataFrame of the versions
+
+        Parameters:
+        version (int): The version of the mod list
+
+        Returns:
+        slice: The positions of the rows
+        """
+        return slice(int(self.offsets[version]), int(self.offsets[version + 1]))
+
+    def get_rows(self, positions: "numpy.ndarray") -> tuple:
+        """Return the rows of the mod lists of a sequence of snapshots, which may repeat
+
+        Parameters:
+        positions (numpy.ndarray): The position of each snapshot
+
+        Returns:
+        tuple: The positions of the rows of every snapshot in turn in the DataFrame of the versions,
+            and the number of rows of each snapshot
+        """
+        versions = self.snapshot_versions[positions]
+        starts = self.offsets[versions]
+        counts = self.offsets[versions + 1] - starts
+
+        return get_range_rows(starts, counts), counts
+
+    def get_changes(self) -> "pandas.core.frame.DataFrame":
+        """Return the mods added and removed between each snapshot and the one before it
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The in-game time of the snapshot the mod list changed in, its
+            new version, whether the mod was added or removed, and the mod's ID, name and Steam ID
+        """
+        changed_positions = numpy.flatnonzero(numpy.diff(self.snapshot_versions)) + 1
+        dataframe = self.dataframe
+        changes = []
+
+        for position in changed_positions:
+            previous, current = (dataframe.iloc[self.get_row_slice(version)]
+                                 for version in self.snapshot_versions[[position - 1, position]])
+            snapshot = {
+                "time_ticks": self.time_ticks[position],
+                "mod_list_version": self.snapshot_versions[position],
+            }
+            changes.append(current[~current["mod_id"].isin(previous["mod_id"])].assign(
+                change="added", **snapshot))
+            changes.append(previous[~previous["mod_id"].isin(current["mod_id"])].assign(
+                change="removed", **snapshot))
+
+        if not changes:
+            return pandas.DataFrame(columns=list(CHANGE_COLUMNS))
+
+        return pandas.concat(changes, ignore_index=True)[list(CHANGE_COLUMNS)]
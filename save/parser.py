@@ -0,0 +1,256 @@
+"""Parse the XML of RimWorld saves with a pluggable backend, preferring lxml when it is installed
+
+Every backend offers three modes of reaching the elements that rimhistory extracts data from:
+    tree: Parse the whole document into a tree and search it
+    stream: Stream through the document, yielding only the complete target elements and discarding
+        everything else as soon as it has been read, which bounds memory by the largest target
+    prescan: Cut the sections the datasets need out of the document with byte searches and parse
+        only those, see save.prescan
+"""
+
+import importlib.util
+import io
+import xml.etree.ElementTree
+
+from save.lazy_import import lazy_import
+
+lxml_etree = lazy_import("lxml.etree") if importlib.util.find_spec("lxml") else None
+
+PARSER_MODES = ("tree", "stream", "prescan")
+
+# Compiled lxml XPath queries, shared by all LxmlBackend objects so the backends stay picklable
+LXML_XPATH_CACHE = {}
+
+
+def get_stream(source: object) -> object:
+    """Return a binary file to read an XML document from
+
+    Parameters:
+    source (object): The XML document as bytes, or a binary file to read it from, e.g. a save file
+        that is decompressed as it is read
+
+    Returns:
+    object: The binary file
+    """
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def get_target_classes(targets: list) -> dict:
+    """Return the accepted Class attribute values of each target tag
+
+    Parameters:
+    targets (list): A list of (tag, Class attribute value) tuples, where a Class of None accepts
+        an element with that tag regardless of its Class attribute
+
+    Returns:
+    dict: The set of accepted Class values, or None to accept any, keyed by tag
+    """
+    target_classes = {}
+
+    for tag, class_name in targets:
+        if class_name is None:
+            target_classes[tag] = None
+        elif target_classes.get(tag, set()) is not None:
+            target_classes.setdefault(tag, set()).add(class_name)
+
+    return target_classes
+
+
+def is_target(element: xml.etree.ElementTree.Element, target_classes: dict) -> bool:
+    """Return True if the element's tag and Class attribute match one of the targets
+
+    Parameters:
+    element (xml.etree.ElementTree.Element): The element to check
+    target_classes (dict): The accepted Class values of each target tag, see get_target_classes
+
+    Returns:
+    bool: Whether the element is a target
+    """
+    if element.tag not in target_classes:
+        return False
+
+    class_names = target_classes[element.tag]
+
+    return class_names is None or element.get("Class") in class_names
+
+
+class ElementTreeBackend:
+    """Parse save XML with the standard library's xml.etree.ElementTree, the fallback backend"""
+    name = "etree"
+
+    def __init__(self, mode: str = "tree") -> None:
+        """Initialize the backend
+
+        Parameters:
+        mode (str): How the data is reached: tree, stream or prescan, see PARSER_MODES
+
+        Returns:
+        None
+        """
+        assert mode in PARSER_MODES
+        self.mode = mode
+
+    def parse(self, source: object) -> xml.etree.ElementTree.Element:
+        """Parse a complete XML document and return its root element
+
+        Parameters:
+        source (object): The XML document as bytes, or a binary file to read it from
+
+        Returns:
+        xml.etree.ElementTree.Element: The root element
+        """
+        return xml.etree.ElementTree.parse(get_stream(source)).getroot()
+
+    def find_all(self, root: xml.etree.ElementTree.Element, tag: str,
+                 class_name: str = None) -> list:
+        """Return all descendants of the root with the given tag and Class attribute
+
+        Parameters:
+        root (xml.etree.ElementTree.Element): The element to search
+        tag (str): The tag of the elements to find
+        class_name (str): The required value of the Class attribute, or None to accept any
+
+        Returns:
+        list: The matching elements in document order
+        """
+        class_filter = f"[@Class='{class_name}']" if class_name else ""
+
+        return root.findall(f".//{tag}{class_filter}")
+
+    def iter_targets(self, source: object, targets: list) -> iter:
+        """Stream through an XML document, yielding each complete target element as it ends
+
+        All other elements are removed from the tree as soon as they end, and each target is
+        removed once the consumer asks for the next one.
+
+        Parameters:
+        source (object): The XML document as bytes, or a binary file to read it from
+        targets (list): A list of (tag, Class attribute value) tuples, see get_target_classes
+
+        Returns:
+        iter: An iterator of the target elements in document order
+        """
+        target_classes = get_target_classes(targets)
+        open_elements = []
+        capture_depth = 0
+
+        for event, element in xml.etree.ElementTree.iterparse(get_stream(source),
+                                                              events=("start", "end")):
+            if event == "start":
+                open_elements.append(element)
+                capture_depth += bool(capture_depth or is_target(element, target_classes))
+                continue
+
+            open_elements.pop()
+
+            if capture_depth:
+                capture_depth -= 1
+
+                # Keep the descendants of a target until the target itself is complete
+                if capture_depth:
+                    continue
+
+                yield element
+
+            # The element that just ended is always the last child of the element that contains it
+            if open_elements:
+                del open_elements[-1][-1]
+
+
+class LxmlBackend(ElementTreeBackend):
+    """Parse save XML with lxml, using compiled XPath queries and tag filtered iterparse"""
+    name = "lxml"
+
+    def parse(self, source: object) -> xml.etree.ElementTree.Element:
+        """Parse a complete XML document and return its root element
+
+        Parameters:
+        source (object): The XML document as bytes, or a binary file to read it from
+
+        Returns:
+        xml.etree.ElementTree.Element: The root element, an lxml element
+        """
+        return lxml_etree.parse(get_stream(source), lxml_etree.XMLParser(huge_tree=True)).getroot()
+
+    def find_all(self, root: xml.etree.ElementTree.Element, tag: str,
+                 class_name: str = None) -> list:
+        """Return all descendants of the root with the given tag and Class attribute
+
+        Parameters:
+        root (xml.etree.ElementTree.Element): The element to search
+        tag (str): The tag of the elements to find
+        class_name (str): The required value of the Class attribute, or None to accept any
+
+        Returns:
+        list: The matching elements in document order
+        """
+        key = (tag, class_name)
+
+        if key not in LXML_XPATH_CACHE:
+            class_filter = f"[@Class='{class_name}']" if class_name else ""
+            LXML_XPATH_CACHE[key] = lxml_etree.XPath(f"descendant::{tag}{class_filter}")
+
+        return LXML_XPATH_CACHE[key](root)
+
+    def iter_targets(self, source: object, targets: list) -> iter:
+        """Stream through an XML document, yielding each complete target element as it ends
+
+        libxml2 only reports events for elements with a target tag. Each of those elements is
+        cleared once it ends, or once the consumer is done with it if it is a target, together with
+        its earlier siblings, which have already been processed.
+
+        Parameters:
+        source (object): The XML document as bytes, or a binary file to read it from
+        targets (list): A list of (tag, Class attribute value) tuples, see get_target_classes
+
+        Returns:
+        iter: An iterator of the target elements in document order
+        """
+        target_classes = get_target_classes(targets)
+        capture_depth = 0
+        events = lxml_etree.iterparse(get_stream(source), events=("start", "end"),
+                                      tag=list(target_classes), huge_tree=True)
+
+        for event, element in events:
+            if event == "start":
+                capture_depth += bool(capture_depth or is_target(element, target_classes))
+                continue
+
+            if capture_depth:
+                capture_depth -= 1
+
+                if capture_depth:
+                    continue
+
+                yield element
+
+            element.clear(keep_tail=True)
+
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+
+BACKENDS = {
+    "etree": ElementTreeBackend,
+    "lxml": LxmlBackend,
+}
+
+
+def get_parser_backend(parser: object = "auto", mode: str = "tree") -> ElementTreeBackend:
+    """Return a parser backend given its name, using lxml for auto when it is installed
+
+    Parameters:
+    parser (object): A backend object, which is returned as is, or the name of a backend: auto,
+        etree or lxml
+    mode (str): How the data is reached: tree, stream or prescan, see PARSER_MODES
+
+    Returns:
+    ElementTreeBackend: The parser backend
+    """
+    if isinstance(parser, ElementTreeBackend):
+        return parser
+
+    if parser == "auto":
+        parser = "etree" if lxml_etree is None else "lxml"
+
+    return BACKENDS[parser](mode=mode)
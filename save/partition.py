@@ -0,0 +1,219 @@
+"""Split the XML document of a save into partitions that worker processes can extract concurrently
+
+A save holds sections about the whole game, e.g. the mod list, tales and world, followed by its
+maps, which hold nearly all of its things. The document is cut with byte searches into one partition
+holding the sections outside the maps that the datasets need, like save.prescan does, and partitions
+for each map: the things of a large map are split into chunks of consecutive things, so even a save
+with a single map spreads over every worker.
+
+Each partition is a small standalone document, holding the meta and tickManager sections as well, so
+every parser backend and mode extracts it like a whole save. Merging the columns extracted from the
+partitions in order gives the same rows, in the same order, as extracting the whole document.
+"""
+
+import bisect
+import re
+
+from save.prescan import META_SECTION, TICK_MANAGER_SECTION
+from save.prescan import find_section_ranges, get_reduced_document
+
+MAPS_SECTION = (b"<maps>", b"</maps>", True)
+
+# The datasets extracted from the sections outside the maps, and from each map. Weather is only
+# extracted from the first chunk of a map, as the other chunks hold things alone.
+SECTION_DATASETS = ("mod", "pawn")
+MAP_DATASETS = ("plant", "weather", "animal", "item", "building")
+CHUNK_DATASETS = ("plant", "animal", "item", "building")
+
+# Compiled patterns of the start, end and empty element tags with a given name, keyed by the name
+TAG_PATTERNS = {}
+
+
+def find_child_ranges(document: bytes, content_range: tuple, tag: bytes) -> list:
+    """Return the byte ranges of the outermost elements with a tag inside a range of the document
+
+    Only the tags with the given name are counted, so an element nested in another element with
+    the same tag is part of the outer element's range.
+
+    Parameters:
+    document (bytes): The XML document
+    content_range (tuple): The start and end byte offsets to search between
+    tag (bytes): The tag of the elements, e.g. b"li"
+
+    Returns:
+    list: The (start, end) byte offsets of each outermost element, in document order
+    """
+    if tag not in TAG_PATTERNS:
+        TAG_PATTERNS[tag] = re.compile(b"<(/?)" + re.escape(tag) + rb"(?:\s[^>]*?)?(/?)>")
+
+    ranges = []
+    depth = 0
+    start = None
+
+    for match in TAG_PATTERNS[tag].finditer(document, *content_range):
+        is_end_tag, is_empty = match.groups()
+
+        if is_empty:
+            if depth == 0:
+                ranges.append(match.span())
+        elif is_end_tag:
+            depth -= 1
+
+            if depth == 0:
+                ranges.append((start, match.end()))
+        else:
+            if depth == 0:
+                start = match.start()
+
+            depth += 1
+
+    return ranges
+
+
+def get_content_range(document: bytes, element_range: tuple) -> tuple:
+    """Return the byte range between the start tag and end tag of an element
+
+    Parameters:
+    document (bytes): The XML document
+    element_range (tuple): The start and end byte offsets of the element
+
+    Returns:
+    tuple: The start and end byte offsets of the content of the element, which are both its end if
+        the element is empty
+    """
+    start, end = element_range
+
+    if document.endswith(b"/>", start, end):
+        return end, end
+
+    return document.index(b">", start) + 1, document.rindex(b"</", start, end)
+
+
+def split_ranges(ranges: list, count: int) -> list:
+    """Group consecutive byte ranges into at most count spans of roughly equal size
+
+    Parameters:
+    ranges (list): The (start, end) byte offsets of consecutive elements, in document order
+    count (int): The maximum number of spans
+
+    Returns:
+    list: The (start, end) byte offsets of each span, covering whole elements
+    """
+    if not ranges:
+        return []
+
+    first, last = ranges[0][0], ranges[-1][1]
+    ends = [end for _, end in ranges]
+
+    # End each span with the element reaching past an even share of the bytes
+    stops = sorted({
+        bisect.bisect_left(ends, first + (last - first) * index // count) + 1
+        for index in range(1, count + 1)
+    })
+
+    return [(ranges[start][0], ranges[stop - 1][1]) for start, stop in zip([0] + stops, stops)]
+
+
+def get_map_partitions(document: bytes, map_range: tuple, dataset_names: list,
+                       chunk_count: int) -> list:
+    """Return the partitions of a map, splitting its things into chunks, or leaving them out
+
+    Parameters:
+    document (bytes): The XML document of the save
+    map_range (tuple): The start and end byte offsets of the map's element
+    dataset_names (list): The names of the datasets to extract from the map
+    chunk_count (int): The maximum number of chunks to split the things of the map into
+
+    Returns:
+    list: The dataset names and the XML fragment of each partition, holding the map's element
+    """
+    things_ranges = find_child_ranges(document, get_content_range(document, map_range), b"things")
+
+    if not things_ranges:
+        return [(dataset_names, document[slice(*map_range)])]
+
+    # The list of things of the map is the last of its children, and is left out without the
+    # datasets of things
+    things_start, things_end = things_ranges[-1]
+    thing_ranges = []
+
+    if any(dataset_name in CHUNK_DATASETS for dataset_name in dataset_names):
+        thing_ranges = find_child_ranges(document, get_content_range(document, things_ranges[-1]),
+                                         b"thing")
+
+    spans = split_ranges(thing_ranges, chunk_count) or [(things_end, things_end)]
+    partitions = []
+
+    for index, (start, end) in enumerate(spans):
+        things = b"<things>" + document[start:end] + b"</things>"
+
+        # The first chunk holds the rest of the map, and the others only the chunk of things
+        if index == 0:
+            partitions.append((dataset_names, document[map_range[0]:things_start] + things
+                               + document[things_end:map_range[1]]))
+        else:
+            partitions.append(([name for name in dataset_names if name in CHUNK_DATASETS],
+                               b"<li>" + things + b"</li>"))
+
+    return partitions
+
+
+def get_partitions(document: bytes, dataset_names: list, chunk_count: int) -> list:
+    """Return the partitions of a save, to extract with the datasets of each partition
+
+    Parameters:
+    document (bytes): The XML document of the save
+    dataset_names (list): The names of the datasets to extract
+    chunk_count (int): The maximum number of chunks to split the things of the maps into
+
+    Returns:
+    list: The dataset names and the XML document of each partition, in document order, which is
+        the whole document if it holds no maps
+    """
+    maps_ranges = find_section_ranges(document, MAPS_SECTION)
+    maps_content_range = get_content_range(document, maps_ranges[0]) if maps_ranges else (0, 0)
+    map_ranges = find_child_ranges(document, maps_content_range, b"li")
+
+    if not map_ranges:
+        return [(dataset_names, document)]
+
+    header = b"".join(
+        document[start:end]
+        for section in [META_SECTION, TICK_MANAGER_SECTION]
+        for start, end in find_section_ranges(document, section)
+    )
+    section_dataset_names = [name for name in dataset_names if name in SECTION_DATASETS]
+    partitions = [(section_dataset_names, get_reduced_document(document, section_dataset_names))]
+    map_dataset_names = [name for name in dataset_names if name in MAP_DATASETS]
+
+    for map_range in map_ranges if map_dataset_names else []:
+        partitions.extend(
+            (names, b"".join([b"<savegame>", header, b"<maps>", fragment, b"</maps></savegame>"]))
+            for names, fragment in get_map_partitions(document, map_range, map_dataset_names,
+                                                      -(-chunk_count // len(map_ranges)))
+        )
+
+    return partitions
+
+
+def merge_dataset_columns(partition_columns: list) -> dict:
+    """Return the columns of each dataset, concatenated across the partitions in order
+
+    Parameters:
+    partition_columns (list): The columns of each dataset extracted from each partition
+
+    Returns:
+    dict: The list of values of each column, keyed by column name, keyed by the dataset name
+    """
+    dataset_columns = {}
+
+    for columns_by_dataset in partition_columns:
+        for dataset_name, columns in columns_by_dataset.items():
+            merged_columns = dataset_columns.setdefault(dataset_name, {
+                column_name: [] for column_name in columns
+            })
+
+            for column_name, values in columns.items():
+                merged_columns[column_name].extend(values)
+
+    return dataset_columns
@@ -0,0 +1,358 @@
+"""Store the plants of a series of snapshots as the changes between consecutive snapshots
+
+Between two nearby saves most plants keep their id, definition, map and position, so those static
+attributes are stored once per plant, which is identified by an integer code. A plant whose static
+attributes change, which is rare, is stored as a new plant replacing the former one. Each snapshot
+only stores compact arrays of the codes of the plants that appeared and disappeared, and of the
+plants whose growth changed, with their new growth.
+
+Every plant ages by the time passed between snapshots, in increments of the 2000 ticks between the
+long ticks of the game, so a plant's age is predicted from the last age stored for it. A new age is
+only stored when the prediction is off by more than a tolerance, which is one long tick interval by
+default. A tolerance of 0 makes the reconstructed snapshots exact.
+
+The memory held by the history therefore grows with the number of plants that appear, disappear or
+grow, instead of with the population of every snapshot. The state of every plant is also kept as a
+checkpoint every few snapshots, so reconstructing a snapshot only applies the changes since the
+checkpoint before it, instead of those of every earlier snapshot.
+"""
+
+import bisect
+
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+AGE_TOLERANCE_TICKS = 2000
+CHECKPOINT_INTERVAL = 16
+MISSING_AGE = -1
+STATIC_COLUMNS = ["plant_id", "plant_definition", "plant_map_id", "plant_position"]
+
+
+def get_numeric_column(values: "pandas.core.series.Series", dtype: str, missing: object) -> \
+        "numpy.ndarray":
+    """Return a column, parsed if it holds text, as a numeric array, replacing missing values
+
+    Parameters:
+    values (pandas.core.series.Series): The values, some of which may be missing
+    dtype (str): The NumPy data type of the array
+    missing (object): The value replacing missing values
+
+    Returns:
+    numpy.ndarray: The numeric values
+    """
+    return pandas.to_numeric(values).fillna(missing).to_numpy(dtype)
+
+
+class PlantHistory:
+    """The plants of a series of snapshots, stored as static attributes and per-snapshot changes"""
+    def __init__(self, age_tolerance: int = AGE_TOLERANCE_TICKS,
+                 checkpoint_interval: int = CHECKPOINT_INTERVAL) -> None:
+        """Initialize an empty PlantHistory object
+
+        Parameters:
+        age_tolerance (int): The largest error, in ticks, allowed in a reconstructed plant age
+        checkpoint_interval (int): The number of snapshots between checkpoints of the state
+
+        Returns:
+        None
+        """
+        self.age_tolerance = age_tolerance
+        self.checkpoint_interval = checkpoint_interval
+        self.plant_codes = {}
+        self.static_columns = {column_name: [] for column_name in STATIC_COLUMNS}
+        self.snapshots = []
+        self.checkpoints = {}
+        self.state = self.get_empty_state(0)
+
+    @classmethod
+    def from_dataframe(cls, dataframe: "pandas.core.frame.DataFrame",
+                       age_tolerance: int = AGE_TOLERANCE_TICKS,
+                       checkpoint_interval: int = CHECKPOINT_INTERVAL) -> "PlantHistory":
+        """Return the history of the plant DataFrame of a series, e.g. SaveSeries.data.plant
+
+        Parameters:
+        dataframe (pandas.core.frame.DataFrame): The plant rows of every snapshot, with their
+            time_ticks
+        age_tolerance (int): The largest error, in ticks, allowed in a reconstructed plant age
+        checkpoint_interval (int): The number of snapshots between checkpoints of the state
+
+        Returns:
+        PlantHistory: The history of the plants, with the snapshots in chronological order
+        """
+        history = cls(age_tolerance, checkpoint_interval)
+
+        for time_ticks, snapshot in dataframe.groupby("time_ticks", sort=True):
+            history.append(time_ticks, snapshot)
+
+        return history
+
+    @staticmethod
+    def get_empty_state(plant_count: int) -> dict:
+        """Return the state of plants that are not alive and have no growth or age stored yet
+
+        Parameters:
+        plant_count (int): The number of plants
+
+        Returns:
+        dict: Whether each plant is alive, its growth, and its last stored age and the time it was
+            stored, each as an array indexed by the plant codes
+        """
+        return {
+            "alive": numpy.zeros(plant_count, dtype=bool),
+            "growth": numpy.full(plant_count, numpy.nan, dtype=numpy.float64),
+            "age": numpy.full(plant_count, MISSING_AGE, dtype=numpy.int32),
+            "age_time_ticks": numpy.zeros(plant_count, dtype=numpy.int64),
+        }
+
+    @property
+    def time_ticks(self) -> list:
+        """Return the in-game time of each snapshot
+
+        Parameters:
+        None
+
+        Returns:
+        list: The time of each snapshot in ticks, in chronological order
+        """
+        return [snapshot["time_ticks"] for snapshot in self.snapshots]
+
+    @property
+    def nbytes(self) -> int:
+        """Return the number of bytes held by the arrays of changes of every snapshot and checkpoint
+
+        Parameters:
+        None
+
+        Returns:
+        int: The size of the arrays in bytes
+        """
+        return sum(
+            array.nbytes
+            for arrays in [*self.snapshots, *self.checkpoints.values()]
+            for array in arrays.values() if isinstance(array, numpy.ndarray)
+        )
+
+    @property
+    def plants(self) -> "pandas.core.frame.DataFrame":
+        """Return the static attributes of every plant seen in the series
+
+        Parameters:
+        None
+
+        Returns:
+        pandas.core.frame.DataFrame: The static attributes of each plant, indexed by its code
+        """
+        return pandas.DataFrame(self.static_columns)
+
+    def add_plants(self, snapshot: "pandas.core.frame.DataFrame") -> "numpy.ndarray":
+        """Return the codes of the plants of a snapshot, storing the attributes of new plants
+
+        Parameters:
+        snapshot (pandas.core.frame.DataFrame): The plant rows of the snapshot
+
+        Returns:
+        numpy.ndarray: The code of the plant of each row
+        """
+        plant_count = len(self.plant_codes)
+        codes = numpy.fromiter(
+            (self.plant_codes.setdefault(plant_key, len(self.plant_codes))
+             for plant_key in zip(*(snapshot[column_name] for column_name in STATIC_COLUMNS))),
+            dtype=numpy.int32, count=len(snapshot.index))
+        new_plants = codes >= plant_count
+
+        for column_name, values in self.static_columns.items():
+            values.extend(snapshot[column_name].to_numpy()[new_plants])
+
+        self.reserve(len(self.plant_codes))
+
+        return codes
+
+    def reserve(self, plant_count: int) -> None:
+        """Make room in the state for a number of plants, doubling its capacity when it is full
+
+        The plants past those seen so far are not alive, so the state arrays may be longer than the
+        number of plants without changing any snapshot.
+
+        Parameters:
+        plant_count (int): The number of plants the state must hold
+
+        Returns:
+        None
+        """
+        capacity = len(self.state["alive"])
+
+        if plant_count <= capacity:
+            return
+
+        state = self.get_empty_state(max(plant_count, 2 * capacity))
+
+        for name, values in self.state.items():
+            state[name][:capacity] = values
+
+        self.state = state
+
+    def append(self, time_ticks: int, snapshot: "pandas.core.frame.DataFrame") -> None:
+        """Store the changes from the last snapshot to a later one
+
+        Parameters:
+        time_ticks (int): The in-game time of the snapshot, after that of the last snapshot
+        snapshot (pandas.core.frame.DataFrame): The plant rows of the snapshot
+
+        Returns:
+        None
+        """
+        assert not self.snapshots or time_ticks > self.snapshots[-1]["time_ticks"]
+        codes = self.add_plants(snapshot)
+        state = self.state
+        was_alive = state["alive"][codes]
+        alive = numpy.zeros_like(state["alive"])
+        alive[codes] = True
+        growth = get_numeric_column(snapshot["plant_growth"], numpy.float64, numpy.nan)
+        age = get_numeric_column(snapshot["plant_age"], numpy.int32, MISSING_AGE)
+
+        # Store the growth of the plants that appeared or whose growth changed
+        growth_changed = ~was_alive | ~(
+            (growth == state["growth"][codes])
+            | (numpy.isnan(growth) & numpy.isnan(state["growth"][codes])))
+
+        # Store the age of the plants that appeared or aged differently than predicted
+        predicted_age = self.predict_age(codes, time_ticks)
+        age_changed = ~was_alive | ((age == MISSING_AGE) != (predicted_age == MISSING_AGE)) \
+            | (numpy.abs(age - predicted_age) > self.age_tolerance)
+
+        self.snapshots.append({
+            "time_ticks": time_ticks,
+            "appeared": codes[~was_alive],
+            "disappeared": numpy.flatnonzero(state["alive"] & ~alive).astype(numpy.int32),
+            "growth_codes": codes[growth_changed],
+            "growth": growth[growth_changed],
+            "age_codes": codes[age_changed],
+            "age": age[age_changed],
+        })
+        self.apply_changes(state, self.snapshots[-1])
+
+        if len(self.snapshots) % self.checkpoint_interval == 0:
+            self.checkpoints[len(self.snapshots) - 1] = {
+                name: values[:len(self.plant_codes)].copy() for name, values in state.items()
+            }
+
+    @staticmethod
+    def apply_changes(state: dict, snapshot: dict) -> None:
+        """Update the state of the plants with the changes stored for a snapshot
+
+        Parameters:
+        state (dict): The state of the plants, see get_empty_state, which is changed in place
+        snapshot (dict): The changes stored for the snapshot
+
+        Returns:
+        None
+        """
+        state["alive"][snapshot["appeared"]] = True
+        state["alive"][snapshot["disappeared"]] = False
+        state["growth"][snapshot["growth_codes"]] = snapshot["growth"]
+        state["age"][snapshot["age_codes"]] = snapshot["age"]
+        state["age_time_ticks"][snapshot["age_codes"]] = snapshot["time_ticks"]
+
+    def predict_age(self, codes: "numpy.ndarray", time_ticks: int,
+                    state: dict = None) -> "numpy.ndarray":
+        """Return the ages of plants predicted from the last age stored for each of them
+
+        Parameters:
+        codes (numpy.ndarray): The codes of the plants
+        time_ticks (int): The in-game time to predict the ages at
+        state (dict): The state of the plants, the state after the last snapshot if None
+
+        Returns:
+        numpy.ndarray: The predicted age of each plant in ticks, or MISSING_AGE if unknown
+        """
+        state = self.state if state is None else state
+        age = state["age"][codes].astype(numpy.int64)
+
+        return numpy.where(age == MISSING_AGE, MISSING_AGE,
+                           age + time_ticks - state["age_time_ticks"][codes])
+
+    def get_state(self, snapshot_index: int) -> dict:
+        """Return the state of the plants after a snapshot, from the last checkpoint at or before it
+
+        Parameters:
+        snapshot_index (int): The position of the snapshot
+
+        Returns:
+        dict: The state of the plants, see get_empty_state
+        """
+        interval = self.checkpoint_interval
+        checkpoint_index = (snapshot_index + 1) // interval * interval - 1
+        state = self.get_empty_state(len(self.plant_codes))
+
+        if checkpoint_index in self.checkpoints:
+            for name, values in self.checkpoints[checkpoint_index].items():
+                state[name][:len(values)] = values
+
+        for snapshot in self.snapshots[checkpoint_index + 1:snapshot_index + 1]:
+            self.apply_changes(state, snapshot)
+
+        return state
+
+    def get_snapshot(self, time_ticks: int) -> "pandas.core.frame.DataFrame":
+        """Reconstruct the plants of a snapshot from the last checkpoint and the changes since it
+
+        Parameters:
+        time_ticks (int): The in-game time of the snapshot
+
+        Returns:
+        pandas.core.frame.DataFrame: The plants alive in the snapshot, ordered by their codes, with
+            their growth, their age as a nullable integer, within the age tolerance, and time_ticks
+        """
+        snapshot_index = bisect.bisect_left(self.time_ticks, time_ticks)
+        assert self.time_ticks[snapshot_index:snapshot_index + 1] == [time_ticks]
+        state = self.get_state(snapshot_index)
+        codes = numpy.flatnonzero(state["alive"])
+        age = self.predict_age(codes, time_ticks, state)
+        dataframe = self.plants.iloc[codes].reset_index(drop=True)
+        dataframe["plant_growth"] = state["growth"][codes]
+        dataframe["plant_age"] = pandas.arrays.IntegerArray(age, age == MISSING_AGE)
+        dataframe["time_ticks"] = time_ticks
+
+        return dataframe
+
+    def get_births_and_deaths(self, by_definition: bool = False) -> "pandas.core.frame.DataFrame":
+        """Return the number of plants that appeared and disappeared in each interval
+
+        The plants of the first snapshot all count as births, and the births and deaths of each
+        later snapshot are those since the previous snapshot.
+
+        Parameters:
+        by_definition (bool): Count the plants of each definition separately if True
+
+        Returns:
+        pandas.core.frame.DataFrame: The births and deaths, indexed by time_ticks and, if counted
+            separately, plant_definition
+        """
+        events = {"births": "appeared", "deaths": "disappeared"}
+        event_counts = [
+            len(snapshot[key]) for key in events.values() for snapshot in self.snapshots
+        ]
+        codes = numpy.concatenate([
+            snapshot[key] for key in events.values() for snapshot in self.snapshots
+        ])
+        dataframe = pandas.DataFrame({
+            "time_ticks": numpy.repeat(self.time_ticks * len(events), event_counts),
+            "event": numpy.repeat(list(events), len(self.snapshots)).repeat(event_counts),
+        })
+        index_names = ["time_ticks"]
+
+        if by_definition:
+            dataframe["plant_definition"] = numpy.array(
+                self.static_columns["plant_definition"], dtype=object)[codes]
+            index_names.append("plant_definition")
+
+        counts = dataframe.groupby([*index_names, "event"]).size().unstack("event", fill_value=0)
+        counts = counts.reindex(columns=list(events), fill_value=0)
+        counts.columns.name = None
+
+        if not by_definition:
+            counts = counts.reindex(self.time_ticks, fill_value=0)
+
+        return counts
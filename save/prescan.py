@@ -0,0 +1,83 @@
+"""Locate the byte ranges of the sections of a save that the datasets need before parsing any XML
+
+Most of a save is terrain grids, compressed map data, world tiles and things that are never read.
+Instead of tokenizing all of it, the decompressed document is searched for the start and end tags
+of the needed sections with plain byte searches, and only those fragments are joined into a much
+smaller document that is then parsed as usual.
+"""
+
+from save.datasets import ITEM_CLASSES
+
+# The start and end tags of each section, and whether only its first occurrence is needed. The
+# start tags are matched byte for byte, in the form RimWorld writes them.
+META_SECTION = (b"<meta>", b"</meta>", True)
+TICK_MANAGER_SECTION = (b"<tickManager>", b"</tickManager>", True)
+DATASET_SECTIONS = {
+    "mod": [META_SECTION],
+    "pawn": [(b"<tales>", b"</tales>", True)],
+    "plant": [(b"<thing Class=\"Plant\">", b"</thing>", False)],
+    "weather": [(b"<weatherManager>", b"</weatherManager>", False)],
+    "animal": [(b"<thing Class=\"Pawn\">", b"</thing>", False)],
+    "item": [(f"<thing Class=\"{class_name}\">".encode(), b"</thing>", False)
+             for class_name in ITEM_CLASSES],
+    "building": [(b"<thing Class=\"", b"</thing>", False)],
+}
+
+
+def find_section_ranges(save_bytes: bytes, section: tuple) -> list:
+    """Return the byte ranges of the occurrences of a section, which must not nest
+
+    Parameters:
+    save_bytes (bytes): The XML document
+    section (tuple): The start tag, end tag and whether only the first occurrence is needed
+
+    Returns:
+    list: The (start, end) byte offsets of each complete occurrence of the section
+    """
+    start_tag, end_tag, first_only = section
+    ranges = []
+    start = save_bytes.find(start_tag)
+
+    while start != -1:
+        end = save_bytes.find(end_tag, start)
+
+        if end == -1:
+            break
+
+        end += len(end_tag)
+        ranges.append((start, end))
+
+        if first_only:
+            break
+
+        start = save_bytes.find(start_tag, end)
+
+    return ranges
+
+
+def get_reduced_document(save_bytes: bytes, dataset_names: list) -> bytes:
+    """Return a document holding only the sections needed by the datasets, in document order
+
+    The meta and tickManager sections, which hold the game version and time, are always kept.
+
+    Parameters:
+    save_bytes (bytes): The XML document of the save file
+    dataset_names (list): The names of the datasets to extract
+
+    Returns:
+    bytes: The reduced XML document, whose root element directly contains each section
+    """
+    sections = {META_SECTION, TICK_MANAGER_SECTION}
+
+    for dataset_name in dataset_names:
+        sections.update(DATASET_SECTIONS[dataset_name])
+
+    # A thing may be found by the sections of several datasets, and is kept once
+    ranges = sorted({
+        section_range
+        for section in sections
+        for section_range in find_section_ranges(save_bytes, section)
+    })
+    fragments = [save_bytes[start:end] for start, end in ranges]
+
+    return b"".join([b"<savegame>", *fragments, b"</savegame>"])
@@ -0,0 +1,264 @@
+"""Keep the data of a save as a compact record, holding its datasets only until a series takes them
+
+A Save holds a few scalar fields, such as its path and in-game time, and the columns of its
+datasets, which it turns into DataFrames when a dataset is first accessed. Once a series aggregates
+its saves, the columns of each save are dropped in favor of a SnapshotColumns reference to its rows
+of the series DataFrames, so a series of hundreds of saves holds each row once, and the DataFrame
+of a save is sliced from the series when it is first accessed. That DataFrame is kept until the
+series aggregates its saves again, which replaces the SnapshotColumns of every save.
+
+The XML tree of a save is never kept: Save.open_root parses the save file again on demand.
+"""
+
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+
+class SnapshotColumns:
+    """The rows of a snapshot in the DataFrames of a series, read like the columns of a save"""
+    __slots__ = ("dataframes", "row_slices", "layout", "time_ticks", "snapshot_dataframes")
+
+    def __init__(self, dataframes: dict, row_slices: dict, layout: dict, time_ticks: int) -> None:
+        """Initialize the SnapshotColumns object
+
+        Parameters:
+        dataframes (dict): The DataFrame of each dataset across the series, keyed by its name
+        row_slices (dict): The positions of the snapshot's rows in each DataFrame, as a slice
+        layout (dict): The names of the extracted columns of each dataset, keyed by its name
+        time_ticks (int): The in-game time of the snapshot in ticks
+
+        Returns:
+        None
+        """
+        self.dataframes = dataframes
+        self.row_slices = row_slices
+        self.layout = layout
+        self.time_ticks = time_ticks
+        self.snapshot_dataframes = {}
+
+    def __iter__(self) -> iter:
+        """Return an iterator over the names of the datasets
+
+        Parameters:
+        None
+
+        Returns:
+        iter: The iterator over the dataset names
+        """
+        return iter(self.layout)
+
+    def get_row_count(self, dataset_name: str) -> int:
+        """Return the number of rows of a dataset
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+
+        Returns:
+        int: The number of rows
+        """
+        row_slice = self.row_slices[dataset_name]
+
+        return row_slice.stop - row_slice.start
+
+    def get_column(self, dataset_name: str, column_name: str) -> "pandas.core.series.Series":
+        """Return the rows of the snapshot in a column of the series
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+
+        Returns:
+        pandas.core.series.Series: The values of the column, sliced without copying
+        """
+        return self.dataframes[dataset_name][column_name].iloc[self.row_slices[dataset_name]]
+
+    def read_column(self, dataset_name: str, column_name: str, output: "numpy.ndarray") -> None:
+        """Write the values of a column into an object array, e.g. a slice of a series column
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+        output (numpy.ndarray): The object array to write the values to, one per row
+
+        Returns:
+        None
+        """
+        output[:] = self.get_column(dataset_name, column_name).to_numpy(dtype=object)
+
+    def read_numeric(self, dataset_name: str, column_name: str, output: "numpy.ndarray",
+                     mask_output: "numpy.ndarray") -> None:
+        """Copy the values of a numeric column, and its missing mask, into arrays
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+        output (numpy.ndarray): The array of the data type of the column to write the values to
+        mask_output (numpy.ndarray): The boolean array to write whether each value is missing to
+
+        Returns:
+        None
+        """
+        column = self.get_column(dataset_name, column_name)
+        output[:] = column.to_numpy(dtype=output.dtype,
+                                    na_value=numpy.nan if output.dtype.kind == "f" else 0)
+        mask_output[:] = column.isna().to_numpy()
+
+    def read_codes(self, dataset_name: str, column_name: str) -> tuple:
+        """Return the distinct values of an interned, categorical column and the code of each row
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+
+        Returns:
+        tuple: The array of distinct values of the snapshot, and the int32 array of the position of
+            the value of each row in it, or -1 for a missing value
+        """
+        categorical = self.get_column(dataset_name, column_name).array
+        series_codes = categorical.codes
+        used_codes = numpy.unique(series_codes[series_codes >= 0])
+        codes = numpy.searchsorted(used_codes, series_codes).astype(numpy.int32)
+        codes[series_codes < 0] = -1
+
+        return categorical.categories.to_numpy()[used_codes], codes
+
+    def get_dataframe(self, dataset_name: str) -> "pandas.core.frame.DataFrame":
+        """Return the DataFrame of a dataset of the snapshot, as the save would generate it
+
+        The DataFrame copies the rows of the snapshot, converting the interned columns to objects,
+        so it is only built on first access and the same DataFrame is returned afterwards.
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+
+        Returns:
+        pandas.core.frame.DataFrame: The rows of the snapshot with its time, which the rows of a
+            version of the mod list lack, and with the interned columns, which are the extracted
+            columns that are categorical, holding their values rather than codes
+        """
+        if dataset_name in self.snapshot_dataframes:
+            return self.snapshot_dataframes[dataset_name]
+
+        dataframe = self.dataframes[dataset_name].iloc[self.row_slices[dataset_name]]
+
+        # The version of the mod list is only a column of the series, not of the save
+        if dataset_name == "mod":
+            dataframe = dataframe.drop(columns=["mod_list_version"])
+
+        categorical_columns = [
+            column_name for column_name in dataframe.select_dtypes("category").columns
+            if column_name in self.layout[dataset_name]
+        ]
+        self.snapshot_dataframes[dataset_name] = dataframe.assign(
+            time_ticks=self.time_ticks, **{
+                column_name: dataframe[column_name].astype(object).where(
+                    dataframe[column_name].notna(), None)
+                for column_name in categorical_columns
+            })
+
+        return self.snapshot_dataframes[dataset_name]
+
+
+class SaveData:  # pylint: disable=too-many-instance-attributes
+    """The scalar fields of a save and its datasets, generating their DataFrames on first access"""
+    __slots__ = ("path", "file_base_name", "file_size", "game_version", "game_time_ticks",
+                 "game_start_ticks", "metrics", "diagnostics", "dataset_columns", "dataframes",
+                 "dataframe_builder", "root")
+
+    def __init__(self, **fields: dict) -> None:
+        """Initialize the SaveData object, with every field but the given ones unset
+
+        Parameters:
+        fields (dict): The value of each field to set, keyed by the field name
+
+        Returns:
+        None
+        """
+        self.path = self.file_base_name = self.file_size = self.game_version = None
+        self.game_time_ticks = self.game_start_ticks = self.metrics = self.diagnostics = None
+        self.dataset_columns = self.dataframe_builder = self.root = None
+        self.dataframes = {}
+        self.update(**fields)
+
+    def update(self, fields: dict = None, **keyword_fields: dict) -> None:
+        """Set fields from a dictionary and keyword arguments
+
+        Parameters:
+        fields (dict): The value of each field, keyed by the field name
+        keyword_fields (dict): More fields, as keyword arguments
+
+        Returns:
+        None
+        """
+        for field_name, value in {**(fields or {}), **keyword_fields}.items():
+            setattr(self, field_name, value)
+
+    def keys(self) -> list:
+        """Return the names of the datasets of the save
+
+        Parameters:
+        None
+
+        Returns:
+        list: The dataset names
+        """
+        return list(self.dataframes) if self.dataset_columns is None \
+            else list(dict.fromkeys([*self.dataframes, *self.dataset_columns]))
+
+    def __getitem__(self, dataset_name: str) -> "pandas.core.frame.DataFrame":
+        """Return the DataFrame of a dataset, generating the pending DataFrames on first access
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+
+        Returns:
+        pandas.core.frame.DataFrame: The DataFrame of the dataset
+        """
+        if dataset_name in self.dataframes:
+            return self.dataframes[dataset_name]
+
+        if isinstance(self.dataset_columns, SnapshotColumns) \
+                and dataset_name in self.dataset_columns.layout:
+            return self.dataset_columns.get_dataframe(dataset_name)
+
+        builder = self.dataframe_builder
+
+        if builder is None or dataset_name not in (self.dataset_columns or {}):
+            raise KeyError(dataset_name)
+
+        self.dataframe_builder = None
+        builder()  # pylint: disable=not-callable
+
+        return self.dataframes[dataset_name]
+
+    def __setitem__(self, dataset_name: str, dataframe: "pandas.core.frame.DataFrame") -> None:
+        """Store the DataFrame of a dataset
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        dataframe (pandas.core.frame.DataFrame): The DataFrame of the dataset
+
+        Returns:
+        None
+        """
+        self.dataframes[dataset_name] = dataframe
+
+    def __getattr__(self, name: str) -> "pandas.core.frame.DataFrame":
+        """Return the DataFrame of a dataset accessed as an attribute, e.g. data.plant
+
+        Parameters:
+        name (str): The name of the attribute, which is a dataset name
+
+        Returns:
+        pandas.core.frame.DataFrame: The DataFrame of the dataset
+        """
+        # Fields are slots, and only reach this method while unpickling, before they are set
+        if name.startswith("_") or name in self.__slots__:
+            raise AttributeError(name)
+
+        try:
+            return self[name]
+        except KeyError as error:
+            raise AttributeError(name) from error
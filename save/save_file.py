@@ -0,0 +1,605 @@
+"""Extract XML data from a RimWorld save file and return elements"""
+
+import contextlib
+import copy
+import functools
+import gzip
+import logging
+import os
+import pathlib
+import xml.etree.ElementTree
+
+from bunch import Bunch
+
+from save.datasets import COLONY_DATASET_NAMES, DATASET_NAMES, PLANT_SKETCH_DATASETS
+from save.datasets import NUMERIC_COLUMNS, ROW_EXTRACTORS, STREAM_TARGETS, THING_EXTRACTORS
+from save.datasets import PAWN_EXTRACTOR, PLANT_EXTRACTOR, WEATHER_EXTRACTOR
+from save.datasets import add_pawn_name_full, add_weather_map_id, get_game_time
+from save.datasets import get_element_dataset, get_extracted_dataset_names, get_numeric_column
+from save.datasets import transform_pawn, transform_plant, transform_plant_sketch, transform_thing
+from save.diagnostics import Diagnostics
+from save.diff import diff_snapshots
+from save.extraction import get_row_count
+from save.lazy_import import lazy_import
+from save.metrics import Metrics
+from save.parser import get_parser_backend
+from save.partition import get_partitions, merge_dataset_columns
+from save.prescan import get_reduced_document
+from save.record import SaveData
+from save.sketch import CHUNK_ROWS, PlantSketch
+from save.transport import SharedColumns
+
+# Heavy dependencies are only imported once the code path that needs them runs, so importing the
+# module and extracting XML data inside worker processes does not pay for them
+multiprocessing = lazy_import("multiprocessing")
+pandas = lazy_import("pandas")
+
+
+class Save:  # pylint: disable=too-many-public-methods
+    """Extract the XML data from a RimWorld save file and return the elements"""
+    __slots__ = ("parser", "datasets", "data")
+
+    def __init__(self, path_to_save_file: pathlib.Path,  # pylint: disable=too-many-arguments
+                 defer_dataframes: bool = False, parser: object = "auto", datasets: list = None,
+                 workers: int = 1) -> None:
+        """Initialize the Save object by parsing the XML document with the chosen parser backend
+
+        The XML tree is not kept once the datasets are extracted, see open_root to access it.
+
+        Parameters:
+        path_to_save_file (pathlib.Path): The path to the RimWorld save file to be loaded
+        defer_dataframes (bool): Postpone generating the DataFrames, and importing pandas, until a
+            dataset is first accessed, e.g. after a worker process returns the Save to its parent
+        parser (object): The parser backend or its name: auto (lxml if installed), etree or lxml
+        datasets (list): The names of the datasets to extract, all of DATASET_NAMES if None, which
+            may include PLANT_SKETCH_DATASETS to summarize the plant rows, see save.sketch
+        workers (int): The number of processes extracting partitions of the save concurrently, by
+            section and map, see save.partition, or 1 to extract the whole save in this process
+
+        Returns:
+        None
+        """
+        self.parser = get_parser_backend(parser)
+        self.datasets = list(DATASET_NAMES if datasets is None else datasets)
+        self.data = SaveData(path=path_to_save_file,
+                             file_base_name=os.path.basename(path_to_save_file),
+                             file_size=os.path.getsize(path_to_save_file), metrics=Metrics(),
+                             diagnostics=Diagnostics())
+
+        # Extract the singular data points, and the datasets into a temporary location
+        if workers > 1:
+            self.data.update(self.extract_partitions(workers))
+        else:
+            self.data.update(self.extract_document())
+
+        if defer_dataframes:
+            self.data.dataframe_builder = self.build_dataframes
+        else:
+            self.build_dataframes()
+
+        if self.data.diagnostics.missing_counts:
+            logging.info("Missing values in %s: %s", self.data.file_base_name,
+                         self.data.diagnostics.summarize())
+
+        logging.info("Finished creating new Save object from file: %s", self.data.path)
+
+    def is_compressed(self) -> bool:
+        """Return True if the save file is gzip compressed
+
+        Parameters:
+        None
+
+        Returns:
+        bool: Whether the save file is compressed
+        """
+        return os.path.splitext(self.data.path)[1] == ".gz"
+
+    def open_save_file(self) -> object:
+        """Open the save file for reading its XML document, which is decompressed as it is read
+
+        Parameters:
+        None
+
+        Returns:
+        object: The binary file, to be used as a context manager
+        """
+        # Handle gzip compressed files
+        if self.is_compressed():
+            return gzip.open(self.data.path, "rb")
+
+        return open(self.data.path, "rb")
+
+    def read_save_bytes(self) -> bytes:
+        """Read the whole XML document of the save file into memory, decompressing it if needed
+
+        Only the modes that search the bytes of the document need it whole, i.e. the prescan mode
+        and the partitions of a save, while the tree and stream modes parse the save file as it is
+        read, see extract_document.
+
+        Parameters:
+        None
+
+        Returns:
+        bytes: The XML document of the save file
+        """
+        with self.data.metrics.span("decompress" if self.is_compressed() else "read") as span, \
+                self.open_save_file() as save_file:
+            save_bytes = save_file.read()
+            span["bytes"] = len(save_bytes)
+
+        return save_bytes
+
+    @contextlib.contextmanager
+    def open_root(self) -> iter:
+        """Parse the whole XML tree of the save file again, keeping its root only in the context
+
+        Parameters:
+        None
+
+        Returns:
+        iter: A context manager giving the root element, which is also set as the root field
+        """
+        with self.data.metrics.span("parse", parser=self.parser.name), \
+                self.open_save_file() as save_file:
+            self.data.root = self.parser.parse(save_file)
+
+        try:
+            yield self.data.root
+        finally:
+            self.data.root = None
+
+    def extract_document(self, source: object = None) -> dict:
+        """Parse an XML document with the parser backend and extract the data of the datasets
+
+        In the tree and stream modes the save file is parsed as it is read and decompressed, so the
+        whole document is never held in memory, and the parse span includes reading the file.
+
+        Parameters:
+        source (object): The XML document as bytes, or a binary file to read it from, which is the
+            save file if None
+
+        Returns:
+        dict: The game version, the game time and start in ticks and the columns of each dataset
+        """
+        if source is None:
+            if self.parser.mode != "prescan":
+                with self.open_save_file() as save_file:
+                    return self.extract_document(save_file)
+
+            source = self.read_save_bytes()
+
+        if self.parser.mode == "stream":
+            return self.stream_save_data(source)
+
+        if self.parser.mode == "prescan":
+            # Keep only the sections of the document that the datasets need
+            with self.data.metrics.span("prescan") as span:
+                source = get_reduced_document(source, get_extracted_dataset_names(self.datasets))
+                span["bytes"] = len(source)
+
+        with self.data.metrics.span("parse", parser=self.parser.name):
+            self.data.root = self.parser.parse(source)
+
+        del source
+        data = self.extract_tree_data()
+
+        # Delete the root object to free up memory
+        self.data.root = None
+
+        return data
+
+    def extract_partitions(self, workers: int) -> dict:
+        """Extract the partitions of the save in a pool of worker processes and merge the results
+
+        Parameters:
+        workers (int): The number of worker processes, and of chunks the things of the maps are
+            split into
+
+        Returns:
+        dict: The game version, the game time and start in ticks and the columns of each dataset
+        """
+        with self.data.metrics.span("partition") as span:
+            partitions = get_partitions(self.read_save_bytes(),
+                                        get_extracted_dataset_names(self.datasets), workers)
+            span["rows"] = len(partitions)
+
+        with self.data.metrics.span("pool_dispatch", rows=len(partitions)), \
+                multiprocessing.Pool(min(workers, len(partitions))) as pool:
+            results = pool.map(self.extract_partition, partitions)
+
+        for index, result in enumerate(results):
+            self.data.metrics.add_child(f"partition_{index}", result.pop("metrics"))
+            self.data.diagnostics.merge(result.pop("diagnostics"))
+
+        # Merge the rows of the partitions in document order, numbering the maps across partitions
+        dataset_columns = merge_dataset_columns([result["dataset_columns"] for result in results])
+
+        if "weather" in dataset_columns:
+            add_weather_map_id(dataset_columns["weather"])
+
+        return {**results[0], "dataset_columns": self.finish_datasets(dataset_columns)}
+
+    def extract_partition(self, partition: tuple) -> dict:
+        """Extract the datasets of a partition of the save, in a worker process
+
+        Parameters:
+        partition (tuple): The names of the datasets to extract and the XML document of the
+            partition, see save.partition
+
+        Returns:
+        dict: The game version, the game time and start in ticks, the columns of each dataset and
+            the metrics and diagnostics of the extraction
+        """
+        self.datasets, save_bytes = partition
+        self.data.metrics = Metrics()
+        self.data.diagnostics = Diagnostics()
+
+        return {
+            **self.extract_document(save_bytes),
+            "metrics": self.data.metrics,
+            "diagnostics": self.data.diagnostics,
+        }
+
+    def add_value_to_dictionary_from_xml_with_null_handling(
+            self, dictionary: dict, xml_element: xml.etree.ElementTree.Element,
+            parent_element: xml.etree.ElementTree.Element, column_name: str) -> None:
+        """Add a value to to key, column name, to the given dictionary source from xml_element
+
+        A missing element adds a None value and is tallied in the save's diagnostics, which only
+        dumps the XML of the parent element when the save.xml_dump logger is enabled for DEBUG.
+
+        Parameters:
+        dictionary (dict): The dictionary to add the value to
+        xml_element (xml.etree.ElementTree.Element): The source XML element for the current row
+        parent_element (xml.etree.ElementTree.Element): The parent element of the source element
+        column_name (str): The name of the key/column to add to the dictionary
+
+        Returns:
+        None
+        """
+        if xml_element is None:
+            dictionary[column_name] = None
+            self.data.diagnostics.record_missing(column_name, parent_element)
+        else:
+            dictionary[column_name] = xml_element.text
+
+    def extract_tree_data(self) -> dict:
+        """Extract the data by searching the tree of the whole XML document, parsed into the root
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The game version, the game time and start in ticks and the columns of each dataset
+        """
+        extractors = {
+            "mod": self.extract_mod_list,
+            "pawn": self.extract_pawn_data,
+            "plant": self.extract_plant_data,
+            "weather": self.extract_weather_data,
+        }
+        extracted_dataset_names = get_extracted_dataset_names(self.datasets)
+
+        # The things of every thing dataset are told apart in one traversal of the thing elements
+        if any(dataset_name in COLONY_DATASET_NAMES for dataset_name in extracted_dataset_names):
+            extractors.update({
+                dataset_name: functools.partial(THING_EXTRACTORS[dataset_name].extract, elements,
+                                                self.data.diagnostics)
+                for dataset_name, elements in self.find_things().items()
+            })
+
+        return {
+            "game_version": self.data.root.find("./meta/gameVersion").text,
+            **get_game_time(self.data.root.find(".//tickManager")),
+            "dataset_columns": self.extract_datasets({
+                dataset_name: extractors[dataset_name]
+                for dataset_name in extracted_dataset_names
+            }),
+        }
+
+    def stream_save_data(self, source: object) -> None:
+        """Extract the data while streaming through the XML document, without building its tree
+
+        The rows of the pawn, weather and thing datasets are extracted as each element ends, after
+        which the parser backend discards the element. Only the first of each other section is kept.
+        Without the plant dataset, the plant rows are summarized into the plant sketch datasets in
+        chunks of CHUNK_ROWS rows, so the rows of the save are never held at once.
+
+        Parameters:
+        source (object): The XML document of the save file as bytes, or a binary file to read it
+            from
+
+        Returns:
+        dict: The game version, the game time and start in ticks and the columns of each dataset
+        """
+        extracted_dataset_names = get_extracted_dataset_names(self.datasets)
+        buffers = {
+            dataset_name: ROW_EXTRACTORS[dataset_name].new_buffers()
+            for dataset_name in extracted_dataset_names if dataset_name in ROW_EXTRACTORS
+        }
+        sections = {}
+        targets = [("meta", None), ("tickManager", None)]
+
+        for dataset_name in extracted_dataset_names:
+            targets.extend(STREAM_TARGETS[dataset_name])
+
+        sketch = PlantSketch() \
+            if "plant" in extracted_dataset_names and "plant" not in self.datasets else None
+
+        with self.data.metrics.span("parse", parser=self.parser.name, mode=self.parser.mode):
+            for element in self.parser.iter_targets(source, targets):
+                dataset_name = get_element_dataset(element)
+
+                if dataset_name in buffers:
+                    ROW_EXTRACTORS[dataset_name].append_row(element, buffers[dataset_name])
+
+                    if sketch is not None and len(buffers["plant"][0]) >= CHUNK_ROWS:
+                        self.sketch_plant_rows(buffers["plant"], sketch)
+                elif element.tag in ("meta", "tickManager") and element.tag not in sections:
+                    # Copy the section, because the parser backend may clear the element
+                    sections[element.tag] = copy.deepcopy(element)
+
+        # Finish the datasets from the rows and sections collected while streaming
+        diagnostics = self.data.diagnostics
+        extractors = {
+            "mod": lambda: self.extract_mod_list(sections["meta"]),
+            "pawn": lambda: add_pawn_name_full(PAWN_EXTRACTOR.get_columns(buffers["pawn"],
+                                                                          diagnostics)),
+            "weather": lambda: add_weather_map_id(
+                WEATHER_EXTRACTOR.get_columns(buffers["weather"], diagnostics)),
+        }
+        extractors.update({
+            dataset_name: functools.partial(extractor.get_columns, buffers[dataset_name],
+                                            diagnostics)
+            for dataset_name, extractor in THING_EXTRACTORS.items() if dataset_name in buffers
+        })
+
+        return {
+            "game_version": sections["meta"].find("gameVersion").text,
+            **get_game_time(sections["tickManager"]),
+            "dataset_columns": self.extract_datasets({
+                dataset_name: extractors[dataset_name] for dataset_name in extracted_dataset_names
+            }, sketch),
+        }
+
+    def sketch_plant_rows(self, buffers: list, sketch: PlantSketch) -> None:
+        """Summarize the plant rows streamed so far, emptying their buffers
+
+        Parameters:
+        buffers (list): The column buffers of the plant rows, which are emptied in place
+        sketch (PlantSketch): The sketch to add the rows to
+
+        Returns:
+        None
+        """
+        self.data.diagnostics.dataset_name = "plant"
+        sketch.add_rows(PLANT_EXTRACTOR.get_columns(buffers, self.data.diagnostics))
+
+        for buffer in buffers:
+            buffer.clear()
+
+    def finish_datasets(self, dataset_columns: dict, sketch: PlantSketch = None) -> dict:
+        """Return the columns of the datasets of the save, summarizing the plant rows if needed
+
+        Parameters:
+        dataset_columns (dict): The columns of each extracted dataset, keyed by the dataset name
+        sketch (PlantSketch): The sketch holding the plant rows summarized so far, if any
+
+        Returns:
+        dict: The columns of each dataset of the save, keyed by the dataset name
+        """
+        if any(dataset_name in PLANT_SKETCH_DATASETS for dataset_name in self.datasets):
+            sketch = sketch or PlantSketch()
+
+            with self.data.metrics.span("sketch_plant") as span:
+                sketch.add_rows(dataset_columns["plant"])
+                dataset_columns.update(sketch.get_dataset_columns())
+                span["rows"] = sketch.row_count
+
+        return {dataset_name: dataset_columns[dataset_name] for dataset_name in self.datasets}
+
+    def extract_datasets(self, extractors: dict, sketch: PlantSketch = None) -> dict:
+        """Extract the columns of each dataset, timing each extraction
+
+        Parameters:
+        extractors (dict): The function returning the columns of each dataset, keyed by its name
+        sketch (PlantSketch): The sketch holding the plant rows summarized so far, if any
+
+        Returns:
+        dict: The columns of each dataset, keyed by the dataset name
+        """
+        dataset_columns = {}
+
+        for dataset_name, extractor in extractors.items():
+            self.data.diagnostics.dataset_name = dataset_name
+
+            with self.data.metrics.span(f"extract_{dataset_name}") as span:
+                dataset_columns[dataset_name] = extractor()
+                span["rows"] = get_row_count(dataset_columns[dataset_name])
+
+        return self.finish_datasets(dataset_columns, sketch)
+
+    def extract_mod_list(self, meta: xml.etree.ElementTree.Element = None) -> dict:
+        """Extract the list of mods installed in the save game
+
+        Parameters:
+        meta (xml.etree.ElementTree.Element): The meta element, found in the root if None
+
+        Returns:
+        dict: The list of values of each column of installed mod metadata, keyed by column name
+        """
+        if meta is None:
+            meta = self.data.root.find("./meta")
+
+        return {
+            "mod_id": [element.text for element in meta.find("modIds")],
+            "mod_name": [element.text for element in meta.find("modNames")],
+            "mod_steam_id": [element.text for element in meta.find("modSteamIds")],
+        }
+
+    def extract_pawn_data(self) -> dict:
+        """Return the columns of pawn data extracted from the tales about single pawns
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The list of values of each column of pawn data, keyed by column name
+        """
+        pawn_data_elements = self.parser.find_all(self.data.root, "li", "Tale_SinglePawn")
+
+        return add_pawn_name_full(PAWN_EXTRACTOR.extract(pawn_data_elements,
+                                                         self.data.diagnostics))
+
+    def extract_plant_data(self) -> dict:
+        """Return the columns of plant data
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The list of values of each column of plant data, keyed by column name
+        """
+        xml_elements = self.parser.find_all(self.data.root, "thing", "Plant")
+
+        return PLANT_EXTRACTOR.extract(xml_elements, self.data.diagnostics)
+
+    def find_things(self) -> dict:
+        """Return the thing elements of each thing dataset, found in one traversal of the things
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The list of thing elements of each thing dataset, in document order, keyed by the
+            dataset name
+        """
+        things = {dataset_name: [] for dataset_name in THING_EXTRACTORS}
+
+        for element in self.parser.find_all(self.data.root, "thing"):
+            dataset_name = get_element_dataset(element)
+
+            if dataset_name is not None:
+                things[dataset_name].append(element)
+
+        return things
+
+    def extract_weather_data(self) -> dict:
+        """Return the weather data of each map
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The list of values of each column of weather data, one row per map, keyed by column
+            name
+        """
+        xml_elements = self.parser.find_all(self.data.root, "weatherManager")
+
+        return add_weather_map_id(WEATHER_EXTRACTOR.extract(xml_elements, self.data.diagnostics))
+
+    def build_dataframes(self) -> None:
+        """Generate and transform the pandas DataFrames from the extracted datasets
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        # Generate pandas DataFrames from the extracted columns of each dataset
+        self.generate_dataframes()
+
+        # Delete the extracted columns of each dataset to reduce memory usage, unless they are
+        # shared with a series that has yet to aggregate them, which then replaces them
+        if not isinstance(self.data.dataset_columns, SharedColumns):
+            self.data.dataset_columns = None
+
+        # Apply transformations to the DataFrames of the extracted datasets
+        if "pawn" in self.datasets:
+            with self.data.metrics.span("transform_pawn", rows=len(self.data.pawn.index)):
+                self.transform_pawn_dataframe()
+
+        if "plant" in self.datasets:
+            with self.data.metrics.span("transform_plant", rows=len(self.data.plant.index)):
+                self.transform_plant_dataframe()
+
+        for dataset_name in PLANT_SKETCH_DATASETS:
+            if dataset_name in self.datasets:
+                transform_plant_sketch(self.data[dataset_name], dataset_name)
+
+        for dataset_name in COLONY_DATASET_NAMES:
+            if dataset_name in self.datasets:
+                transform_thing(self.data[dataset_name], dataset_name)
+
+    def generate_dataframes(self) -> None:
+        """Generate pandas DataFrames for each dataset
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        # Validate the input dataset count
+        assert 1 <= len(self.data.dataset_columns) <= 100
+
+        logging.debug("Generating pandas DataFrames for %d datasets\n%s",
+                      len(self.data.dataset_columns), list(self.data.dataset_columns))
+
+        for dataset_name, dataset in self.data.dataset_columns.items():
+            # Validate the input dictionary and keys
+            assert isinstance(dataset, dict)
+            assert isinstance(dataset_name, str)
+
+            with self.data.metrics.span(f"dataframe_{dataset_name}", rows=get_row_count(dataset)):
+                # Generate the pandas dataframe from the columns in dataset_columns, typing the
+                # numeric columns
+                numeric_columns = NUMERIC_COLUMNS.get(dataset_name, {})
+                self.data[dataset_name] = pandas.DataFrame({
+                    column_name: get_numeric_column(values, numeric_columns[column_name])
+                    if column_name in numeric_columns else values
+                    for column_name, values in dataset.items()
+                })
+
+                # Add a time dimension for in-game time based on ticks passed
+                self.data[dataset_name]["time_ticks"] = self.data.game_time_ticks
+
+    def transform_pawn_dataframe(self) -> None:
+        """Apply transformations to the pawn DataFrame
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        transform_pawn(self.data.pawn)
+
+    def transform_plant_dataframe(self) -> None:
+        """Transform the plants DataFrame by adding calculated columns
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        transform_plant(self.data.plant)
+
+    def diff(self, other: "Save") -> Bunch:
+        """Return the changes of each dataset from this save to another, e.g. the next autosave
+
+        The DataFrames each save has generated are compared, without parsing either save again.
+
+        Parameters:
+        other (Save): The later save
+
+        Returns:
+        Bunch: The rows added, removed and changed of each dataset both saves hold, keyed by the
+            dataset name, see save.diff.diff_dataset
+        """
+        return diff_snapshots(*(
+            {dataset_name: save.data[dataset_name] for dataset_name in save.datasets}
+            for save in [self, other]
+        ))
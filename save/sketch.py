@@ -0,0 +1,173 @@
+"""Summarize the plant rows of a save in bounded memory, for the datasets of the approximate mode
+
+A PlantSketch takes the plant rows in chunks, e.g. while the save is streamed, and keeps:
+    plant_species: The exact number of plants of each definition
+    plant_growth: The exact number of plants in each growth bin of transform_plant, every bin listed
+    plant_sample: A uniform random sample of up to SAMPLE_SIZE plant rows, without replacement, for
+        table previews and statistics of the rows
+
+The counts are exact, so population and growth histograms match the exact mode. Statistics of the
+sample are estimates: by the Dvoretzky-Kiefer-Wolfowitz inequality, with probability of at least
+the given confidence, every quantile of the sample, e.g. the median growth of describe(), is within
+get_quantile_error() of its rank in the whole population, which is 4.3% of the rows for 1000 rows
+at 95% confidence, and 0 when the sample holds every row. The mean of a sample of k of n rows has a
+standard error of the standard deviation times sqrt((1 - k / n) / k).
+
+With a streaming parser backend, at most CHUNK_ROWS plant rows are held at once while a save is
+extracted, besides the sample. The tree modes and partitioned saves hold the plant rows of the save
+until it is summarized, and a series of saves then holds the summaries alone.
+"""
+
+import collections
+import math
+import random
+import sys
+
+from save.datasets import PLANT_EXTRACTOR, PLANT_GROWTH_BINS
+from save.extraction import get_row_count
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+
+SAMPLE_SIZE = 1000
+CHUNK_ROWS = 10000
+
+
+def get_quantile_error(sample_size: int, row_count: int, confidence: float = 0.95) -> float:
+    """Return the bound on the rank error of the quantiles of a uniform sample, as a share of rows
+
+    Parameters:
+    sample_size (int): The number of rows of the sample
+    row_count (int): The number of rows the sample was drawn from
+    confidence (float): The probability that every quantile is within the bound
+
+    Returns:
+    float: The Dvoretzky-Kiefer-Wolfowitz bound, or 0 if the sample holds every row
+    """
+    if sample_size >= row_count:
+        return 0.0
+
+    return math.sqrt(math.log(2 / (1 - confidence)) / (2 * sample_size))
+
+
+def get_growth_bin_positions(values: list) -> "numpy.ndarray":
+    """Return the growth bin of each plant growth value, binned as transform_plant bins it
+
+    Parameters:
+    values (list): The plant growth of each row, as text between 0 and 1, or None
+
+    Returns:
+    numpy.ndarray: The position of the upper edge of the bin of each row in PLANT_GROWTH_BINS, or
+        0 for a value outside the bins or missing
+    """
+    percentages = numpy.array([numpy.nan if value is None else float(value) for value in values],
+                              dtype=float) * 100
+    positions = numpy.searchsorted(PLANT_GROWTH_BINS, percentages, side="left")
+
+    # Bins include their upper edge but not their lower one, as pandas.cut does
+    positions[positions >= len(PLANT_GROWTH_BINS)] = 0
+
+    return positions
+
+
+class PlantSketch:  # pylint: disable=too-many-instance-attributes
+    """Streaming counts of the plant rows of a save by definition and growth, and a row sample"""
+    def __init__(self, sample_size: int = SAMPLE_SIZE, seed: int = 0) -> None:
+        """Initialize an empty PlantSketch object
+
+        Parameters:
+        sample_size (int): The maximum number of rows of the sample
+        seed (int): The seed of the sampling, so a save is always sampled the same way
+
+        Returns:
+        None
+        """
+        self.sample_size = sample_size
+        self.row_count = 0
+        self.species_counts = collections.Counter()
+        self.growth_counts = numpy.zeros(len(PLANT_GROWTH_BINS), dtype=numpy.int64)
+        self.sample = {column_name: [] for column_name in PLANT_EXTRACTOR.column_names}
+        self.random = random.Random(seed)
+        self.weight = 1.0
+        self.next_row = sample_size - 1
+
+    def get_uniform(self) -> float:
+        """Return a random number between 0 and 1, both excluded
+
+        Parameters:
+        None
+
+        Returns:
+        float: The random number
+        """
+        return max(self.random.random(), sys.float_info.min)
+
+    def skip_rows(self) -> None:
+        """Move to the next row to put in the sample, skipping rows in one step (Algorithm L)
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.weight *= math.exp(math.log(self.get_uniform()) / self.sample_size)
+        self.next_row += math.floor(math.log(self.get_uniform()) / math.log1p(-self.weight)) + 1
+
+    def add_rows(self, columns: dict) -> None:
+        """Add a chunk of plant rows to the counts and the sample
+
+        Parameters:
+        columns (dict): The list of values of each column of plant data, keyed by column name
+
+        Returns:
+        None
+        """
+        start = self.row_count
+        stop = start + get_row_count(columns)
+        self.species_counts.update(columns["plant_definition"])
+        self.growth_counts += numpy.bincount(get_growth_bin_positions(columns["plant_growth"]),
+                                             minlength=len(PLANT_GROWTH_BINS))
+
+        # The first rows fill the sample, and each later row replaces a random row of it with a
+        # probability of sample_size over the number of rows so far
+        fill_stop = min(stop, self.sample_size)
+
+        for column_name, values in self.sample.items():
+            values.extend(columns[column_name][:max(fill_stop - start, 0)])
+
+        if start < self.sample_size <= stop:
+            self.skip_rows()
+
+        while self.next_row < stop:
+            position = self.random.randrange(self.sample_size)
+
+            for column_name, values in self.sample.items():
+                values[position] = columns[column_name][self.next_row - start]
+
+            self.skip_rows()
+
+        self.row_count = stop
+
+    def get_dataset_columns(self) -> dict:
+        """Return the columns of each plant sketch dataset, as text like extracted columns
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The list of values of each column, keyed by column name, keyed by the dataset name
+        """
+        return {
+            "plant_species": {
+                "plant_definition": list(self.species_counts),
+                "plant_count": [str(count) for count in self.species_counts.values()],
+            },
+            "plant_growth": {
+                "plant_growth_bin": [str(edge) for edge in PLANT_GROWTH_BINS[1:]],
+                "plant_count": [str(count) for count in self.growth_counts[1:]],
+            },
+            "plant_sample": {
+                column_name: list(values) for column_name, values in self.sample.items()
+            },
+        }
@@ -0,0 +1,274 @@
+"""Run tasks in worker processes that are tracked one by one, so a failing task only loses itself
+
+Each task runs in a process of its own, which sends its result or its error back through a pipe.
+The parent waits on the pipes of the running tasks until the earliest deadline, so a task that
+raises, crashes its process or runs past its timeout is recorded as a failure, and retried if the
+policy allows, while the other tasks carry on. A process is started per task, rather than reused
+from a pool, so a stalled task can be killed without losing any other task's work. Each attempt has
+an ID, so what its process creates for the parent, e.g. shared memory, can be named after it and
+freed by the parent when the attempt fails or is stopped before its result is received.
+"""
+
+import collections
+import itertools
+import logging
+import os
+import time
+import traceback
+
+from save.lazy_import import lazy_import
+
+multiprocessing = lazy_import("multiprocessing")
+multiprocessing_connection = lazy_import("multiprocessing.connection")
+
+# The ways a task can fail: it raised an exception, its process exited without sending a result,
+# or it ran past its timeout and was killed
+FAILURE_KINDS = ("exception", "crash", "timeout")
+
+# The ID of each attempt of a task, unique within the parent process
+TASK_IDS = itertools.count()
+
+# The ID of the attempt run by this worker process, or None outside of a task
+CURRENT_TASK = {"task_id": None}
+
+
+def get_current_task_id() -> str:
+    """Return the ID of the attempt of the task run by this process, to name what it leaves behind
+
+    Parameters:
+    None
+
+    Returns:
+    str: The ID of the attempt, or None if this process is not running a task
+    """
+    return CURRENT_TASK["task_id"]
+
+
+def run_task(function: callable, argument: object, writer: "multiprocessing.connection.Connection",
+             task_id: str = None) -> None:
+    """Run a task in a worker process and send its result, or its error, to the parent
+
+    Parameters:
+    function (callable): The function of the task
+    argument (object): The argument passed to the function
+    writer (multiprocessing.connection.Connection): The end of the pipe to the parent
+    task_id (str): The ID of the attempt, see get_current_task_id
+
+    Returns:
+    None
+    """
+    CURRENT_TASK["task_id"] = task_id
+
+    try:
+        message = ("result", function(argument))
+    except Exception as error:  # pylint: disable=broad-except
+        message = ("exception", {
+            "error_type": type(error).__name__,
+            "message": str(error),
+            "traceback": traceback.format_exc(),
+        })
+
+    writer.send(message)
+    writer.close()
+
+
+class TaskRunner:
+    """Run a function over arguments in worker processes with a timeout and retries per task"""
+    def __init__(self, function: callable,  # pylint: disable=too-many-arguments
+                 processes: int = None, timeout: float = None, retries: int = 0,
+                 cleanup: callable = None) -> None:
+        """Initialize the TaskRunner object
+
+        Parameters:
+        function (callable): The function run by each task, given the task's argument
+        processes (int): The number of tasks run at the same time, the number of cores if None
+        timeout (float): The seconds a single attempt of a task may run, or None for no limit
+        retries (int): The number of times a failed task is run again before it is reported
+        cleanup (callable): Called with the ID of an attempt that failed or was stopped, to free
+            what its process created for a result the parent never received
+
+        Returns:
+        None
+        """
+        self.function = function
+        self.cleanup = cleanup
+        self.processes = processes or multiprocessing.cpu_count()
+        self.policy = {"timeout": timeout, "retries": retries}
+        self.running = {}
+        self.failures = {}
+        self.receive_times = {}
+
+    def start(self, argument: object, attempt: int) -> None:
+        """Start an attempt of a task in a new worker process
+
+        Parameters:
+        argument (object): The argument of the task
+        attempt (int): The number of the attempt, from 1
+
+        Returns:
+        None
+        """
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        task_id = f"{os.getpid()}_{next(TASK_IDS)}"
+        process = multiprocessing.Process(target=run_task,
+                                          args=(self.function, argument, writer, task_id))
+        process.start()
+
+        # Close the parent's end for writing, so the pipe reports the end of a crashed process
+        writer.close()
+        start_time = time.monotonic()
+        deadline = None if self.policy["timeout"] is None else start_time + self.policy["timeout"]
+        self.running[reader] = {
+            "task_id": task_id,
+            "argument": argument,
+            "attempt": attempt,
+            "process": process,
+            "start_time": start_time,
+            "deadline": deadline,
+        }
+
+    def get_wait_timeout(self) -> float:
+        """Return the seconds until the earliest deadline of the running tasks
+
+        Parameters:
+        None
+
+        Returns:
+        float: The seconds to wait, or None if no running task has a deadline
+        """
+        deadlines = [task["deadline"] for task in self.running.values() if task["deadline"]]
+
+        return max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+
+    def finish(self, reader: "multiprocessing.connection.Connection") -> tuple:
+        """Receive the message of a task whose pipe is ready and stop tracking the task
+
+        Parameters:
+        reader (multiprocessing.connection.Connection): The end of the task's pipe to read
+
+        Returns:
+        tuple: The task and its message, which is a ("result", value) or ("exception", error) tuple,
+            or a ("crash", error) tuple if the process exited without sending a message
+        """
+        task = self.running.pop(reader)
+        received_time = time.time()
+        receive_start = time.monotonic()
+
+        try:
+            message = reader.recv()
+        except EOFError:
+            message = None
+
+        self.receive_times[task["argument"]] = (received_time, time.monotonic() - receive_start)
+        reader.close()
+        task["process"].join()
+
+        if message is None:
+            message = ("crash", {
+                "error_type": "ProcessExit",
+                "message": f"The worker process exited with code {task['process'].exitcode}",
+            })
+
+        return task, message
+
+    def kill_expired(self) -> list:
+        """Kill the processes of the running tasks past their deadline
+
+        Parameters:
+        None
+
+        Returns:
+        list: The (task, ("timeout", error)) tuple of each killed task
+        """
+        now = time.monotonic()
+        expired = []
+
+        for reader, task in list(self.running.items()):
+            if task["deadline"] is not None and task["deadline"] <= now:
+                task["process"].kill()
+                task["process"].join()
+                reader.close()
+                del self.running[reader]
+                expired.append((task, ("timeout", {
+                    "error_type": "TimeoutError",
+                    "message": f"The task ran for more than {self.policy['timeout']} seconds",
+                })))
+
+        return expired
+
+    def release(self, task: dict) -> None:
+        """Free what the process of an attempt created for a result that the parent never received
+
+        Parameters:
+        task (dict): The task that failed or was stopped
+
+        Returns:
+        None
+        """
+        if self.cleanup is not None:
+            self.cleanup(task["task_id"])
+
+    def record_failure(self, task: dict, kind: str, error: dict) -> bool:
+        """Record the failure of an attempt of a task, returning whether to retry it
+
+        Parameters:
+        task (dict): The task that failed
+        kind (str): The kind of failure, one of FAILURE_KINDS
+        error (dict): The error_type, message and any traceback of the failure
+
+        Returns:
+        bool: True if the task has retries left
+        """
+        self.release(task)
+        retry = task["attempt"] <= self.policy["retries"]
+        logging.warning("Task %s failed with %s (attempt %d%s): %s", task["argument"], kind,
+                        task["attempt"], ", retrying" if retry else "", error["message"])
+        self.failures[task["argument"]] = {
+            "kind": kind,
+            **error,
+            "attempts": task["attempt"],
+            "wall_seconds": time.monotonic() - task["start_time"],
+        }
+
+        return retry
+
+    def run(self, arguments: list) -> iter:
+        """Run a task for each argument, yielding the results as the tasks complete
+
+        The failures of the tasks without retries left are kept in the failures property, keyed
+        by the argument of the task, and a task that succeeds on a retry is removed from it. The
+        time each message was received, in seconds since the epoch, and the seconds the parent took
+        to read and unpickle it, are kept in the receive_times property, keyed by the argument.
+
+        Parameters:
+        arguments (list): The argument of each task
+
+        Returns:
+        iter: An iterator of the (argument, result) tuple of each successful task
+        """
+        pending = collections.deque((argument, 1) for argument in arguments)
+
+        try:
+            while pending or self.running:
+                while pending and len(self.running) < self.processes:
+                    self.start(*pending.popleft())
+
+                ready = multiprocessing_connection.wait(list(self.running),
+                                                        timeout=self.get_wait_timeout())
+                completed = [self.finish(reader) for reader in ready] + self.kill_expired()
+
+                for task, (kind, value) in completed:
+                    if kind == "result":
+                        self.failures.pop(task["argument"], None)
+                        yield task["argument"], value
+                    elif self.record_failure(task, kind, value):
+                        pending.append((task["argument"], task["attempt"] + 1))
+        finally:
+            # Stop the tasks still running if the consumer stops early
+            for reader, task in self.running.items():
+                task["process"].kill()
+                task["process"].join()
+                reader.close()
+                self.release(task)
+
+            self.running.clear()
@@ -0,0 +1,203 @@
+"""Index the snapshots of a series by their in-game time to query time windows by binary search
+
+The DataFrames of a series hold the rows of each snapshot contiguously, in the order of the
+snapshots' in-game time. The TickIndex keeps the sorted time of each snapshot and the position of
+its first row in each dataset, so a time window maps to a contiguous slice of rows with two binary
+searches, instead of a boolean mask over every row of the series. Each save is a snapshot of its
+own, identified by its position, so several snapshots may share a time, and the queries of a single
+snapshot at a time then return the last of them.
+
+RimWorld counts 2,500 ticks per hour, 24 hours per day, 15 days per quadrum and 4 quadrums per
+year, starting at year 5500. The date of a snapshot is computed from its absolute ticks, which are
+the ticks of the game plus the absolute tick the game started at. The game shows dates shifted by
+the longitude of the map, which is left out, so dates are those of longitude 0.
+"""
+
+from save.lazy_import import lazy_import
+
+numpy = lazy_import("numpy")
+pandas = lazy_import("pandas")
+
+TICKS_PER_HOUR = 2500
+TICKS_PER_DAY = 24 * TICKS_PER_HOUR
+TICKS_PER_QUADRUM = 15 * TICKS_PER_DAY
+TICKS_PER_YEAR = 4 * TICKS_PER_QUADRUM
+FIRST_YEAR = 5500
+QUADRUMS = ("Aprimay", "Jugust", "Septober", "Decembary")
+
+
+def get_range_rows(starts: "numpy.ndarray", counts: "numpy.ndarray") -> "numpy.ndarray":
+    """Return the positions of consecutive ranges of rows, one range after the other
+
+    Parameters:
+    starts (numpy.ndarray): The position of the first row of each range
+    counts (numpy.ndarray): The number of rows of each range
+
+    Returns:
+    numpy.ndarray: The position of each row of every range in turn
+    """
+    # Shift a running count of the rows to the first row of each range
+    return numpy.arange(counts.sum()) + numpy.repeat(starts - (numpy.cumsum(counts) - counts),
+                                                     counts)
+
+
+class TickIndex:
+    """The sorted in-game time of each snapshot of a series and the rows of each dataset"""
+    def __init__(self, time_ticks: list, row_counts: dict, game_start_ticks: int = 0) -> None:
+        """Initialize the TickIndex object
+
+        Parameters:
+        time_ticks (list): The in-game time of each snapshot in ticks, in ascending order
+        row_counts (dict): The number of rows of each snapshot, keyed by the dataset name
+        game_start_ticks (int): The absolute tick the game started at
+
+        Returns:
+        None
+        """
+        self.time_ticks = numpy.asarray(time_ticks, dtype=numpy.int64)
+        assert (numpy.diff(self.time_ticks) >= 0).all(), "The snapshots must be sorted by time"
+        self.game_start_ticks = game_start_ticks
+
+        # The position of the first row of each snapshot, followed by the number of rows
+        self.offsets = {
+            dataset_name: numpy.concatenate([[0], numpy.cumsum(counts, dtype=numpy.int64)])
+            for dataset_name, counts in row_counts.items()
+        }
+
+    def __len__(self) -> int:
+        """Return the number of snapshots
+
+        Parameters:
+        None
+
+        Returns:
+        int: The number of snapshots
+        """
+        return len(self.time_ticks)
+
+    def get_range(self, start_ticks: int, stop_ticks: int) -> tuple:
+        """Return the positions of the snapshots within a time window
+
+        Parameters:
+        start_ticks (int): The earliest in-game time of the window, included
+        stop_ticks (int): The latest in-game time of the window, included
+
+        Returns:
+        tuple: The position of the first snapshot in the window and the position after the last
+        """
+        return (int(numpy.searchsorted(self.time_ticks, start_ticks, side="left")),
+                int(numpy.searchsorted(self.time_ticks, stop_ticks, side="right")))
+
+    def get_as_of(self, time_ticks: "numpy.ndarray") -> "numpy.ndarray":
+        """Return the position of the latest snapshot at or before each time
+
+        Parameters:
+        time_ticks (numpy.ndarray): The in-game times, or a single time
+
+        Returns:
+        numpy.ndarray: The position of the snapshot of each time, or -1 before the first snapshot
+        """
+        return numpy.searchsorted(self.time_ticks, time_ticks, side="right") - 1
+
+    def get_nearest(self, time_ticks: int) -> int:
+        """Return the position of the snapshot closest to a time, the earlier one if tied
+
+        Parameters:
+        time_ticks (int): The in-game time
+
+        Returns:
+        int: The position of the snapshot, the last of the snapshots of its time, as with get_as_of
+        """
+        position = int(numpy.searchsorted(self.time_ticks, time_ticks, side="right"))
+
+        if position == len(self.time_ticks) or (
+                position > 0 and time_ticks - self.time_ticks[position - 1]
+                <= self.time_ticks[position] - time_ticks):
+            return position - 1
+
+        return int(self.get_as_of(self.time_ticks[position]))
+
+    def get_row_slice(self, dataset_name: str, start: int, stop: int) -> slice:
+        """Return the rows of a range of snapshots in the DataFrame of a dataset
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        start (int): The position of the first snapshot
+        stop (int): The position after the last snapshot
+
+        Returns:
+        slice: The positions of the rows
+        """
+        offsets = self.offsets[dataset_name]
+
+        return slice(int(offsets[start]), int(offsets[stop]))
+
+    def get_rows(self, dataset_name: str, positions: "numpy.ndarray") -> tuple:
+        """Return the rows of a sequence of snapshots, which may repeat, in a dataset's DataFrame
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        positions (numpy.ndarray): The position of each snapshot
+
+        Returns:
+        tuple: The positions of the rows of every snapshot in turn, and the number of rows of each
+        """
+        offsets = self.offsets[dataset_name]
+        starts = offsets[positions]
+        counts = offsets[positions + 1] - starts
+
+        return get_range_rows(starts, counts), counts
+
+    def get_grid(self, interval_ticks: int) -> "numpy.ndarray":
+        """Return evenly spaced in-game times from the first snapshot to the last one
+
+        The times are multiples of the interval in absolute ticks, so an interval of a day samples
+        the series at midnight.
+
+        Parameters:
+        interval_ticks (int): The in-game time between samples, e.g. TICKS_PER_DAY
+
+        Returns:
+        numpy.ndarray: The times of the samples in ticks of the game
+        """
+        first_ticks, last_ticks = self.time_ticks[[0, -1]] + self.game_start_ticks
+        first_sample = -(-first_ticks // interval_ticks) * interval_ticks
+
+        return numpy.arange(first_sample, last_ticks + 1, interval_ticks) - self.game_start_ticks
+
+    def get_game_dates(self, time_ticks: "numpy.ndarray") -> "pandas.core.frame.DataFrame":
+        """Return the in-game date of each time
+
+        Parameters:
+        time_ticks (numpy.ndarray): The in-game times in ticks of the game
+
+        Returns:
+        pandas.core.frame.DataFrame: The year, quadrum, day of the quadrum from 1 and hour of each
+            time
+        """
+        absolute_ticks = numpy.asarray(time_ticks, dtype=numpy.int64) + self.game_start_ticks
+
+        return pandas.DataFrame({
+            "year": FIRST_YEAR + absolute_ticks // TICKS_PER_YEAR,
+            "quadrum": numpy.array(QUADRUMS)[absolute_ticks % TICKS_PER_YEAR // TICKS_PER_QUADRUM],
+            "day": absolute_ticks % TICKS_PER_QUADRUM // TICKS_PER_DAY + 1,
+            "hour": absolute_ticks % TICKS_PER_DAY // TICKS_PER_HOUR,
+        })
+
+    def get_time_ticks(self, year: int, quadrum: str, day: int = 1, hour: int = 0) -> int:
+        """Return the in-game time of a date, e.g. to query the series from that date
+
+        Parameters:
+        year (int): The year, e.g. 5501
+        quadrum (str): The name of the quadrum, one of QUADRUMS
+        day (int): The day of the quadrum, from 1 to 15
+        hour (int): The hour of the day, from 0 to 23
+
+        Returns:
+        int: The time of the date in ticks of the game
+        """
+        absolute_ticks = (year - FIRST_YEAR) * TICKS_PER_YEAR \
+            + QUADRUMS.index(quadrum) * TICKS_PER_QUADRUM + (day - 1) * TICKS_PER_DAY \
+            + hour * TICKS_PER_HOUR
+
+        return absolute_ticks - self.game_start_ticks
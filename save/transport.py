@@ -0,0 +1,492 @@
+"""Move the extracted columns of a save from a worker process to its parent through shared memory
+
+A worker writes the columns of every dataset of a save into a single shared memory segment, and only
+the layout of the segment is pickled back to the parent, instead of every value. What the parent
+then reads from the segment depends on the kind of column:
+    numeric: The worker parses each numeric column, see save.datasets.NUMERIC_COLUMNS, into a
+        float64 or int64 array plus a boolean array masking the missing values. The parent wraps
+        them with numpy.frombuffer and copies them, without decoding any value, into the typed
+        column of the series holding the rows of every save, which is the only copy made.
+    interned: Only the distinct values of IDs and definitions are stored as text, followed by an
+        int32 code per row, so the parent only decodes and hashes the distinct values and maps the
+        codes with an array lookup.
+    text: The other columns are stored as one UTF-8 buffer of the values separated by NUL
+        characters, which XML text cannot contain, plus the mask of the missing values. The parent
+        decodes each value into a Python string, straight into the preallocated object column of
+        the series, as text has no fixed-size representation a NumPy array could view.
+
+A segment created by a task is named after the ID of its attempt, so the parent can free the
+segments of an attempt whose result it never received, e.g. one killed past its timeout.
+"""
+
+import collections
+import collections.abc
+import itertools
+import os
+import weakref
+
+from save.datasets import parse_numeric_column
+from save.lazy_import import lazy_import
+from save.tasks import get_current_task_id
+
+numpy = lazy_import("numpy")
+resource_tracker = lazy_import("multiprocessing.resource_tracker")
+shared_memory = lazy_import("multiprocessing.shared_memory")
+
+BUFFER_ALIGNMENT = 8
+CODE_DTYPE = "int32"
+SEGMENT_NAME_PREFIX = "rimhistory_"
+VALUE_SEPARATOR = "\0"
+
+# The number of segments created by each attempt of a task in this process
+TASK_SEGMENT_COUNTS = collections.Counter()
+
+
+def encode_column(values: list) -> tuple:
+    """Return the values of a text column as a UTF-8 buffer and a mask of the missing values
+
+    Parameters:
+    values (list): The values of the column, strings or None
+
+    Returns:
+    tuple: The buffer of the values separated by NUL characters, with missing values stored as
+        empty strings, and the bytes of the boolean mask of the missing values, or None if there are
+        none
+    """
+    mask = None
+
+    if None in values:
+        mask = numpy.equal(numpy.array(values, dtype=object), None)
+        values = ["" if value is None else value for value in values]
+
+    return VALUE_SEPARATOR.join(values).encode("utf_8"), None if mask is None else mask.tobytes()
+
+
+def encode_codes(values: list) -> tuple:
+    """Return the distinct values of a column and the code of each value
+
+    Parameters:
+    values (list): The values of the column, strings or None
+
+    Returns:
+    tuple: The list of distinct values, other than None, in order of first appearance, and the
+        bytes of the int32 array of the position of each value in it, or -1 for None
+    """
+    codes = {None: -1}
+    value_codes = numpy.fromiter((codes.setdefault(value, len(codes) - 1) for value in values),
+                                 dtype=CODE_DTYPE, count=len(values))
+
+    return list(codes)[1:], value_codes.tobytes()
+
+
+def encode_numeric(values: list, dtype: str) -> tuple:
+    """Return the values of a numeric column as the bytes of a typed array and of a missing mask
+
+    Parameters:
+    values (list): The values of the column, strings or None
+    dtype (str): The NumPy data type of the column, see save.datasets.NUMERIC_COLUMNS
+
+    Returns:
+    tuple: The bytes of the array of the values, and the bytes of the boolean mask of the missing
+        values, or None if there are none
+    """
+    array = parse_numeric_column(values, dtype)
+    mask = numpy.ma.getmaskarray(array)
+
+    return array.data.tobytes(), mask.tobytes() if mask.any() else None
+
+
+def encode_values(values: list, dtype: str, is_interned: bool) -> tuple:
+    """Return the buffers storing the values of a column, by the kind of the column
+
+    Parameters:
+    values (list): The values of the column, strings or None
+    dtype (str): The NumPy data type of a numeric column, or None for a text column
+    is_interned (bool): Whether the column is stored as distinct values and codes
+
+    Returns:
+    tuple: The buffers of the values, of the mask of missing values and of the codes, each None if
+        absent, and the number of values stored
+    """
+    codes_buffer = None
+
+    if is_interned:
+        values, codes_buffer = encode_codes(values)
+
+    value_buffers = encode_column(values) if dtype is None else encode_numeric(values, dtype)
+
+    return [*value_buffers, codes_buffer], len(values)
+
+
+def append_buffers(buffers: list, new_buffers: list) -> list:
+    """Append buffers to those of a segment, aligning each one to the size of the largest item
+
+    Parameters:
+    buffers (list): The buffers of the segment so far, which is changed in place
+    new_buffers (list): The buffers to append, or None for those that are absent
+
+    Returns:
+    list: The (offset, size) of each appended buffer in the segment, or None if it is absent
+    """
+    ranges = []
+
+    for buffer in new_buffers:
+        if buffer is None:
+            ranges.append(None)
+            continue
+
+        offset = sum(len(existing_buffer) for existing_buffer in buffers)
+        buffers.append(b"\0" * (-offset % BUFFER_ALIGNMENT))
+        ranges.append((offset + len(buffers[-1]), len(buffer)))
+        buffers.append(buffer)
+
+    return ranges
+
+
+def get_segment_name(task_id: str, index: int) -> str:
+    """Return the name of a segment created by an attempt of a task
+
+    Parameters:
+    task_id (str): The ID of the attempt, see get_current_task_id
+    index (int): The position of the segment among those created by the attempt
+
+    Returns:
+    str: The name of the segment
+    """
+    return f"{SEGMENT_NAME_PREFIX}{task_id}_{index}"
+
+
+def create_segment(size: int) -> "shared_memory.SharedMemory":
+    """Create a segment, named after the attempt of the task run by this process if there is one
+
+    Parameters:
+    size (int): The size of the segment in bytes
+
+    Returns:
+    shared_memory.SharedMemory: The segment
+    """
+    task_id = get_current_task_id()
+
+    if task_id is None:
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    index = TASK_SEGMENT_COUNTS[task_id]
+    TASK_SEGMENT_COUNTS[task_id] += 1
+
+    return shared_memory.SharedMemory(name=get_segment_name(task_id, index), create=True,
+                                      size=size)
+
+
+def release_task_segments(task_id: str) -> None:
+    """Free the segments created by an attempt of a task whose result was never received
+
+    The segments are created with consecutive names, so they are freed in order until the first
+    name without a segment.
+
+    Parameters:
+    task_id (str): The ID of the attempt
+
+    Returns:
+    None
+    """
+    for index in itertools.count():
+        try:
+            segment = shared_memory.SharedMemory(name=get_segment_name(task_id, index))
+        except FileNotFoundError:
+            return
+
+        segment.close()
+        segment.unlink()
+
+
+def release_segment(segment: "shared_memory.SharedMemory", owner_pid: int) -> None:
+    """Close a shared memory segment and free it, if this process attached to it
+
+    A worker process forked from the reading process inherits its attached columns, and only closes
+    them when it collects them, so the segment stays available to the reading process.
+
+    Parameters:
+    segment (shared_memory.SharedMemory): The shared memory segment
+    owner_pid (int): The ID of the process that attached to the segment
+
+    Returns:
+    None
+    """
+    segment.close()
+
+    if os.getpid() == owner_pid:
+        segment.unlink()
+
+
+class SharedColumns(collections.abc.Mapping):
+    """The columns of each dataset of a save, stored as arrays or text buffers in shared memory
+
+    The object is created in a worker process and pickled to the parent, where it behaves as a
+    read-only mapping from each dataset name to its columns. The segment is freed once the object
+    that attached to it, normally the unpickled one in the parent, is garbage collected.
+    """
+    def __init__(self, dataset_columns: dict, interned_columns: dict = None,
+                 numeric_columns: dict = None) -> None:
+        """Initialize the SharedColumns object by writing the columns into a new segment
+
+        Parameters:
+        dataset_columns (dict): The list of values of each column of each dataset, keyed by the
+            dataset name and then by the column name
+        interned_columns (dict): The names of the columns of each dataset stored as distinct values
+            and codes, keyed by the dataset name
+        numeric_columns (dict): The NumPy data type of each column of each dataset stored as a
+            typed array, keyed by the dataset name and then by the column name
+
+        Returns:
+        None
+        """
+        buffers = []
+        self.layout = {}
+
+        for dataset_name, columns in dataset_columns.items():
+            dataset_layout = self.layout.setdefault(dataset_name, {})
+            dataset_numeric_columns = (numeric_columns or {}).get(dataset_name, {})
+
+            for column_name, values in columns.items():
+                dtype = dataset_numeric_columns.get(column_name)
+                column_buffers, value_count = encode_values(
+                    values, dtype, column_name in (interned_columns or {}).get(dataset_name, []))
+
+                # Store the row count, the offset and size of the values, of any mask and of any
+                # codes, the number of values and the data type of a numeric column
+                dataset_layout[column_name] = (
+                    len(values), *append_buffers(buffers, column_buffers), value_count, dtype)
+
+        size = sum(len(buffer) for buffer in buffers)
+        segment = create_segment(max(size, 1))
+        segment.buf[:size] = b"".join(buffers)
+
+        # The process reading the columns frees the segment, so the worker's resource tracker must
+        # not free it when the worker exits
+        segment.close()
+        resource_tracker.unregister(segment._name,  # pylint: disable=protected-access
+                                    "shared_memory")
+        self.segment_name = segment.name
+        self.segment = None
+
+    def __getstate__(self) -> dict:
+        """Return the state to pickle, which is only the segment's name and layout
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The state of the object
+        """
+        return {"segment_name": self.segment_name, "layout": self.layout}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore the object from its pickled state, attaching to the segment
+
+        Parameters:
+        state (dict): The state of the object
+
+        Returns:
+        None
+        """
+        self.__dict__.update(state)
+        self.attach()
+
+    def attach(self) -> None:
+        """Attach to the segment to read the columns, freeing it once this object is collected
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.segment = shared_memory.SharedMemory(name=self.segment_name)
+        weakref.finalize(self, release_segment, self.segment, os.getpid())
+
+    def __getitem__(self, dataset_name: str) -> dict:
+        """Return the columns of a dataset, reading them from the segment
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+
+        Returns:
+        dict: The values of each column, keyed by the column name, as a NumPy object array, or as a
+            masked array of a numeric column, see save.datasets.parse_numeric_column
+        """
+        row_count = self.get_row_count(dataset_name)
+        columns = {}
+
+        for column_name, column_layout in self.layout[dataset_name].items():
+            if column_layout[5] is not None:
+                values = numpy.empty(row_count, dtype=column_layout[5])
+                mask = numpy.zeros(row_count, dtype=bool)
+                self.read_numeric(dataset_name, column_name, values, mask)
+                columns[column_name] = numpy.ma.MaskedArray(values, mask)
+                continue
+
+            columns[column_name] = numpy.empty(row_count, dtype=object)
+            self.read_column(dataset_name, column_name, columns[column_name])
+
+        return columns
+
+    def __iter__(self) -> iter:
+        """Return an iterator over the names of the datasets
+
+        Parameters:
+        None
+
+        Returns:
+        iter: The iterator over the dataset names
+        """
+        return iter(self.layout)
+
+    def __len__(self) -> int:
+        """Return the number of datasets
+
+        Parameters:
+        None
+
+        Returns:
+        int: The number of datasets
+        """
+        return len(self.layout)
+
+    def get_row_count(self, dataset_name: str) -> int:
+        """Return the number of rows of a dataset
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+
+        Returns:
+        int: The number of rows
+        """
+        return next(iter(self.layout[dataset_name].values()), (0,))[0]
+
+    def read_column(self, dataset_name: str, column_name: str, output: "numpy.ndarray") -> None:
+        """Write the values of a column into an object array, e.g. a slice of a series column
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+        output (numpy.ndarray): The object array to write the values to, one per row
+
+        Returns:
+        None
+        """
+        row_count, _, mask_range, codes_range, *_ = self.layout[dataset_name][column_name]
+
+        if row_count == 0:
+            return
+
+        if codes_range is not None:
+            values, codes = self.read_codes(dataset_name, column_name)
+            output[:] = numpy.array([*values, None], dtype=object)[codes]
+
+            return
+
+        output[:] = self.read_values(dataset_name, column_name)
+
+        if mask_range is not None:
+            mask = self.get_view(mask_range)
+            output[numpy.frombuffer(mask, bool)] = None
+            mask.release()
+
+    def get_view(self, buffer_range: tuple) -> memoryview:
+        """Return a view of a buffer in the segment, which the caller must release
+
+        Parameters:
+        buffer_range (tuple): The offset and size of the buffer
+
+        Returns:
+        memoryview: The view of the buffer
+        """
+        # Columns read in the process that wrote them, rather than pickled, attach on first use
+        if self.segment is None:
+            self.attach()
+
+        offset, size = buffer_range
+
+        return self.segment.buf[offset:offset + size]
+
+    def read_values(self, dataset_name: str, column_name: str) -> list:
+        """Return the values stored for a column, which are its distinct values if it is interned
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+
+        Returns:
+        list: The values, with missing values read as empty strings
+        """
+        _, values_range, _, _, value_count, _ = self.layout[dataset_name][column_name]
+
+        if value_count == 0:
+            return []
+
+        values = self.get_view(values_range)
+        strings = str(values, "utf_8").split(VALUE_SEPARATOR)
+        values.release()
+
+        return strings
+
+    def read_numeric(self, dataset_name: str, column_name: str, output: "numpy.ndarray",
+                     mask_output: "numpy.ndarray") -> None:
+        """Copy the typed values of a numeric column, and its missing mask, into arrays
+
+        The arrays stored in the segment are viewed with numpy.frombuffer, so the values are copied
+        once, e.g. into a slice of a series column, and never decoded.
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+        output (numpy.ndarray): The array of the data type of the column to write the values to
+        mask_output (numpy.ndarray): The boolean array to write whether each value is missing to
+
+        Returns:
+        None
+        """
+        row_count, values_range, mask_range, _, _, dtype = self.layout[dataset_name][column_name]
+
+        if row_count == 0:
+            return
+
+        for buffer_range, array, buffer_dtype in [(values_range, output, dtype),
+                                                  (mask_range, mask_output, bool)]:
+            if buffer_range is None:
+                array[:] = False
+                continue
+
+            view = self.get_view(buffer_range)
+            array[:] = numpy.frombuffer(view, buffer_dtype)
+            view.release()
+
+    def is_interned(self, dataset_name: str, column_name: str) -> bool:
+        """Return True if a column is stored as distinct values and codes
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+
+        Returns:
+        bool: Whether the column is interned
+        """
+        return self.layout[dataset_name][column_name][3] is not None
+
+    def read_codes(self, dataset_name: str, column_name: str) -> tuple:
+        """Return the distinct values of an interned column and the code of each row
+
+        Parameters:
+        dataset_name (str): The name of the dataset
+        column_name (str): The name of the column
+
+        Returns:
+        tuple: The list of distinct values, and the int32 array of the position of the value of
+            each row in it, or -1 for a missing value
+        """
+        codes_range = self.layout[dataset_name][column_name][3]
+        codes = self.get_view(codes_range)
+        codes_array = numpy.frombuffer(codes, CODE_DTYPE).copy()
+        codes.release()
+
+        return self.read_values(dataset_name, column_name), codes_array
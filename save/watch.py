@@ -0,0 +1,406 @@
+"""Watch the saves directory and ingest new or rewritten saves into a live SaveSeries
+
+Two backends detect when RimWorld has finished writing a save:
+    inotify: On Linux, the kernel reports each file that is closed after being written, or moved,
+        into the directory, so the watcher wakes up as soon as a save is complete. If the kernel's
+        event queue overflows and events are lost, every file in the directory is reported
+    polling: Everywhere else, the directory is listed periodically and a file is complete once its
+        size and modification time have stayed the same for a settle interval
+"""
+
+import ctypes
+import logging
+import os
+import pathlib
+import select
+import struct
+import sys
+import threading
+import time
+import traceback
+
+# inotify is called through the C library, so it needs no third-party package
+LIBC = ctypes.CDLL(None, use_errno=True) if sys.platform == "linux" else None
+INOTIFY_AVAILABLE = LIBC is not None and hasattr(LIBC, "inotify_init1")
+
+# The inotify events of interest and the layout of each event: wd, mask, cookie and name length
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+INOTIFY_EVENT_FORMAT = "iIII"
+INOTIFY_EVENT_SIZE = struct.calcsize(INOTIFY_EVENT_FORMAT)
+INOTIFY_BUFFER_SIZE = 64 * 1024
+
+POLL_INTERVAL_SECONDS = 0.25
+WATCH_BACKENDS = ("inotify", "polling")
+
+
+def check_result(result: int, operation: str) -> int:
+    """Return the result of a C library call, raising an OSError if it failed
+
+    Parameters:
+    result (int): The value returned by the call
+    operation (str): The name of the call, used in the error message
+
+    Returns:
+    int: The result of the call
+    """
+    if result < 0:
+        error_number = ctypes.get_errno()
+
+        raise OSError(error_number, f"{operation} failed: {os.strerror(error_number)}")
+
+    return result
+
+
+class InotifyBackend:
+    """Report the files that are closed after writing, or moved, into a directory using inotify"""
+    name = "inotify"
+
+    def __init__(self, directory: pathlib.Path) -> None:
+        """Initialize the InotifyBackend object by watching the directory
+
+        Parameters:
+        directory (pathlib.Path): The directory to watch
+
+        Returns:
+        None
+        """
+        self.directory = pathlib.Path(directory)
+        self.file_descriptor = check_result(
+            LIBC.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC), "inotify_init1")
+
+        try:
+            check_result(LIBC.inotify_add_watch(self.file_descriptor, os.fsencode(self.directory),
+                                                IN_CLOSE_WRITE | IN_MOVED_TO), "inotify_add_watch")
+        except OSError:
+            os.close(self.file_descriptor)
+            raise
+
+    def poll(self, timeout: float) -> list:
+        """Wait for files to be completely written into the directory
+
+        Parameters:
+        timeout (float): The maximum number of seconds to wait
+
+        Returns:
+        list: The paths of the completely written files, in the order of the events, or an empty
+            list if there were none before the timeout
+        """
+        readable, _, _ = select.select([self.file_descriptor], [], [], timeout)
+
+        if not readable:
+            return []
+
+        events = os.read(self.file_descriptor, INOTIFY_BUFFER_SIZE)
+        paths = {}
+        offset = 0
+
+        while offset < len(events):
+            _, mask, _, name_size = struct.unpack_from(INOTIFY_EVENT_FORMAT, events, offset)
+            offset += INOTIFY_EVENT_SIZE
+            name = events[offset:offset + name_size].rstrip(b"\0")
+            offset += name_size
+
+            # Events were lost, so any file of the directory may have been written
+            if mask & IN_Q_OVERFLOW:
+                logging.warning("The inotify event queue overflowed, rescanning %s", self.directory)
+                paths.update(dict.fromkeys(self.rescan()))
+            else:
+                paths[self.directory / os.fsdecode(name)] = None
+
+        return list(paths)
+
+    def rescan(self) -> list:
+        """Return the path of every file in the directory
+
+        Parameters:
+        None
+
+        Returns:
+        list: The paths of the files, in name order
+        """
+        return sorted(path for path in self.directory.iterdir() if path.is_file())
+
+    def close(self) -> None:
+        """Stop watching the directory
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        os.close(self.file_descriptor)
+
+
+class PollingBackend:
+    """Report the files of a directory whose size and modification time have settled"""
+    name = "polling"
+
+    def __init__(self, directory: pathlib.Path, settle_seconds: float = 1.0) -> None:
+        """Initialize the PollingBackend object, treating the files already present as known
+
+        Parameters:
+        directory (pathlib.Path): The directory to watch
+        settle_seconds (float): How long a file must stay unchanged to be considered complete
+
+        Returns:
+        None
+        """
+        self.directory = pathlib.Path(directory)
+        self.settle_seconds = settle_seconds
+        self.known_signatures = self.get_signatures()
+        self.pending = {}
+
+    def get_signatures(self) -> dict:
+        """Return the size and modification time of each file in the directory
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The (size, modification time in nanoseconds) of each file, keyed by its path
+        """
+        signatures = {}
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat_result = entry.stat()
+                    signatures[pathlib.Path(entry.path)] = (stat_result.st_size,
+                                                            stat_result.st_mtime_ns)
+
+        return signatures
+
+    def scan(self) -> list:
+        """List the directory once, returning the new or changed files that have settled
+
+        Parameters:
+        None
+
+        Returns:
+        list: The paths of the completely written files
+        """
+        now = time.monotonic()
+        complete = []
+
+        for path, signature in self.get_signatures().items():
+            if self.known_signatures.get(path) == signature:
+                continue
+
+            pending_signature, pending_since = self.pending.get(path, (None, now))
+
+            # A file still being written is timed again from its latest change
+            if pending_signature != signature:
+                self.pending[path] = (signature, now)
+            elif now - pending_since >= self.settle_seconds:
+                del self.pending[path]
+                self.known_signatures[path] = signature
+                complete.append(path)
+
+        return complete
+
+    def poll(self, timeout: float) -> list:
+        """Poll the directory until files are completely written into it or the timeout passes
+
+        Parameters:
+        timeout (float): The maximum number of seconds to wait
+
+        Returns:
+        list: The paths of the completely written files, or an empty list if there were none
+            before the timeout
+        """
+        deadline = time.monotonic() + timeout
+
+        while True:
+            complete = self.scan()
+            remaining = deadline - time.monotonic()
+
+            if complete or remaining <= 0:
+                return complete
+
+            time.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+
+    def close(self) -> None:
+        """Stop watching the directory, forgetting the files seen so far
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.pending.clear()
+
+
+def get_watch_backend(directory: pathlib.Path, backend: str = "auto",
+                      settle_seconds: float = 1.0) -> object:
+    """Return a watch backend given its name, using inotify for auto when it is available
+
+    Parameters:
+    directory (pathlib.Path): The directory to watch
+    backend (str): The name of the backend: auto, inotify or polling
+    settle_seconds (float): How long a file must stay unchanged to be complete, when polling
+
+    Returns:
+    object: The InotifyBackend or PollingBackend object
+    """
+    if backend == "auto":
+        backend = "inotify" if INOTIFY_AVAILABLE else "polling"
+
+    assert backend in WATCH_BACKENDS
+
+    if backend == "inotify":
+        return InotifyBackend(directory)
+
+    return PollingBackend(directory, settle_seconds)
+
+
+class SaveWatcher:
+    """Keep a SaveSeries up to date with the saves written into its directory
+
+    Complete saves that match the series are parsed in the series' worker pool and appended to it,
+    or replace the save of the same name, and each subscriber is then called with the series and
+    the base names of the ingested saves, e.g. to refresh a report. The series is only changed while
+    holding the lock property, which readers in other threads take to see a consistent series. A
+    batch that fails to ingest is logged and recorded in the errors property of the series, and the
+    watcher carries on with the next saves.
+    """
+    def __init__(self, series: object, backend: str = "auto", settle_seconds: float = 1.0) -> None:
+        """Initialize the SaveWatcher object by watching the directory of the series
+
+        Parameters:
+        series (SaveSeries): The live series to ingest saves into
+        backend (str): The name of the watch backend: auto, inotify or polling
+        settle_seconds (float): How long a file must stay unchanged to be complete, when polling
+
+        Returns:
+        None
+        """
+        self.series = series
+        self.backend = get_watch_backend(series.save_dir_path, backend, settle_seconds)
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def subscribe(self, callback: callable) -> None:
+        """Call a function after each batch of saves is ingested
+
+        Parameters:
+        callback (callable): The function, called with the series and the list of the base names of
+            the ingested saves
+
+        Returns:
+        None
+        """
+        self.subscribers.append(callback)
+
+    def get_save_paths(self, timeout: float = 1.0) -> list:
+        """Wait for saves to be written, without ingesting them, e.g. to ingest them elsewhere
+
+        Parameters:
+        timeout (float): The maximum number of seconds to wait for saves
+
+        Returns:
+        list: The paths of the complete saves that match the series, or an empty list
+        """
+        return [
+            save_path for save_path in self.backend.poll(timeout)
+            if self.series.is_series_save_file(save_path) and save_path.is_file()
+        ]
+
+    def poll(self, timeout: float = 1.0) -> list:
+        """Wait for saves to be written, then ingest them and notify the subscribers
+
+        Parameters:
+        timeout (float): The maximum number of seconds to wait for saves
+
+        Returns:
+        list: The base names of the ingested saves, or an empty list if there were none
+        """
+        save_paths = self.get_save_paths(timeout)
+
+        if not save_paths:
+            return []
+
+        with self.lock:
+            try:
+                save_base_names = self.series.ingest(save_paths)
+            except Exception as error:  # pylint: disable=broad-except
+                self.record_failure(save_paths, error)
+                return []
+
+        for callback in self.subscribers:
+            callback(self.series, save_base_names)
+
+        return save_base_names
+
+    def record_failure(self, save_paths: list, error: Exception) -> None:
+        """Log a batch of saves that failed to ingest and record the error of each in the series
+
+        The series is left as it was before the batch, so a rewritten save keeps its earlier
+        snapshot and a new save is left out, and neither is loaded again until it is written again.
+
+        Parameters:
+        save_paths (list): The paths of the saves of the batch
+        error (Exception): The error raised while ingesting the batch
+
+        Returns:
+        None
+        """
+        logging.exception("Failed to ingest saves: %s", save_paths)
+        failure = {
+            "kind": "exception",
+            "error_type": type(error).__name__,
+            "message": str(error),
+            "traceback": traceback.format_exc(),
+        }
+
+        for save_path in save_paths:
+            self.series.errors[os.path.basename(save_path)] = failure
+
+    def run(self, timeout: float = 1.0) -> None:
+        """Ingest saves until the watcher is stopped
+
+        Parameters:
+        timeout (float): The maximum number of seconds between checks for a stop request
+
+        Returns:
+        None
+        """
+        logging.info("Watching %s using %s", self.series.save_dir_path, self.backend.name)
+
+        while not self.stop_event.is_set():
+            self.poll(timeout)
+
+    def start(self, timeout: float = 1.0) -> None:
+        """Ingest saves in a background thread until the watcher is stopped
+
+        Parameters:
+        timeout (float): The maximum number of seconds between checks for a stop request
+
+        Returns:
+        None
+        """
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, args=(timeout,), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, if any, and the watch backend
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.stop_event.set()
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        self.backend.close()
@@ -0,0 +1,58 @@
+"""Test the benchmark harness using a small synthetic series of saves"""
+
+import json
+import logging
+import pathlib
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+
+
+def test_benchmarks(tmp_path: pathlib.Path) -> None:
+    """Test running the benchmarks, recording the results as JSON and comparing two records
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    output_path = tmp_path / "current.json"
+    arguments = ["run", "--output", str(output_path), "--preset", "tiny", "--plant-count", "200",
+                 "--series-length", "2", "--rounds", "1"]
+    assert main(arguments) == 0
+
+    with open(output_path, "r", encoding="utf_8") as results_file:
+        record = json.load(results_file)
+
+    logging.debug("Benchmark record = %s", record)
+    expected_stages = [
+        "import_save",
+        "save_decompress",
+        "save_prescan",
+        "save_parse",
+        "save_extract_plant",
+        "save_generate_dataframes",
+        "save_transform_plant",
+        "series_load",
+        "series_aggregate",
+        "report_generate",
+    ]
+
+    for stage_name in expected_stages:
+        assert record["results"][stage_name]["min"] > 0
+
+    assert record["parameters"]["plant_count"] == 200
+
+    # A record compared with itself has no regressions
+    assert main(["compare", str(output_path), str(output_path)]) == 0
+
+    # A record that is twice as slow is reported as a regression, ignoring unknown stages
+    slower_record = json.loads(json.dumps(record))
+    slower_record["results"]["save_parse"]["min"] *= 2
+    slower_record["results"]["new_stage"] = {"rounds": 1, "min": 1.0}
+    slower_path = tmp_path / "slower.json"
+    harness.write_results(record=slower_record, output_path=slower_path)
+    assert main(["compare", str(output_path), str(slower_path)]) == 1
+    regressions = harness.compare_results(baseline=record, current=slower_record, threshold=1.5)
+    assert [regression[0] for regression in regressions] == ["save_parse"]
@@ -43,13 +43,12 @@ def test_class_save_root(test_data_list: list) -> None:
     Returns:
     None
     """
-    root = Save(test_data_list[0], preserve_root=True).data.root
+    with Save(test_data_list[0], parser="etree").open_root() as root:
+        # Test the Save class's root property data type
+        assert isinstance(root, xml.etree.ElementTree.Element)
 
-    # Test the Save class's root property data type
-    assert isinstance(root, xml.etree.ElementTree.Element)
-
-    # Validate that the XML tree contains the pawnData element
-    element = root.find(".//pawnData")
+        # Validate that the XML tree contains the pawnData element
+        element = root.find(".//pawnData")
 
     # Validate the sample element's data type
     assert isinstance(element, xml.etree.ElementTree.Element)
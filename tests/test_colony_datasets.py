@@ -0,0 +1,124 @@
+"""Test the animal, item and building datasets, extracted in the same traversal as the plants"""
+
+import pathlib
+
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.datasets import COLONY_DATASET_NAMES, DATASET_NAMES, get_thing_aggregates
+from save.datasets import get_thing_dataset, transform_thing
+from save.parser import get_parser_backend
+
+
+@pytest.mark.parametrize("class_name,dataset_name", [
+    ("Plant", "plant"),
+    ("Pawn", "animal"),
+    ("MinifiedThing", "item"),
+    ("Building_Door", "building"),
+    ("Rimefeller.Building_Pipe", "building"),
+    ("Filth", None),
+    ("Mineable", None),
+    (None, None),
+])
+def test_get_thing_dataset(class_name: str, dataset_name: str) -> None:
+    """Test that each thing is told apart by its Class attribute, including the classes of mods
+
+    Parameters:
+    class_name (str): The Class attribute of the thing
+    dataset_name (str): The expected dataset of the thing
+
+    Returns:
+    None
+    """
+    assert get_thing_dataset(class_name) == dataset_name
+
+
+def test_colony_datasets(tmp_path: pathlib.Path) -> None:
+    """Test that every parser mode extracts the same typed rows, and their per snapshot aggregates
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    datasets = [*DATASET_NAMES, *COLONY_DATASET_NAMES]
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=datasets)
+    expected = series.latest_save
+
+    assert {dataset_name: len(expected.data[dataset_name].index)
+            for dataset_name in COLONY_DATASET_NAMES} == {"animal": 3, "item": 20, "building": 50}
+    assert str(series.data.item["item_stack_count"].dtype) == "Int64"
+    assert str(series.data.building["building_hit_points"].dtype) == "Int64"
+
+    for options in [{"parser": get_parser_backend("etree", mode="stream")},
+                    {"parser": get_parser_backend("lxml", mode="stream")},
+                    {"parser": get_parser_backend("etree", mode="prescan")},
+                    {"workers": 2}]:
+        save = Save(save_paths[1], datasets=datasets, **options)
+
+        for dataset_name in datasets:
+            pandas.testing.assert_frame_equal(save.data[dataset_name],
+                                              expected.data[dataset_name])
+
+    # The aggregates count the things of each definition, and total their integer columns
+    aggregates = series.get_thing_aggregates("item")
+    items = series.data.item
+
+    assert aggregates["item_count"].sum() == len(items.index)
+    assert aggregates["item_stack_count"].sum() == items["item_stack_count"].sum()
+    assert set(aggregates["time_ticks"]) == set(items["time_ticks"])
+    assert get_thing_aggregates(series.data.plant, "plant")["plant_count"].sum() == \
+        len(series.data.plant.index)
+
+
+def test_colony_datasets_humanlike(tmp_path: pathlib.Path) -> None:
+    """Test that colonists are left out of the animals, and that a save without things is typed
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 1, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    save_path = tmp_path / "colonist.rws"
+    document = save_paths[0].read_text(encoding="utf_8")
+    save_path.write_text(document.replace(
+        "<def>Husky</def>", "<def>Human</def><name Class=\"NameTriple\"><first>Ann</first></name>"),
+        encoding="utf_8")
+    save = Save(save_path, datasets=["animal"],
+                parser=get_parser_backend("etree", mode="stream"))
+
+    assert len(save.data.animal.index) == 3 - document.count("<def>Husky</def>")
+    assert "Human" not in set(save.data.animal["animal_definition"])
+
+    dataframe = pandas.DataFrame({"building_hit_points": pandas.Series([], dtype=object)})
+    transform_thing(dataframe, "building")
+
+    assert str(dataframe["building_hit_points"].dtype) == "Int64"
+
+
+def test_colony_datasets_demo_save(test_data_directory: pathlib.Path) -> None:
+    """Test that the colonists of a demo save, which are androids of a mod, are not animals
+
+    Parameters:
+    test_data_directory (pathlib.Path): The directory of the demo saves (fixture)
+
+    Returns:
+    None
+    """
+    save_path = test_data_directory / "demosave 1.rws.gz"
+
+    for parser in [get_parser_backend("lxml"), get_parser_backend("etree", mode="stream")]:
+        save = Save(save_path, datasets=["animal"], parser=parser)
+        definitions = set(save.data.animal["animal_definition"])
+
+        assert not definitions & {"Android2Tier", "Android3Tier"}
+        assert {"AndroidDog", "Goat", "Elk"} <= definitions
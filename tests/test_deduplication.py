@@ -0,0 +1,158 @@
+"""Test loading each snapshot of a series once, whatever the number of files holding it"""
+
+import gzip
+import os
+import pathlib
+import shutil
+
+import pytest
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.deduplication import find_duplicates, get_document_digest, get_document_size
+
+SERIES_REGEX = r"synthetic\s\d{1,10}"
+
+
+def write_gzip_copy(source_path: pathlib.Path, destination_path: pathlib.Path) -> None:
+    """Write a gzip compressed copy of a plain save file
+
+    Parameters:
+    source_path (pathlib.Path): The path of the plain save file
+    destination_path (pathlib.Path): The path of the compressed copy, ending with .rws.gz
+
+    Returns:
+    None
+    """
+    with gzip.open(destination_path, "wb") as save_file:
+        save_file.write(source_path.read_bytes())
+
+
+def test_find_duplicates(tmp_path: pathlib.Path) -> None:
+    """Test that identical documents are found whatever their compression
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    write_gzip_copy(save_paths[0], tmp_path / "copy.rws.gz")
+    (tmp_path / "one.rws").write_bytes(b"<savegame>1</savegame>")
+    (tmp_path / "two.rws").write_bytes(b"<savegame>2</savegame>")
+    dictionary = {
+        path.name: {"path": str(path)}
+        for path in [*save_paths, tmp_path / "copy.rws.gz", tmp_path / "one.rws",
+                     tmp_path / "two.rws"]
+    }
+
+    assert get_document_size(str(tmp_path / "copy.rws.gz")) == save_paths[0].stat().st_size
+    assert find_duplicates(dictionary) == {"copy.rws.gz": "synthetic 1.rws"}
+
+    # Only the saves sharing a document size are hashed
+    assert "document_digest" not in dictionary["synthetic 2.rws"]
+    assert dictionary["one.rws"]["document_digest"] != dictionary["two.rws"]["document_digest"]
+    assert dictionary["copy.rws.gz"]["document_digest"] == get_document_digest(str(save_paths[0]))
+
+
+def test_series_deduplication(tmp_path: pathlib.Path) -> None:
+    """Test that identical saves are loaded once and recorded as aliases, also when ingested
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    write_gzip_copy(save_paths[0], tmp_path / "synthetic 4.rws.gz")
+    shutil.copy(save_paths[0], tmp_path / "synthetic 5.rws")
+    save_paths[2].rename(tmp_path / "staged.xml")
+    series = SaveSeries(tmp_path, SERIES_REGEX, datasets=["plant"])
+    spans = {span["name"]: span for span in series.metrics.spans}
+
+    assert series.aliases == {"synthetic 4.rws.gz": "synthetic 1.rws",
+                              "synthetic 5.rws": "synthetic 1.rws"}
+    assert spans["deduplicate"]["rows"] == 2
+    assert list(series.dictionary) == ["synthetic 1.rws", "synthetic 2.rws"]
+    assert series.data.plant["time_ticks"].value_counts().nunique() == 1
+
+    # An ingested copy of a loaded save is only recorded as an alias
+    shutil.copy(save_paths[1], tmp_path / "synthetic 6.rws")
+    series.ingest([tmp_path / "synthetic 6.rws"])
+
+    assert series.aliases["synthetic 6.rws"] == "synthetic 2.rws"
+    assert len(series.dictionary) == 2
+
+    # Rewriting a save loads its aliases again, as they still hold its former document
+    (tmp_path / "staged.xml").rename(save_paths[0])
+    series.ingest([save_paths[0]])
+
+    assert "synthetic 4.rws.gz" not in series.aliases
+    assert len(series.dictionary) == 3
+    assert series.data.plant["time_ticks"].nunique() == 3
+
+
+def test_series_deduplication_empty_gzip(tmp_path: pathlib.Path) -> None:
+    """Test that an empty gzip file, as a killed autosave leaves, only fails to load by itself
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    synthetic.write_series(tmp_path, 1, scale=synthetic.SCALE_PRESETS["tiny"],
+                           file_name_format="synthetic {}.rws")
+    (tmp_path / "synthetic 2.rws.gz").write_bytes(b"")
+    (tmp_path / "synthetic 3.rws.gz").write_bytes(b"\x1f\x8b")
+    series = SaveSeries(tmp_path, SERIES_REGEX, datasets=["plant"])
+
+    assert get_document_size(str(tmp_path / "synthetic 2.rws.gz")) is None
+    assert not series.aliases
+    assert list(series.dictionary) == ["synthetic 1.rws"]
+    assert set(series.errors) == {"synthetic 2.rws.gz", "synthetic 3.rws.gz"}
+
+
+@pytest.mark.parametrize("equal_ticks_policy,expected_save_base_names", [
+    (None, ["synthetic 1.rws", "synthetic 2.rws"]),
+    ("keep_all", ["synthetic 1.rws", "synthetic 2.rws"]),
+    ("keep_newest", ["synthetic 2.rws"]),
+    ("keep_oldest", ["synthetic 1.rws"]),
+])
+def test_equal_ticks_policy(equal_ticks_policy: str, expected_save_base_names: list,
+                            caplog: pytest.LogCaptureFixture, tmp_path: pathlib.Path) -> None:
+    """Test each policy for different saves with the same in-game time, keeping all by default
+
+    Parameters:
+    equal_ticks_policy (str): The policy for saves with the same in-game time, or None for the
+        default
+    expected_save_base_names (list): The base names of the saves expected to be kept
+    caplog (pytest.LogCaptureFixture): Captures the warning logged for each dropped save (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    # Two colonies generated from different seeds are saved at the same in-game time
+    for save_number, seed in [(1, 0), (2, 1)]:
+        save_path = synthetic.write_series(
+            tmp_path, 1, scale=synthetic.SCALE_PRESETS["tiny"], seed=seed,
+            file_name_format=f"synthetic {save_number}.rws")[0]
+        os.utime(save_path, (save_number, save_number))
+
+    # A copy of a dropped save becomes an alias of the save kept instead
+    shutil.copy(tmp_path / "synthetic 1.rws", tmp_path / "synthetic 3.rws")
+    options = {} if equal_ticks_policy is None else {"equal_ticks_policy": equal_ticks_policy}
+    series = SaveSeries(tmp_path, SERIES_REGEX, datasets=["weather"], **options)
+    dropped_warnings = [record.getMessage() for record in caplog.records
+                        if record.getMessage().startswith("Dropping save")]
+
+    assert list(series.dictionary) == expected_save_base_names
+    assert len(dropped_warnings) == 2 - len(expected_save_base_names)
+    assert len(series.aliases) == 3 - len(expected_save_base_names)
+    assert set(series.aliases.values()) <= set(expected_save_base_names)
+    assert len(series.data.weather.index) == len(expected_save_base_names)
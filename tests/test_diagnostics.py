@@ -0,0 +1,75 @@
+"""Test the tallies of missing values and the sampled XML dumps of the affected elements"""
+
+import logging
+import xml.etree.ElementTree
+
+import pytest
+
+from save import Save
+from save.diagnostics import Diagnostics, XML_DUMP_SAMPLE_SIZE
+
+
+def test_missing_value_tallies(test_data_list: list) -> None:
+    """Test that the missing values of each dataset and column are tallied while extracting
+
+    Parameters:
+    test_data_list (list): The list of paths to the test input data files (fixture)
+
+    Returns:
+    None
+    """
+    for save_path in test_data_list:
+        save = Save(path_to_save_file=save_path)
+        summary = save.data.diagnostics.summarize()
+        logging.debug("Missing value summary of %s = %s", save_path, summary)
+
+        for dataset_name in ["pawn", "plant"]:
+            missing_counts = save.data[dataset_name].isna().sum()
+            expected_summary = {
+                column_name: count for column_name, count in missing_counts.items() if count > 0
+            }
+            assert summary.get(dataset_name, {}) == expected_summary
+
+
+def test_sampled_xml_dump(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that the XML dumps are only emitted when enabled and only for a sample of elements
+
+    Parameters:
+    caplog (pytest.LogCaptureFixture): The captured log records (fixture)
+
+    Returns:
+    None
+    """
+    parent_element = xml.etree.ElementTree.Element("thing")
+    xml.etree.ElementTree.SubElement(parent_element, "def").text = "Plant_Grass"
+    missing_count = XML_DUMP_SAMPLE_SIZE + 3
+
+    # No XML is dumped by default
+    diagnostics = Diagnostics()
+    diagnostics.dataset_name = "plant"
+
+    for _ in range(missing_count):
+        diagnostics.record_missing("plant_age", parent_element)
+
+    assert not [record for record in caplog.records if record.name == "save.xml_dump"]
+
+    # A sample of the XML is dumped once the dump logger is enabled for DEBUG
+    with caplog.at_level(logging.DEBUG, logger="save.xml_dump"):
+        sampled_diagnostics = Diagnostics()
+        sampled_diagnostics.dataset_name = "plant"
+
+        for _ in range(missing_count):
+            sampled_diagnostics.record_missing("plant_age", parent_element)
+
+    dump_records = [record for record in caplog.records if record.name == "save.xml_dump"]
+    assert len(dump_records) == XML_DUMP_SAMPLE_SIZE
+    assert "Plant_Grass" in dump_records[0].getMessage()
+
+    # Tallies are merged across saves
+    diagnostics.merge(sampled_diagnostics)
+    diagnostics.dataset_name = "pawn"
+    diagnostics.record_missing("pawn_name_nick", None, count=2)
+    assert diagnostics.summarize() == {
+        "pawn": {"pawn_name_nick": 2},
+        "plant": {"plant_age": 2 * missing_count},
+    }
@@ -0,0 +1,159 @@
+"""Test exporting the datasets of a series of saves to a file per dataset, one save at a time"""
+
+import pathlib
+
+import pandas
+import pytest
+
+import save.export
+from benchmarks import synthetic
+from save import SaveSeries
+from save.export import ExportWriter, export_series, get_export_format, is_text_column, main
+
+
+def get_series(save_dir_path: pathlib.Path, aggregate: bool = True) -> SaveSeries:
+    """Return a synthetic series of three saves with the plant and weather datasets
+
+    Parameters:
+    save_dir_path (pathlib.Path): The directory of the saves, which are written if it is missing
+    aggregate (bool): Load the saves and aggregate their datasets, see SaveSeries
+
+    Returns:
+    SaveSeries: The series
+    """
+    if not save_dir_path.exists():
+        save_dir_path.mkdir()
+        synthetic.write_series(save_dir_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                               file_name_format="synthetic {}.rws")
+
+    return SaveSeries(save_dir_path, r"synthetic\s\d{1,10}", datasets=["plant", "weather"],
+                      aggregate=aggregate)
+
+
+def test_export_csv(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    """Test that the CSV fallback holds the rows of every save, without aggregating the series
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Hides pyarrow, as if it was not installed (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    monkeypatch.setattr(save.export, "pyarrow", None)
+    series = get_series(tmp_path / "saves", aggregate=False)
+    paths = export_series(series, tmp_path / "export")
+
+    assert not series.data
+    assert all("save" not in save_file_data for save_file_data in series.dictionary.values())
+    assert paths == {"plant": tmp_path / "export" / "plant.csv",
+                     "weather": tmp_path / "export" / "weather.csv"}
+
+    expected = get_series(tmp_path / "saves").data.plant
+    exported = pandas.read_csv(paths["plant"], dtype={"plant_age": "Int64"})
+    columns = ["time_ticks", "plant_id", "plant_growth", "plant_age"]
+
+    pandas.testing.assert_frame_equal(
+        exported[columns].sort_values(columns).reset_index(drop=True),
+        expected[columns].astype({"plant_id": object}).sort_values(columns)
+        .reset_index(drop=True))
+
+    # Only CSV is available without pyarrow
+    assert get_export_format() == "csv"
+
+    for export_format in ["parquet", "xlsx"]:
+        with pytest.raises(ValueError):
+            get_export_format(export_format)
+
+
+def test_export_arrow(tmp_path: pathlib.Path) -> None:
+    """Test that the Parquet and Arrow IPC files hold a row group per snapshot and encoded text
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    pyarrow = pytest.importorskip("pyarrow")
+    series = get_series(tmp_path / "saves", aggregate=False)
+    parquet_path = export_series(series, tmp_path / "parquet", "parquet")["plant"]
+    arrow_path = export_series(series, tmp_path / "arrow", "arrow")["plant"]
+    parquet_file = pyarrow.parquet.ParquetFile(parquet_path)
+    arrow_file = pyarrow.ipc.open_file(arrow_path)
+
+    assert parquet_file.num_row_groups == arrow_file.num_record_batches == 3
+    assert pyarrow.types.is_dictionary(arrow_file.schema.field("plant_id").type)
+    assert parquet_file.read().num_rows == arrow_file.read_all().num_rows == \
+        len(get_series(tmp_path / "saves").data.plant.index)
+
+
+@pytest.mark.parametrize("column,is_text", [
+    (pandas.Series(["Plant_Grass1", None]), True),
+    (pandas.Series([None, None]), True),
+    (pandas.Series([], dtype=object), True),
+    (pandas.Series(["1", "2"]).astype("category"), True),
+    (pandas.Series([], dtype=object).astype("category"), True),
+    (pandas.Series([5, 10]).astype("category"), False),
+    (pandas.Series([], dtype=object).astype(float), False),
+    (pandas.Series([None], dtype="Int64"), False),
+])
+def test_is_text_column(column: pandas.Series, is_text: bool) -> None:
+    """Test that columns are typed as text by their dtype, whatever their values
+
+    Parameters:
+    column (pandas.Series): The column
+    is_text (bool): Whether the column is expected to be exported as text
+
+    Returns:
+    None
+    """
+    assert is_text_column(column) == is_text
+
+
+def test_export_arrow_empty_snapshot(tmp_path: pathlib.Path) -> None:
+    """Test that snapshots without rows before the first with rows do not decide the schema
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    pyarrow = pytest.importorskip("pyarrow")
+    writer = ExportWriter(tmp_path, "arrow")
+    empty = pandas.DataFrame({"item_id": pandas.Series([], dtype=object),
+                              "item_stack_count": pandas.Series([], dtype=object)})
+    writer.write("item", empty)
+    writer.write("item", pandas.DataFrame({
+        "item_id": ["Steel1"], "item_stack_count": pandas.array([75], dtype="Int64")}))
+    writer.write("building", empty.rename(columns={"item_id": "building_id"}))
+    writer.close()
+    arrow_file = pyarrow.ipc.open_file(writer.paths["item"])
+
+    assert arrow_file.num_record_batches == 2
+    assert pyarrow.types.is_integer(arrow_file.schema.field("item_stack_count").type)
+    assert arrow_file.read_all().num_rows == 1
+    assert pyarrow.ipc.open_file(writer.paths["building"]).read_all().num_rows == 0
+
+
+def test_export_main(tmp_path: pathlib.Path) -> None:
+    """Test that the command line exports the datasets, and fails if a save fails to load
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    get_series(tmp_path / "saves", aggregate=False)
+    arguments = [str(tmp_path / "saves"), r"synthetic\s\d{1,10}", str(tmp_path / "export"),
+                 "--format", "csv", "--datasets", "weather"]
+
+    assert main(arguments) == 0
+    assert len(pandas.read_csv(tmp_path / "export" / "weather.csv").index) == 3
+
+    (tmp_path / "saves" / "synthetic 9.rws").write_text("<savegame>", encoding="utf_8")
+
+    assert main(arguments) == 1
+    assert len(pandas.read_csv(tmp_path / "export" / "weather.csv").index) == 3
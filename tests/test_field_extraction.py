@@ -0,0 +1,100 @@
+"""Test the FieldExtractor class that extracts columns from the children of XML elements"""
+
+import logging
+import xml.etree.ElementTree
+
+import pytest
+
+from save.diagnostics import Diagnostics
+from save.extraction import FieldExtractor, get_row_count
+
+
+def test_field_extractor() -> None:
+    """Test extracting flat and nested fields, ignoring elements nested elsewhere in the row
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    elements = [
+        xml.etree.ElementTree.fromstring(
+            "<thing><def>Plant_Grass</def><id>Plant_Grass1</id><age>10</age>"
+            "<name><first>Ann</first></name></thing>"
+        ),
+        # The age nested inside a comp must not be mistaken for the plant's own age
+        xml.etree.ElementTree.fromstring(
+            "<thing><def>Plant_Bush</def><id>Plant_Bush2</id><id>Duplicate</id>"
+            "<comps><li><age>99</age></li></comps></thing>"
+        ),
+    ]
+    extractor = FieldExtractor({
+        "plant_id": "id",
+        "plant_definition": "def",
+        "plant_age": "age",
+        "plant_name_first": "name/first",
+    })
+    diagnostics = Diagnostics()
+    diagnostics.dataset_name = "plant"
+    columns = extractor.extract(elements, diagnostics)
+    logging.debug("Extracted columns = %s", columns)
+
+    assert columns == {
+        "plant_id": ["Plant_Grass1", "Plant_Bush2"],
+        "plant_definition": ["Plant_Grass", "Plant_Bush"],
+        "plant_age": ["10", None],
+        "plant_name_first": ["Ann", None],
+    }
+    assert get_row_count(columns) == 2
+    assert get_row_count({}) == 0
+    assert diagnostics.summarize() == {"plant": {"plant_age": 1, "plant_name_first": 1}}
+
+
+def test_field_extractor_xml_dump(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that a sample of the elements with missing fields is dumped when enabled
+
+    Parameters:
+    caplog (pytest.LogCaptureFixture): The captured log records (fixture)
+
+    Returns:
+    None
+    """
+    elements = [
+        xml.etree.ElementTree.fromstring(f"<thing><id>Plant_Grass{index}</id></thing>")
+        for index in range(10)
+    ]
+    extractor = FieldExtractor({"plant_id": "id", "plant_age": "age"})
+
+    with caplog.at_level(logging.DEBUG, logger="save.xml_dump"):
+        diagnostics = Diagnostics()
+        diagnostics.dataset_name = "plant"
+        extractor.extract(elements, diagnostics)
+
+    dump_records = [record for record in caplog.records if record.name == "save.xml_dump"]
+    assert len(dump_records) == 5
+    assert "Plant_Grass0" in dump_records[0].getMessage()
+    assert diagnostics.summarize() == {"plant": {"plant_age": 10}}
+
+
+def test_field_extractor_first_match() -> None:
+    """Test that the first matching child is kept even without text, as Element.find would
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    xml_text = ("<thing><id /><id>Plant_Grass1</id><name><first /></name>"
+                "<name><first>Ann</first></name></thing>")
+    element = xml.etree.ElementTree.fromstring(xml_text)
+    extractor = FieldExtractor({"plant_id": "id", "plant_name_first": "name/first"})
+    expected = {"plant_id": [element.find("id").text],
+                "plant_name_first": [element.find("name/first").text]}
+    buffers = extractor.new_buffers()
+    extractor.append_row(element, buffers)
+
+    assert expected == {"plant_id": [None], "plant_name_first": [None]}
+    assert extractor.extract([element]) == expected
+    assert extractor.get_columns(buffers) == expected
@@ -0,0 +1,71 @@
+"""Test that importing the packages does not import heavy dependencies
+
+The import time itself varies too much between machines to be asserted, and is reported by the
+import_save and import_view benchmarks of benchmarks.harness instead.
+"""
+
+import logging
+import subprocess
+import sys
+
+import pytest
+
+from save.lazy_import import lazy_import
+
+
+def get_heavy_modules_loaded(module_name: str) -> str:
+    """Import a module in a fresh interpreter and return the heavy modules it loaded
+
+    Parameters:
+    module_name (str): The name of the module to import
+
+    Returns:
+    str: The list of the heavy modules loaded, other than lazy stand-ins, as printed by Python
+    """
+    heavy_modules = ["pandas", "plotly.express", "numpy", "lxml.etree", "wcmatch.pathlib"]
+    command = [
+        sys.executable, "-c",
+        f"import sys, {module_name}; print([m for m in {heavy_modules} if m in sys.modules and "
+        f"not type(sys.modules[m]).__name__.startswith('_Lazy')])"
+    ]
+    result = subprocess.run(command, capture_output=True, check=True, text=True)
+
+    return result.stdout.strip()
+
+
+@pytest.mark.parametrize("module_name", ["save", "view.summary_report"])
+def test_import_time(module_name: str) -> None:
+    """Test that importing the package loads no heavy dependencies
+
+    Parameters:
+    module_name (str): The name of the module to import
+
+    Returns:
+    None
+    """
+    heavy_modules_loaded = get_heavy_modules_loaded(module_name)
+    logging.debug("Import of %s loaded heavy modules: %s", module_name, heavy_modules_loaded)
+
+    assert heavy_modules_loaded == "[]"
+
+
+def test_lazy_import() -> None:
+    """Test that a lazily imported module is only executed once one of its attributes is used
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    module_name = "colorsys"
+    sys.modules.pop(module_name, None)
+    module = lazy_import(module_name)
+
+    # The stand-in is registered in place of the module but its code has not been executed yet
+    assert sys.modules[module_name] is module
+    assert type(module).__name__ == "_LazyModule"
+
+    # The module is loaded on first attribute access and a repeat import returns the same module
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert lazy_import(module_name) is module
@@ -0,0 +1,67 @@
+"""Test mapping the IDs and definitions of a series to integer codes shared by every snapshot"""
+
+import pathlib
+
+import numpy
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.interning import InternTable
+
+
+def test_intern_table() -> None:
+    """Test that codes stay the same as strings are added and that IDs are parsed
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    intern_table = InternTable()
+
+    assert intern_table.get_codes(["Plant_TreeOak12", "Plant_Grass3"]).tolist() == [0, 1]
+    assert intern_table.get_codes(["Plant_Moss45", "Plant_TreeOak12"]).tolist() == [2, 0]
+    assert len(intern_table) == 3
+
+    categorical = intern_table.get_categorical(numpy.array([2, -1, 0], dtype=numpy.int32))
+
+    assert list(categorical.astype(object)) == ["Plant_Moss45", numpy.nan, "Plant_TreeOak12"]
+
+    parts = intern_table.get_parts()
+
+    assert parts["kind"].tolist() == ["Plant_TreeOak", "Plant_Grass", "Plant_Moss"]
+    assert parts["number"].tolist() == [12, 3, 45]
+
+    # Strings that do not end with digits, such as definitions, have no number
+    intern_table.get_codes(["Plant_TreeOak"])
+
+    assert intern_table.get_parts()["number"].isna().tolist() == [False] * 3 + [True]
+
+
+def test_series_interning(tmp_path: pathlib.Path) -> None:
+    """Test that a plant has the same code in every snapshot of a series, also after ingesting
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    save_paths[2].rename(tmp_path / "staged.xml")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["pawn", "plant"])
+    plant_id = series.data.plant["plant_id"]
+    codes = plant_id.cat.codes
+
+    assert list(plant_id.cat.categories) == series.intern_tables["plant_id"].strings
+    assert codes.groupby(plant_id.astype(object)).nunique().eq(1).all()
+    assert series.data.pawn["is_humanoid_colonist"].dtype == bool
+
+    # Ingesting a save keeps the codes of the plants seen before
+    (tmp_path / "staged.xml").rename(save_paths[2])
+    series.ingest([save_paths[2]])
+
+    assert (series.data.plant["plant_id"].cat.codes[:len(codes)] == codes).all()
+    assert series.data.plant["plant_definition"].cat.categories.is_unique
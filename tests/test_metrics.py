@@ -0,0 +1,103 @@
+"""Test the per-stage timing and memory instrumentation of Save and SaveSeries"""
+
+import json
+import logging
+import pathlib
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.metrics import Metrics
+
+
+def test_save_metrics(test_data_list: list) -> None:
+    """Test the spans recorded while creating a Save object
+
+    Parameters:
+    test_data_list (list): The list of paths to the test input data files (fixture)
+
+    Returns:
+    None
+    """
+    save = Save(path_to_save_file=test_data_list[0])
+    summary = save.data.metrics.summarize()
+    logging.debug("Save metrics summary = %s", summary)
+    expected_stages = [
+        "parse",
+        "extract_mod",
+        "extract_pawn",
+        "extract_plant",
+        "extract_weather",
+        "dataframe_plant",
+        "transform_pawn",
+        "transform_plant",
+    ]
+
+    for stage_name in expected_stages:
+        assert summary[stage_name]["count"] == 1
+        assert summary[stage_name]["wall_seconds"] >= 0
+        assert summary[stage_name]["process_peak_rss_bytes"] > 0
+
+    # The save is parsed as it is decompressed, without holding the whole document in memory
+    assert "decompress" not in summary
+    assert summary["extract_plant"]["rows"] == len(save.data.plant.index)
+    assert summary["dataframe_plant"]["rows"] == len(save.data.plant.index)
+
+
+def test_save_series_metrics(tmp_path: pathlib.Path) -> None:
+    """Test the spans recorded while loading a series and exporting them as JSON or Chrome trace
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    synthetic.write_series(save_dir_path=tmp_path, series_length=2,
+                           scale=synthetic.SCALE_PRESETS["tiny"], file_name_format="metrics {}.rws")
+    series = SaveSeries(save_dir_path=tmp_path, save_file_regex_pattern=r"metrics\s\d")
+    summary = series.metrics.summarize()
+
+    assert summary["scan"]["rows"] == 2
+    assert summary["pool_dispatch"]["count"] == 1
+    assert summary["ipc"]["count"] == 2
+    assert 0 <= summary["ipc"]["wall_seconds"] <= summary["pool_dispatch"]["wall_seconds"]
+    assert summary["parse"]["count"] == 2
+    assert "read" not in summary
+    assert summary["aggregate_plant"]["rows"] == len(series.data.plant.index)
+
+    # Spans of each save are tagged with the save they came from
+    sources = {span.get("source") for span in series.metrics.get_spans()}
+    assert sources == {None, "metrics 1.rws", "metrics 2.rws"}
+
+    json_path = tmp_path / "metrics.json"
+    series.metrics.write(json_path)
+
+    with open(json_path, "r", encoding="utf_8") as json_file:
+        assert json.load(json_file)["summary"]["ipc"]["count"] == 2
+
+    trace_path = tmp_path / "trace.json"
+    series.metrics.write(trace_path, trace_format="chrome")
+
+    with open(trace_path, "r", encoding="utf_8") as trace_file:
+        trace_events = json.load(trace_file)["traceEvents"]
+
+    assert len(trace_events) == len(series.metrics.get_spans())
+    assert {event["ph"] for event in trace_events} == {"X"}
+    assert all(event["dur"] >= 0 for event in trace_events)
+
+
+def test_metrics_add_span() -> None:
+    """Test summarizing a span that was timed outside of the span context manager
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    metrics = Metrics()
+    metrics.add_span("manual", start=100.0, wall_seconds=2.5, rows=3)
+
+    assert metrics.summarize()["manual"] == {"count": 1, "wall_seconds": 2.5, "cpu_seconds": 0.0,
+                                             "rows": 3, "process_peak_rss_bytes": 0}
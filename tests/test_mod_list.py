@@ -1,7 +1,14 @@
 """Test the extract_mod_list function that extracts data about installed mods from a save file"""
 import logging
+import pathlib
 
+import pandas
+
+from benchmarks import synthetic
 from save import Save
+from save import SaveSeries
+from save.mod_list import CHANGE_COLUMNS, ModListVersions
+from save.timeline import TICKS_PER_DAY
 
 
 def test_mod_list(test_data_list: list) -> None:
@@ -33,3 +40,62 @@ def test_mod_list(test_data_list: list) -> None:
 
     for key in sample_mod.keys():
         assert key in expected_mod_attributes
+
+
+def test_mod_list_versions(tmp_path: pathlib.Path) -> None:
+    """Test that a series keeps each distinct mod list once and finds the mods added and removed
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 4, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+
+    # The third save drops a mod, and the fourth replaces another one
+    for save_path, replacements in zip(save_paths[2:], [[], [(b"mod1<", b"mod9<")]]):
+        save_bytes = save_path.read_bytes()
+
+        for old, new in [(b"<li>synthetic.mod4</li>", b""), (b"<li>Synthetic Mod 4</li>", b""),
+                         (b"<li>2000000004</li>", b""), *replacements]:
+            save_bytes = save_bytes.replace(old, new)
+
+        save_path.write_bytes(save_bytes)
+
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["mod", "plant"])
+    time_ticks = series.tick_index.time_ticks
+    changes = series.mod_lists.get_changes()
+
+    assert len(series.mod_lists) == 3
+    assert series.mod_lists.snapshot_versions.tolist() == [0, 0, 1, 2]
+    assert len(series.data.mod.index) == 5 + 4 + 4
+    assert changes[["time_ticks", "change", "mod_id"]].values.tolist() == [
+        [time_ticks[2], "removed", "synthetic.mod4"],
+        [time_ticks[3], "added", "synthetic.mod9"],
+        [time_ticks[3], "removed", "synthetic.mod1"],
+    ]
+    assert changes["mod_name"].tolist() == ["Synthetic Mod 4", "Synthetic Mod 1",
+                                            "Synthetic Mod 1"]
+
+    assert series.data.mod["mod_list_version"].tolist() == [0] * 5 + [1] * 4 + [2] * 4
+    assert series.mod_lists.get_snapshot_versions().values.tolist() == [
+        [ticks, version] for ticks, version in zip(time_ticks, [0, 0, 1, 2])]
+
+    # The rows of each snapshot are expanded from its version, like those of its save
+    standalone_mods = []
+
+    for save_path, version in zip(save_paths, [0, 0, 1, 2]):
+        save = series.dictionary[save_path.name]["save"]
+        pandas.testing.assert_frame_equal(save.data.mod, Save(save_path).data.mod)
+        standalone_mods.append(save.data.mod.assign(mod_list_version=version))
+
+    pandas.testing.assert_frame_equal(series.get_mod_snapshots()[standalone_mods[0].columns],
+                                      pandas.concat(standalone_mods))
+
+    assert series.as_of(time_ticks[1]).mod["time_ticks"].unique().tolist() == [time_ticks[1]]
+    assert len(series.resample(TICKS_PER_DAY).mod.index) > 0
+
+    # Without a change of the mod list, there are no changes
+    assert list(ModListVersions().get_changes().columns) == list(CHANGE_COLUMNS)
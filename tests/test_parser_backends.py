@@ -0,0 +1,141 @@
+"""Test that every parser backend, in every mode, extracts identical save data"""
+
+import logging
+import pathlib
+
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.parser import ElementTreeBackend, LxmlBackend, get_parser_backend
+
+PARSER_MODES = [
+    (parser_name, mode) for parser_name in ["etree", "lxml"]
+    for mode in ["tree", "stream", "prescan"]
+]
+
+
+def assert_identical_save_data(expected: Save, actual: Save) -> None:
+    """Assert that two Save objects hold identical data points and DataFrames
+
+    Parameters:
+    expected (Save): The Save object loaded with the reference parser backend
+    actual (Save): The Save object loaded with the parser backend under test
+
+    Returns:
+    None
+    """
+    assert actual.data.game_version == expected.data.game_version
+    assert actual.data.game_time_ticks == expected.data.game_time_ticks
+    assert actual.data.diagnostics.summarize() == expected.data.diagnostics.summarize()
+
+    for dataset_name in ["mod", "pawn", "plant", "weather"]:
+        pandas.testing.assert_frame_equal(actual.data[dataset_name], expected.data[dataset_name])
+
+
+@pytest.mark.parametrize("parser_name,mode", PARSER_MODES)
+def test_parser_backend_demo_save(parser_name: str, mode: str,
+                                  test_data_directory: pathlib.Path) -> None:
+    """Test that each parser backend extracts the same data from a demo save as ElementTree
+
+    Parameters:
+    parser_name (str): The name of the parser backend
+    mode (str): How the parser backend reaches the data: tree, stream or prescan
+    test_data_directory (pathlib.Path): The directory containing test input data (fixture)
+
+    Returns:
+    None
+    """
+    save_path = test_data_directory / "demosave 1.rws.gz"
+    expected = Save(save_path, parser="etree")
+    actual = Save(save_path, parser=get_parser_backend(parser_name, mode=mode))
+    logging.debug("Parse span of the %s backend = %s", parser_name,
+                  actual.data.metrics.summarize()["parse"])
+
+    assert_identical_save_data(expected, actual)
+
+
+def test_parser_backend_synthetic_save(tmp_path: pathlib.Path) -> None:
+    """Test that all parser backends agree on a synthetic save with several maps and thing classes
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    scale = {**synthetic.SCALE_PRESETS["tiny"], "map_count": 3, "plant_count": 150}
+    save_path = tmp_path / "synthetic 1.rws"
+    synthetic.write_save(save_path, synthetic.SyntheticColony(scale=scale).get_save_xml())
+    expected = Save(save_path, parser="etree")
+
+    for parser_name, mode in PARSER_MODES:
+        actual = Save(save_path, parser=get_parser_backend(parser_name, mode=mode))
+        assert_identical_save_data(expected, actual)
+
+    # Opening the root parses the whole tree again, whatever the mode of the backend
+    save = Save(save_path, parser=get_parser_backend("lxml", mode="prescan"))
+
+    with save.open_root() as root:
+        assert root.find("./meta/gameVersion").text == save.data.game_version
+
+    assert save.data.root is None
+
+    # A series passes its parser backend on to the worker processes
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}",
+                        parser=get_parser_backend("etree", mode="stream"))
+    assert series.save_options["parser"].mode == "stream"
+    assert len(series.data.plant.index) == len(expected.data.plant.index)
+
+
+def test_get_parser_backend() -> None:
+    """Test selecting a parser backend by name, preferring lxml when it is installed
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    assert isinstance(get_parser_backend(), LxmlBackend)
+    assert get_parser_backend("etree").name == "etree"
+    assert get_parser_backend("lxml").mode == "tree"
+
+    backend = ElementTreeBackend(mode="stream")
+    assert get_parser_backend(backend) is backend
+
+
+@pytest.mark.parametrize("parser_name", ["etree", "lxml"])
+def test_iter_targets(parser_name: str) -> None:
+    """Test that streaming yields complete targets, keeping elements nested inside them
+
+    Parameters:
+    parser_name (str): The name of the parser backend
+
+    Returns:
+    None
+    """
+    save_bytes = (
+        b"<savegame><tales><li Class='Tale'><date>1</date></li>"
+        b"<li Class='Tale_SinglePawn'><date>2</date><li>nested</li><!-- comment --></li>"
+        b"</tales><things><thing Class='Plant'><id>Plant1</id></thing>"
+        b"<thing Class='Building'><id>Wall1</id></thing></things></savegame>"
+    )
+    targets = [("li", "Tale_SinglePawn"), ("thing", "Plant"), ("thing", "Filth")]
+    backend = get_parser_backend(parser_name, mode="stream")
+    yielded = [
+        (element.tag, element.get("Class"), [child.text for child in element
+                                             if isinstance(child.tag, str)])
+        for element in backend.iter_targets(save_bytes, targets)
+    ]
+
+    assert yielded == [
+        ("li", "Tale_SinglePawn", ["2", "nested"]),
+        ("thing", "Plant", ["Plant1"]),
+    ]
+
+    # A target without a Class accepts any element with its tag
+    all_tales = backend.iter_targets(save_bytes, [("li", None), ("li", "Tale")])
+    assert [element.findtext("date") for element in all_tales] == ["1", "2"]
@@ -0,0 +1,131 @@
+"""Test splitting a save into partitions by section and map, extracted by concurrent workers"""
+
+import os
+import pathlib
+
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.parser import get_parser_backend
+from save.partition import find_child_ranges, get_partitions, split_ranges
+
+SAVE_BYTES = (
+    b"<savegame><meta><gameVersion>1.4</gameVersion></meta><game>"
+    b"<tickManager><ticksGame>120000</ticksGame></tickManager>"
+    b"<taleManager><tales><li Class=\"Tale_SinglePawn\"><date>2</date></li></tales></taleManager>"
+    b"<maps><li><weatherManager><curWeather>Fog</curWeather></weatherManager><things>"
+    b"<thing Class=\"Plant\"><id>Plant1</id></thing>"
+    b"<thing Class=\"MinifiedThing\"><thing>Plant1</thing><list><li /></list></thing>"
+    b"<thing Class=\"Plant\"><id>Plant2</id></thing>"
+    b"</things></li><li><weatherManager><curWeather>Rain</curWeather></weatherManager>"
+    b"<things IsNull=\"True\" /></li><li><weatherManager /></li></maps></game></savegame>"
+)
+
+
+def test_find_child_ranges() -> None:
+    """Test finding the outermost elements with a tag, including empty elements
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    maps_start = SAVE_BYTES.index(b"<maps>")
+    map_ranges = find_child_ranges(SAVE_BYTES, (maps_start, len(SAVE_BYTES)), b"li")
+    thing_ranges = find_child_ranges(SAVE_BYTES, (0, len(SAVE_BYTES)), b"thing")
+
+    # The nested li and thing elements are part of the outermost ones
+    assert [SAVE_BYTES[slice(*map_range)][-29:] for map_range in map_ranges] == [
+        b"id>Plant2</id></thing></things></li>"[-29:],
+        b"<things IsNull=\"True\" /></li>",
+        b"<li><weatherManager /></li>",
+    ]
+    assert len(thing_ranges) == 3
+    assert split_ranges(thing_ranges, 2) == [(thing_ranges[0][0], thing_ranges[1][1]),
+                                             thing_ranges[2]]
+    assert split_ranges([], 2) == []
+
+
+def test_get_partitions() -> None:
+    """Test that the sections, maps and chunks of things are partitioned with their datasets
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    partitions = get_partitions(SAVE_BYTES, ["pawn", "plant", "weather"], 6)
+    root = get_parser_backend("etree").parse(partitions[1][1])
+
+    # The things of each map are split in chunks of about the same size
+    assert [dataset_names for dataset_names, _ in partitions] == [
+        ["pawn"], ["plant", "weather"], ["plant"], ["plant", "weather"], ["plant", "weather"]]
+    assert [element.tag for element in root] == ["meta", "tickManager", "maps"]
+    assert len(root.findall(".//thing[@Class='Plant']")) == 1
+
+    # Without plants, the things are left out of the maps, and without maps nothing is split
+    assert b"Plant1" not in get_partitions(SAVE_BYTES, ["weather"], 4)[1][1]
+    assert len(get_partitions(SAVE_BYTES, ["mod"], 4)) == 1
+    assert get_partitions(b"<savegame />", ["plant"], 4) == [(["plant"], b"<savegame />")]
+
+
+@pytest.mark.parametrize("mode", ["tree", "stream", "prescan"])
+def test_partitioned_save(mode: str, tmp_path: pathlib.Path) -> None:
+    """Test that extracting the partitions of a save with several maps matches the whole save
+
+    Parameters:
+    mode (str): The mode of the parser backend
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_path = synthetic.write_series(tmp_path, 1, scale={
+        **synthetic.SCALE_PRESETS["tiny"], "map_count": 3}, file_name_format="synthetic {}.rws")[0]
+    parser = get_parser_backend(mode=mode)
+    expected = Save(save_path, parser=parser)
+    actual = Save(save_path, parser=parser, workers=4)
+
+    assert actual.data.game_time_ticks == expected.data.game_time_ticks
+    assert actual.data.weather["weather_map_id"].tolist() == ["0", "1", "2"]
+    assert sorted(actual.data.plant["plant_map_id"].unique()) == ["0", "1", "2"]
+
+    for dataset_name in ["mod", "pawn", "plant", "weather"]:
+        pandas.testing.assert_frame_equal(actual.data[dataset_name], expected.data[dataset_name])
+
+    # Each worker extracts the datasets of its partition like a whole save
+    partition = get_partitions(save_path.read_bytes(), ["plant"], 6)[-1]
+    result = expected.extract_partition(partition)
+
+    assert list(result["dataset_columns"]) == ["plant"]
+    assert result["metrics"].summarize()["extract_plant"]["count"] == 1
+
+
+@pytest.mark.parametrize("save_count", [1, 2])
+def test_partitioned_series(save_count: int, monkeypatch: pytest.MonkeyPatch,
+                            tmp_path: pathlib.Path) -> None:
+    """Test that a series of a single save splits it across the cores, but not several saves
+
+    Parameters:
+    save_count (int): The number of saves of the series
+    monkeypatch (pytest.MonkeyPatch): Patches the number of cores (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_path = synthetic.write_series(tmp_path, save_count, scale=synthetic.SCALE_PRESETS["tiny"],
+                                       file_name_format="synthetic {}.rws")[0]
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant", "weather"])
+    spans = series.metrics.children["synthetic 1.rws"].summarize()
+
+    assert ("partition" in spans) == (save_count == 1)
+    pandas.testing.assert_frame_equal(
+        series.data.plant.iloc[series.tick_index.get_row_slice("plant", 0, 1)].astype(object),
+        Save(save_path).data.plant.astype(object))
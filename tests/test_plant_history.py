@@ -0,0 +1,171 @@
+"""Test storing the plants of a series as the changes between consecutive snapshots"""
+
+import pathlib
+
+import numpy
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.plant_history import PlantHistory
+
+PLANT_DATAFRAME = pandas.DataFrame({
+    "plant_id": ["Plant_Grass1", "Plant_Oak2", "Plant_Grass1", "Plant_Oak2", "Plant_Moss3",
+                 "Plant_Oak2", "Plant_Moss3"],
+    "plant_definition": ["Plant_Grass", "Plant_TreeOak", "Plant_Grass", "Plant_TreeOak",
+                         "Plant_Moss", "Plant_TreeOak", "Plant_Moss"],
+    "plant_map_id": ["0"] * 7,
+    "plant_position": ["(1, 0, 1)", "(2, 0, 2)", "(1, 0, 1)", "(2, 0, 2)", "(3, 0, 3)",
+                       "(4, 0, 4)", "(3, 0, 3)"],
+    "plant_growth": ["0.15", "1", "0.3", "1", None, "1", "0.5"],
+    "plant_age": [None, "500000", "3000", "504000", "0", "509000", "5000"],
+    "time_ticks": [1000, 1000, 5000, 5000, 5000, 10000, 10000],
+})
+
+
+def assert_snapshot_equal(history: PlantHistory, dataframe: pandas.DataFrame,
+                          time_ticks: int) -> None:
+    """Assert that a reconstructed snapshot holds the same plants as the original DataFrame
+
+    Parameters:
+    history (PlantHistory): The history of the plants
+    dataframe (pandas.DataFrame): The original plant rows of every snapshot
+    time_ticks (int): The in-game time of the snapshot
+
+    Returns:
+    None
+    """
+    expected = dataframe[dataframe["time_ticks"] == time_ticks]\
+        .sort_values("plant_id").reset_index(drop=True)
+    actual = history.get_snapshot(time_ticks).sort_values("plant_id").reset_index(drop=True)
+
+    for column_name in ["plant_id", "plant_definition", "plant_map_id", "plant_position"]:
+        assert actual[column_name].tolist() == expected[column_name].tolist()
+
+    assert numpy.array_equal(actual["plant_growth"], pandas.to_numeric(expected["plant_growth"]),
+                             equal_nan=True)
+    assert actual["plant_age"].equals(pandas.to_numeric(expected["plant_age"]).astype("Int64"))
+
+
+def test_plant_history() -> None:
+    """Test reconstructing each snapshot exactly and counting births and deaths
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    history = PlantHistory.from_dataframe(PLANT_DATAFRAME, age_tolerance=0)
+
+    # Snapshots are reconstructed alike from the changes alone, or from checkpoints of the state
+    for checkpointed_history in [history, PlantHistory.from_dataframe(
+            PLANT_DATAFRAME, age_tolerance=0, checkpoint_interval=2)]:
+        for time_ticks in [1000, 5000, 10000]:
+            assert_snapshot_equal(checkpointed_history, PLANT_DATAFRAME, time_ticks)
+
+    assert not history.checkpoints
+
+    # The oak kept its growth and aged as predicted, so nothing is stored for it
+    assert history.snapshots[1]["age_codes"].tolist() == [0, 2]
+    assert history.snapshots[1]["growth_codes"].tolist() == [0, 2]
+
+    # The oak that moved in the last snapshot is stored as a new plant replacing the former one
+    assert len(history.plants.index) == 4
+    assert history.get_births_and_deaths().to_dict("index") == {
+        1000: {"births": 2, "deaths": 0},
+        5000: {"births": 1, "deaths": 0},
+        10000: {"births": 1, "deaths": 2},
+    }
+    assert history.get_births_and_deaths(by_definition=True).loc[10000].to_dict("index") == {
+        "Plant_Grass": {"births": 0, "deaths": 1},
+        "Plant_TreeOak": {"births": 1, "deaths": 1},
+    }
+
+    with pytest.raises(AssertionError):
+        history.get_snapshot(2000)
+
+
+def test_plant_history_churn() -> None:
+    """Test that the changes stored for each snapshot grow with the churn, not with the population
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    stored_sizes = {}
+
+    for population in [100, 1000]:
+        history = PlantHistory(checkpoint_interval=100)
+
+        # Each snapshot, a plant appears and another disappears, while the others only age
+        for snapshot_index in range(10):
+            plant_numbers = numpy.arange(snapshot_index, snapshot_index + population)
+            history.append(snapshot_index * 2000, pandas.DataFrame({
+                "plant_id": [f"Plant_Grass{number}" for number in plant_numbers],
+                "plant_definition": "Plant_Grass",
+                "plant_map_id": "0",
+                "plant_position": [f"({number}, 0, 0)" for number in plant_numbers],
+                "plant_growth": "1",
+                "plant_age": (snapshot_index * 2000 + 5000 - plant_numbers).astype(str),
+            }))
+
+        stored_sizes[population] = [
+            sum(array.nbytes for array in snapshot.values() if isinstance(array, numpy.ndarray))
+            for snapshot in history.snapshots[1:]
+        ]
+
+    assert stored_sizes[100] == stored_sizes[1000]
+    assert set(stored_sizes[100]) == {28}
+
+
+def test_plant_history_series(tmp_path: pathlib.Path) -> None:
+    """Test that a series keeps the history of its plants as it ingests saves, in far less memory
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 4, scale={"plant_count": 500},
+                                        file_name_format="synthetic {}.rws")
+    save_paths[3].rename(tmp_path / "staged.xml")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant"])
+
+    # The history is only built when it is first asked for
+    assert not series.plant_history.snapshots
+
+    history = series.get_plant_history()
+
+    # Ingesting a later save only adds its snapshot to the history of the series
+    (tmp_path / "staged.xml").rename(save_paths[3])
+    series.ingest([save_paths[3]])
+    plant_dataframe = series.data.plant
+
+    assert series.get_plant_history() is history
+    assert history.time_ticks == series.tick_index.time_ticks.tolist()
+
+    # The static attributes are stored once per plant and ages only for the plants that appeared
+    assert len(history.plants.index) == plant_dataframe["plant_id"].nunique()
+    assert [len(snapshot["age_codes"]) for snapshot in history.snapshots] == \
+        [len(snapshot["appeared"]) for snapshot in history.snapshots]
+    assert history.nbytes < plant_dataframe.memory_usage(deep=True).sum() / 10
+
+    # Each reconstructed age is within the tolerance of one long tick interval
+    for time_ticks in history.time_ticks:
+        expected = plant_dataframe[plant_dataframe["time_ticks"] == time_ticks]
+        actual = history.get_snapshot(time_ticks).set_index("plant_id")["plant_age"]
+        error = actual - pandas.to_numeric(expected.set_index("plant_id")["plant_age"])
+
+        assert len(actual.index) == len(expected.index)
+        assert error.abs().max() <= 2000
+
+    # Rewriting an earlier save builds the history again
+    series.ingest([save_paths[0]])
+
+    assert series.get_plant_history() is not history
+    assert series.plant_history.time_ticks == history.time_ticks
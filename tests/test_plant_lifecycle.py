@@ -0,0 +1,130 @@
+"""Test the spawns, removals, growth rates and survival of plants across a series"""
+
+import pathlib
+
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.lifecycle import PlantLifecycle
+
+PLANT_DATAFRAME = pandas.DataFrame({
+    "plant_id": ["Plant_Grass1", "Plant_Oak2", "Plant_Oak4", "Plant_Grass1", "Plant_Grass3",
+                 "Plant_Oak4", "Plant_Grass1"],
+    "plant_definition": ["Plant_Grass", "Plant_TreeOak", "Plant_TreeOak", "Plant_Grass",
+                         "Plant_Grass", "Plant_TreeOak", "Plant_Grass"],
+    "plant_growth": ["0.1", "1", "0.5", "0.3", "0.15", "0.05", "0.7"],
+    "time_ticks": [0, 0, 0, 100, 100, 300, 300],
+})
+
+
+def test_spawns_and_removals() -> None:
+    """Test counting the plants spawned and removed since the previous snapshot
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    counts = PlantLifecycle(PLANT_DATAFRAME).get_spawns_and_removals()
+
+    # The oak missing from the second snapshot is removed, then spawned again as a new life
+    assert counts.to_dict("index") == {
+        (100, "Plant_Grass"): {"spawned": 1, "removed": 0},
+        (100, "Plant_TreeOak"): {"spawned": 0, "removed": 2},
+        (300, "Plant_Grass"): {"spawned": 0, "removed": 1},
+        (300, "Plant_TreeOak"): {"spawned": 1, "removed": 0},
+    }
+
+
+def test_growth_rates() -> None:
+    """Test the growth per tick of the plants present in consecutive snapshots
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    lifecycle = PlantLifecycle(PLANT_DATAFRAME)
+    growth_rates = lifecycle.get_growth_rates()
+
+    assert growth_rates["time_ticks"].tolist() == [100, 300]
+    assert growth_rates["growth_rate"].tolist() == pytest.approx([0.002, 0.002])
+    assert lifecycle.get_growth_rate_distribution().loc["Plant_Grass", "count"] == 2
+
+
+@pytest.mark.parametrize("by_definition,expected_survival", [
+    (False, [1.0, 0.5, 0.25, 0.25]),
+    (True, [0.5, 0.5, 1.0, 0.0]),
+])
+def test_survival_curve(by_definition: bool, expected_survival: list) -> None:
+    """Test the Kaplan-Meier estimate of survival, with lives still going on censored
+
+    Parameters:
+    by_definition (bool): Whether the survival of each definition is estimated separately
+    expected_survival (list): The expected survival after each distinct duration
+
+    Returns:
+    None
+    """
+    lifecycle = PlantLifecycle(PLANT_DATAFRAME)
+    lives = lifecycle.get_lives()
+
+    assert sorted(zip(lives["duration_ticks"], lives["observed"])) == [
+        (0, False), (100, True), (100, True), (200, True), (300, False)]
+    assert lifecycle.get_survival_curve(by_definition)["survival"].tolist() == expected_survival
+
+
+def test_plant_lifecycle_series(test_data_directory: pathlib.Path,
+                                test_save_file_regex: str) -> None:
+    """Test that the spawns and removals of a series match joining its snapshots with pandas
+
+    Parameters:
+    test_data_directory (pathlib.Path): The directory containing test input data (fixture)
+    test_save_file_regex (str): The regex pattern matching the test input data files (fixture)
+
+    Returns:
+    None
+    """
+    series = SaveSeries(test_data_directory, test_save_file_regex, datasets=["plant"])
+    counts = series.get_plant_lifecycle().get_spawns_and_removals().groupby("time_ticks").sum()
+    snapshots = dict(tuple(series.data.plant.groupby("time_ticks")))
+    time_ticks = sorted(snapshots)
+
+    for previous_ticks, ticks in zip(time_ticks, time_ticks[1:]):
+        joined = snapshots[previous_ticks].merge(snapshots[ticks], on="plant_id", how="outer",
+                                                 indicator=True)
+
+        assert counts.loc[ticks, "spawned"] == (joined["_merge"] == "right_only").sum()
+        assert counts.loc[ticks, "removed"] == (joined["_merge"] == "left_only").sum()
+
+
+def test_plant_lifecycle_equal_ticks(tmp_path: pathlib.Path) -> None:
+    """Test that a save of the same time as the one before it is a snapshot of its own
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale={"plant_count": 200},
+                                        file_name_format="synthetic {}.rws")
+    expected = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant"])\
+        .get_plant_lifecycle()
+
+    # A save holding the same plants as the last one, at the same time, differs in its weather
+    document = save_paths[1].read_text(encoding="utf_8")
+    (tmp_path / "synthetic 3.rws").write_text(
+        document.replace("<curWeatherAge>", "<curWeatherAge>1", 1), encoding="utf_8")
+    lifecycle = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant"])\
+        .get_plant_lifecycle()
+
+    assert len(lifecycle.time_ticks) == 3
+    pandas.testing.assert_frame_equal(lifecycle.get_spawns_and_removals(),
+                                      expected.get_spawns_and_removals())
+    pandas.testing.assert_frame_equal(lifecycle.get_growth_rates(), expected.get_growth_rates())
+    assert len(lifecycle.get_lives().index) == len(expected.get_lives().index)
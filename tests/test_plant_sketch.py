@@ -0,0 +1,132 @@
+"""Test the approximate mode, which keeps counts and a sample of the plants instead of every row"""
+
+import collections
+import pathlib
+
+import pandas
+import pytest
+
+import save.save_file
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.datasets import APPROXIMATE_DATASET_NAMES, transform_plant
+from save.parser import get_parser_backend
+from save.sketch import PlantSketch, get_quantile_error
+from view import summary_report
+
+
+def get_plant_columns(row_count: int) -> dict:
+    """Return the columns of made up plant rows, with three definitions and evenly spread growth
+
+    Parameters:
+    row_count (int): The number of rows
+
+    Returns:
+    dict: The list of values of each column of plant data, keyed by column name
+    """
+    return {
+        "plant_id": [f"Plant{row}" for row in range(row_count)],
+        "plant_definition": [f"Plant_{row % 3}" for row in range(row_count)],
+        "plant_map_id": ["0"] * row_count,
+        "plant_position": [f"({row}, 0, 0)" for row in range(row_count)],
+        "plant_growth": [str(row / row_count) for row in range(row_count)],
+        "plant_age": [str(row) for row in range(row_count)],
+    }
+
+
+def test_plant_sketch() -> None:
+    """Test that the counts are exact, and every row is equally likely to be sampled
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    columns = get_plant_columns(100)
+    sketch = PlantSketch(sample_size=10)
+
+    # Rows added in chunks are counted as if added at once
+    for start in range(0, 100, 7):
+        sketch.add_rows({name: values[start:start + 7] for name, values in columns.items()})
+
+    dataset_columns = sketch.get_dataset_columns()
+    exact = pandas.DataFrame(columns)
+    transform_plant(exact)
+    growth_counts = exact["plant_growth_bin"].value_counts().sort_index()
+
+    assert sketch.row_count == 100
+    assert dict(zip(dataset_columns["plant_species"]["plant_definition"],
+                    map(int, dataset_columns["plant_species"]["plant_count"]))) == \
+        exact["plant_definition"].value_counts().to_dict()
+    assert list(map(int, dataset_columns["plant_growth"]["plant_count"])) == \
+        growth_counts.tolist()
+    assert len(set(dataset_columns["plant_sample"]["plant_id"])) == 10
+    assert set(dataset_columns["plant_sample"]["plant_id"]) <= set(columns["plant_id"])
+
+    # Each of 100 rows is expected in 200 of 2000 samples of 10 rows
+    sampled = collections.Counter()
+
+    for seed in range(2000):
+        sketch = PlantSketch(sample_size=10, seed=seed)
+        sketch.add_rows(columns)
+        sampled.update(sketch.sample["plant_id"])
+
+    assert 140 < min(sampled.values()) <= max(sampled.values()) < 260
+    assert get_quantile_error(1000, 500) == 0
+    assert get_quantile_error(1000, 10 ** 6) == pytest.approx(0.0429, abs=0.0001)
+
+
+def test_approximate_series(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    """Test that the plant counts of the approximate mode match the rows of the exact mode
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Shrinks the chunks of streamed plant rows (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    monkeypatch.setattr(save.save_file, "CHUNK_ROWS", 50)
+    exact = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant"])
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=APPROXIMATE_DATASET_NAMES,
+                        parser=get_parser_backend("etree", mode="stream"))
+
+    assert "plant" not in series.data
+
+    for time_ticks, plant_df in exact.data.plant.groupby("time_ticks"):
+        snapshot = series.as_of(time_ticks)
+
+        assert snapshot.plant_species.set_index("plant_definition")["plant_count"].to_dict() == \
+            plant_df["plant_definition"].value_counts().to_dict()
+        assert snapshot.plant_growth["plant_count"].tolist() == \
+            plant_df["plant_growth_bin"].value_counts().sort_index().tolist()
+
+        # The sample holds every row of a save with fewer plants than the sample size
+        assert sorted(snapshot.plant_sample["plant_id"]) == sorted(plant_df["plant_id"])
+
+    # A save extracted in partitions is summarized once its plant rows are merged, while the 200
+    # plant rows of a streamed save are summarized in chunks of 50, leaving none at the end
+    partitioned = Save(save_paths[0], datasets=["plant_species"], workers=2)
+    streamed = Save(save_paths[0], datasets=["plant_species"],
+                    parser=get_parser_backend("etree", mode="stream"))
+
+    assert partitioned.data.keys() == ["plant_species"]
+    assert streamed.data.metrics.summarize()["extract_plant"]["rows"] == 0
+    pandas.testing.assert_frame_equal(partitioned.data.plant_species,
+                                      streamed.data.plant_species)
+
+    # The report shows the counts and the sample, without the spawns and removals of plants
+    report = summary_report.render_summary_report(series)
+
+    assert "Approximate mode" in report
+    assert "Plant population by species over time" in report
+    assert "Plant spawns and removals" not in report
+    assert not summary_report.CHARTS["plant_lifecycle"](series).data
+    summary_report.generate_summary_report(tmp_path, r"synthetic\s\d{1,10}",
+                                           tmp_path / "summary_report.html", approximate=True)
+
+    assert "Approximate mode" in (tmp_path / "summary_report.html").read_text(encoding="utf_8")
@@ -0,0 +1,107 @@
+"""Test the byte-level pre-scan that keeps only the sections of a save the datasets need"""
+
+import logging
+import pathlib
+
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.parser import get_parser_backend
+from save.prescan import find_section_ranges, get_reduced_document
+
+SAVE_BYTES = (
+    b"<savegame><meta><gameVersion>1.3</gameVersion></meta><game>"
+    b"<tickManager><ticksGame>60000</ticksGame></tickManager>"
+    b"<taleManager><tales><li Class=\"Tale_SinglePawn\"><date>1</date></li></tales></taleManager>"
+    b"<maps><li><weatherManager><curWeather>Clear</curWeather></weatherManager><things>"
+    b"<thing Class=\"Plant\"><id>Plant1</id></thing>"
+    b"<thing Class=\"Building\"><id>Wall1</id></thing>"
+    b"<thing Class=\"Plant\"><id>Plant2</id></thing><thing Class=\"Plant\"><id>Plant3</id>"
+    b"</things></li></maps></game></savegame>"
+)
+
+
+def test_find_section_ranges() -> None:
+    """Test finding the first or every occurrence of a section, skipping incomplete ones
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    plant_ranges = find_section_ranges(SAVE_BYTES, (b"<thing Class=\"Plant\">", b"</thing>", False))
+    plants = [SAVE_BYTES[start:end] for start, end in plant_ranges]
+
+    # The third plant's end tag is missing, so only the two complete plants are found
+    assert plants == [
+        b"<thing Class=\"Plant\"><id>Plant1</id></thing>",
+        b"<thing Class=\"Plant\"><id>Plant2</id></thing>",
+    ]
+    assert len(find_section_ranges(SAVE_BYTES, (b"<thing", b"</thing>", True))) == 1
+    assert not find_section_ranges(SAVE_BYTES, (b"<world>", b"</world>", True))
+
+
+@pytest.mark.parametrize("dataset_names,expected_tags", [
+    (["pawn"], ["meta", "tickManager", "tales"]),
+    (["weather", "plant"], ["meta", "tickManager", "weatherManager", "thing", "thing"]),
+])
+def test_get_reduced_document(dataset_names: list, expected_tags: list) -> None:
+    """Test that the reduced document holds the sections of the datasets in document order
+
+    Parameters:
+    dataset_names (list): The names of the datasets to extract
+    expected_tags (list): The tags of the sections expected in the reduced document
+
+    Returns:
+    None
+    """
+    root = get_parser_backend("etree").parse(get_reduced_document(SAVE_BYTES, dataset_names))
+
+    assert [element.tag for element in root] == expected_tags
+
+
+@pytest.mark.parametrize("dataset_name", ["pawn", "plant"])
+def test_prescan_dataset_selection(dataset_name: str, test_data_directory: pathlib.Path) -> None:
+    """Test that loading a single dataset with the pre-scan matches a full tree parse
+
+    Parameters:
+    dataset_name (str): The name of the only dataset to extract
+    test_data_directory (pathlib.Path): The directory containing test input data (fixture)
+
+    Returns:
+    None
+    """
+    save_path = test_data_directory / "demosave 1.rws.gz"
+    expected = Save(save_path, parser="etree")
+    actual = Save(save_path, parser=get_parser_backend(mode="prescan"), datasets=[dataset_name])
+    spans = {span["name"]: span for span in actual.data.metrics.spans}
+    logging.debug("Pre-scan of %s data = %s", dataset_name, spans["prescan"])
+
+    assert spans["prescan"]["bytes"] < spans["decompress"]["bytes"] / 2
+    assert actual.data.game_time_ticks == expected.data.game_time_ticks
+    pandas.testing.assert_frame_equal(actual.data[dataset_name], expected.data[dataset_name])
+
+    with pytest.raises(KeyError):
+        _ = actual.data["weather"]
+
+
+def test_prescan_series_dataset_selection(tmp_path: pathlib.Path) -> None:
+    """Test aggregating only the selected datasets of a series loaded with the pre-scan
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                           file_name_format="synthetic {}.rws")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", parser=get_parser_backend(mode="prescan"),
+                        datasets=["plant", "weather"])
+
+    assert sorted(series.data) == ["plant", "weather"]
+    assert series.data.plant["time_ticks"].nunique() == 2
@@ -0,0 +1,264 @@
+"""Test serving the summary report and charts of series of saves from a local HTTP server"""
+
+import asyncio
+import json
+import pathlib
+import time
+
+import pytest
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.datasets import APPROXIMATE_DATASET_NAMES
+from view import summary_report
+from view.server import ReportServer, main
+
+
+async def fetch(address: tuple, request_line: str, headers: dict = None) -> tuple:
+    """Send a request to the server and read the whole response
+
+    Parameters:
+    address (tuple): The host and port of the server
+    request_line (str): The method and target of the request, e.g. GET /
+    headers (dict): The headers of the request
+
+    Returns:
+    tuple: The status code, the headers keyed by their lower case name, and the body
+    """
+    reader, writer = await asyncio.open_connection(*address)
+    header_lines = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    writer.write(f"{request_line} HTTP/1.1\r\n{header_lines}\r\n".encode("latin-1"))
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = dict(line.lower().split(": ", 1) for line in header_lines)
+
+    return int(status_line.split()[1]), response_headers, body
+
+
+def get_server(save_dir_path: pathlib.Path) -> ReportServer:
+    """Return a server of the synthetic series in a directory, on any free port
+
+    Parameters:
+    save_dir_path (pathlib.Path): The directory of the saves
+
+    Returns:
+    ReportServer: The server, not yet started
+    """
+    return ReportServer(
+        series_options={"colony": {"save_dir_path": save_dir_path,
+                                   "save_file_regex_pattern": r"synthetic\s\d{1,10}"}},
+        port=0,
+        watch_options={"backend": "polling", "settle_seconds": 0},
+    )
+
+
+async def wait_for_generation(server: ReportServer, generation: int, timeout: float = 10.0) -> int:
+    """Wait until the series has ingested saves the given number of times, or the timeout passes
+
+    Parameters:
+    server (ReportServer): The running server
+    generation (int): The number of times the series should have ingested saves
+    timeout (float): The maximum number of seconds to wait
+
+    Returns:
+    int: The number of times the series has ingested saves
+    """
+    deadline = time.monotonic() + timeout
+
+    while server.states["colony"]["generation"] < generation and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+
+    return server.states["colony"]["generation"]
+
+
+def test_report_server(tmp_path: pathlib.Path) -> None:
+    """Test that fragments are rendered once for many viewers, and again once a save is written
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    staged_path = save_paths[2].rename(tmp_path / "staged.rws")
+    server = get_server(tmp_path)
+
+    async def scenario() -> None:
+        """Make the requests of the test while the server runs
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        address = await server.start()
+        status, _, body = await fetch(address, "GET /")
+
+        assert status == 200
+        assert json.loads(body)["colony"]["saves"] == 2
+
+        # Concurrent viewers share one render of the report
+        responses = await asyncio.gather(*[
+            fetch(address, "GET /series/colony/report") for _ in range(4)])
+
+        assert {status for status, _, _ in responses} == {200}
+        assert len({headers["etag"] for _, headers, _ in responses}) == 1
+        assert b"RimWorld Save Game Summary" in responses[0][2]
+        assert server.cache.render_count == 1
+
+        # A viewer holding the report is told it has not changed, without another render
+        etag = responses[0][1]["etag"]
+        status, _, body = await fetch(address, "GET /series/colony/report",
+                                      {"If-None-Match": etag})
+
+        assert (status, body) == (304, b"")
+
+        status, headers, body = await fetch(address, "HEAD /series/colony/report")
+
+        assert (status, body) == (200, b"")
+        assert int(headers["content-length"]) == len(responses[0][2])
+
+        status, headers, body = await fetch(address, "GET /series/colony/charts/plant_population")
+
+        assert status == 200
+        assert headers["content-type"] == "application/json"
+        assert json.loads(body)["layout"]["title"]["text"] == "Plant population over time"
+        assert server.cache.render_count == 2
+
+        for request_line, expected_status in [("GET /series/other/report", 404),
+                                              ("GET /series/colony/charts/other", 404),
+                                              ("GET /other", 404),
+                                              ("POST /", 405),
+                                              ("GET", 400)]:
+            assert (await fetch(address, request_line))[0] == expected_status
+
+        # A new save is ingested in the background, and the report is rendered again
+        staged_path.rename(save_paths[2])
+
+        assert await wait_for_generation(server, 1) == 1
+
+        status, headers, _ = await fetch(address, "GET /series/colony/report",
+                                         {"If-None-Match": etag})
+
+        assert status == 200
+        assert headers["etag"] != etag
+        assert server.cache.render_count == 3
+        await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_report_server_failure(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    """Test that a fragment that fails to render is reported, and not cached, as is a failed save
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Replaces a chart and ingesting saves with failures (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    staged_path = save_paths[2].rename(tmp_path / "staged.rws")
+    server = get_server(tmp_path)
+
+    def get_failing_figure(series: object) -> None:
+        """Fail to build a chart
+
+        Parameters:
+        series (SaveSeries): The series of saves
+
+        Returns:
+        None
+        """
+        raise ValueError(f"No chart of {len(series.dictionary)} saves")
+
+    def ingest_failing(series: SaveSeries, save_paths: list) -> None:
+        """Fail to ingest saves
+
+        Parameters:
+        series (SaveSeries): The series of saves
+        save_paths (list): The paths of the saves
+
+        Returns:
+        None
+        """
+        raise ValueError(f"No saves ingested into {len(series.dictionary)} of {save_paths}")
+
+    monkeypatch.setitem(summary_report.CHARTS, "plant_population", get_failing_figure)
+    monkeypatch.setattr(SaveSeries, "ingest", ingest_failing)
+
+    async def scenario() -> None:
+        """Request the failing chart while the server serves until it is stopped
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        serving = asyncio.ensure_future(server.serve_forever())
+
+        while server.server is None:
+            await asyncio.sleep(0.1)
+
+        address = server.server.sockets[0].getsockname()[:2]
+
+        for _ in range(2):
+            assert (await fetch(address, "GET /series/colony/charts/plant_population"))[0] == 500
+
+        assert server.cache.render_count == 2
+        assert not server.cache.fragments
+
+        # A save that fails to ingest is listed in the errors, and the series keeps being watched
+        staged_path.rename(save_paths[2])
+
+        assert await wait_for_generation(server, 1) == 1
+
+        index = json.loads((await fetch(address, "GET /"))[2])["colony"]
+
+        assert (index["saves"], index["errors"]) == (2, ["synthetic 3.rws"])
+        assert not server.states["colony"]["watch_task"].done()
+        await server.stop()
+        await serving
+
+    asyncio.run(scenario())
+
+
+def test_report_server_main(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the command line configures a server per the arguments and serves until stopped
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Replaces serving with recording the server (fixture)
+
+    Returns:
+    None
+    """
+    servers = []
+
+    async def serve_until_interrupted(server: ReportServer) -> None:
+        """Record the server and stop as if interrupted
+
+        Parameters:
+        server (ReportServer): The server to serve
+
+        Returns:
+        None
+        """
+        servers.append(server)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(ReportServer, "serve_forever", serve_until_interrupted)
+
+    assert main(["--series", "colony", "saves", "colony.*", "--port", "0", "--approximate"]) == 0
+    assert servers[0].series_options == {"colony": {
+        "save_dir_path": "saves", "save_file_regex_pattern": "colony.*",
+        "datasets": APPROXIMATE_DATASET_NAMES}}
+    assert servers[0].address == ("127.0.0.1", 0)
+    assert servers[0].watch_options == {"backend": "auto"}
@@ -0,0 +1,111 @@
+"""Test comparing the datasets of two snapshots, of two saves or of a series"""
+
+import pathlib
+
+import pandas
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.datasets import COLONY_DATASET_NAMES, DATASET_NAMES
+from save.diff import diff_dataset, diff_snapshots
+
+
+def get_change_set(changes: pandas.core.frame.DataFrame) -> set:
+    """Return the changed values as a set of tuples, to compare changes regardless of their order
+
+    Parameters:
+    changes (pandas.core.frame.DataFrame): The changed values of a dataset
+
+    Returns:
+    set: The key, column name, and value before and after of each change
+    """
+    return set(changes.astype(str).itertuples(index=False, name=None))
+
+
+def test_save_diff(tmp_path: pathlib.Path) -> None:
+    """Test that saves and the snapshots of a series compare alike, as a merge on the IDs would
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    datasets = [*DATASET_NAMES, *COLONY_DATASET_NAMES]
+    before, after = (Save(save_path, datasets=datasets) for save_path in save_paths)
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=datasets)
+    changes = before.diff(after)
+    series_changes = series.diff(*series.tick_index.time_ticks)
+
+    assert list(changes) == list(series_changes) == datasets
+
+    for dataset_name in datasets:
+        assert get_change_set(changes[dataset_name].changed) == \
+            get_change_set(series_changes[dataset_name].changed)
+
+        for kind in ["added", "removed"]:
+            assert changes[dataset_name][kind].index.tolist() == \
+                series_changes[dataset_name][kind].index.tolist()
+
+    # The plants match a merge of the plant rows of both saves on plant_id
+    merged = before.data.plant.merge(after.data.plant, on="plant_id", how="outer", indicator=True)
+    growing = merged[(merged["_merge"] == "both")
+                     & (merged["plant_growth_x"] != merged["plant_growth_y"])]
+
+    assert set(changes.plant.added["plant_id"]) == \
+        set(merged.loc[merged["_merge"] == "right_only", "plant_id"])
+    assert set(changes.plant.removed["plant_id"]) == \
+        set(merged.loc[merged["_merge"] == "left_only", "plant_id"])
+    assert set(changes.plant.changed.loc[changes.plant.changed["column_name"] == "plant_growth",
+                                         "plant_id"]) == set(growing["plant_id"])
+    assert changes.mod.changed.empty
+    assert set(changes.weather.changed["column_name"]) <= {
+        "weather_current", "weather_current_age"}
+
+
+def test_diff_dataset() -> None:
+    """Test matching rows with repeated, missing and differently coded keys, and missing values
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    before = pandas.DataFrame({
+        "item_id": pandas.Categorical(["Steel1", "Steel1", "Silver2", None, "Cloth3"]),
+        "item_definition": ["Steel", "Steel", "Silver", "Wood", "Cloth"],
+        "item_map_id": ["0"] * 5,
+        "item_position": ["(1, 0, 1)"] * 5,
+        "item_stack_count": pandas.array([10, 20, 5, 1, 7], dtype="Int64"),
+        "item_hit_points": pandas.array([None, None, 50, 1, None], dtype="Int64"),
+    })
+    after = before.iloc[[1, 2, 3]].assign(
+        item_id=pandas.Categorical(["Steel1", "Silver2", "Meal4"]),
+        item_hit_points=pandas.array([None, 40, None], dtype="Int64"),
+    )
+    changes = diff_dataset("item", before, after)
+
+    # The last row of a repeated key is compared, and a row without a key is left out
+    assert changes.added["item_id"].tolist() == ["Meal4"]
+    assert changes.removed["item_id"].tolist() == ["Cloth3"]
+    assert get_change_set(changes.changed) == {("Silver2", "item_hit_points", "50", "40")}
+
+    # A mod list change, and a weather transition
+    mods = pandas.DataFrame({"mod_id": ["core", "hugslib"], "mod_name": ["Core", "HugsLib"],
+                             "mod_steam_id": [None, "818773962"]})
+    weather = pandas.DataFrame({"weather_map_id": [0], "weather_current": ["Clear"],
+                                "weather_current_age": ["100"], "weather_last": ["Fog"]})
+    snapshot_changes = diff_snapshots(
+        {"mod": mods, "weather": weather, "plant_sample": mods},
+        {"mod": mods.iloc[[0]], "weather": weather.assign(weather_current="Rain",
+                                                          weather_last="Clear")},
+    )
+
+    assert list(snapshot_changes) == ["mod", "weather"]
+    assert snapshot_changes.mod.removed["mod_id"].tolist() == ["hugslib"]
+    assert get_change_set(snapshot_changes.weather.changed) == {
+        ("0", "weather_current", "Clear", "Rain"), ("0", "weather_last", "Fog", "Clear")}
@@ -0,0 +1,84 @@
+"""Test the compact record of a save, which refers to the rows of its series once aggregated"""
+
+import pathlib
+import pickle
+
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+from save.record import SnapshotColumns
+
+
+def test_save_record(tmp_path: pathlib.Path) -> None:
+    """Test that a save keeps its fields in slots, generating its DataFrames on first access
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_path = synthetic.write_series(tmp_path, 1, scale=synthetic.SCALE_PRESETS["tiny"],
+                                       file_name_format="synthetic {}.rws")[0]
+    save = pickle.loads(pickle.dumps(Save(save_path, defer_dataframes=True)))
+
+    assert not hasattr(save, "__dict__")
+    assert not hasattr(save.data, "__dict__")
+    assert save.data.keys() == ["mod", "pawn", "plant", "weather"]
+    assert len(save.data.plant.index) == len(save.data["plant"].index) > 0
+    assert save.data.dataset_columns is None
+
+    with pytest.raises(AttributeError):
+        save.data.animal  # pylint: disable=pointless-statement
+
+    # The XML tree is only kept while the save is open
+    with save.open_root() as root:
+        assert root.find("./meta/gameVersion").text == save.data.game_version
+
+    assert save.data.root is None
+    assert save.data.metrics.summarize()["parse"]["count"] == 2
+
+
+def test_snapshot_record(tmp_path: pathlib.Path) -> None:
+    """Test that the saves of a series are sliced from its DataFrames, also once it grows
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    new_save_path = save_paths[2].rename(tmp_path / "new synthetic 3.rws")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["pawn", "plant"])
+    new_save_path.rename(save_paths[2])
+    series.ingest([save_paths[2]])
+
+    for position, save_path in enumerate(save_paths):
+        save = series.dictionary[save_path.name]["save"]
+        expected = Save(save_path, datasets=["pawn", "plant"])
+
+        # The save holds no columns of its own, only the position of its rows in the series
+        assert isinstance(save.data.dataset_columns, SnapshotColumns)
+        assert not save.data.dataframes
+        assert save.data.keys() == ["pawn", "plant"]
+        assert save.data.dataset_columns.get_row_count("plant") == len(expected.data.plant.index)
+        assert save.data.dataset_columns.row_slices["plant"] == series.tick_index.get_row_slice(
+            "plant", position, position + 1)
+
+        for dataset_name in ["pawn", "plant"]:
+            pandas.testing.assert_frame_equal(save.data[dataset_name],
+                                              expected.data[dataset_name])
+
+        # The DataFrame is built once, until the series aggregates its saves again
+        assert save.data.plant is save.data.plant
+
+    plant_dataframe = series.latest_save.data.plant
+    series.ingest([save_paths[0]])
+
+    assert series.latest_save.data.plant is not plant_dataframe
+    pandas.testing.assert_frame_equal(series.latest_save.data.plant, plant_dataframe)
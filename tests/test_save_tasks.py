@@ -0,0 +1,155 @@
+"""Test loading each save of a series as an isolated task, which may fail without losing the rest"""
+
+import gzip
+import multiprocessing
+import os
+import pathlib
+import pickle
+import time
+
+import pytest
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.tasks import TaskRunner, run_task
+
+
+def run_flaky_task(argument: str) -> str:
+    """Fail in the way given by the argument, or succeed once a marker file exists
+
+    Parameters:
+    argument (str): The kind of failure, or the path of the marker file written by the first try
+
+    Returns:
+    str: The argument in upper case
+    """
+    if argument == "exception":
+        raise ValueError("The task failed")
+
+    if argument == "crash":
+        os._exit(3)
+
+    if argument == "timeout":
+        time.sleep(60)
+
+    if argument.endswith(".marker") and not os.path.exists(argument):
+        pathlib.Path(argument).touch()
+        raise ValueError("The first attempt failed")
+
+    return argument.upper()
+
+
+def test_run_task(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    """Test that a task sends its result, or its error, through the pipe to the parent
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Patches exiting and sleeping, which the task does (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    marker_path = str(tmp_path / "retry.marker")
+    messages = []
+
+    for argument in ["exception", marker_path, marker_path]:
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        run_task(run_flaky_task, argument, writer)
+        messages.append(reader.recv())
+
+    assert [kind for kind, _ in messages] == ["exception", "exception", "result"]
+    assert messages[0][1]["message"] == "The task failed"
+    assert messages[2][1] == marker_path.upper()
+
+    # The crashing and stalling tasks run in the worker processes of the other tests
+    monkeypatch.setattr(os, "_exit", lambda code: None)
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    assert [run_flaky_task(argument) for argument in ["crash", "timeout"]] == ["CRASH", "TIMEOUT"]
+
+
+def test_task_runner(tmp_path: pathlib.Path) -> None:
+    """Test that each kind of failure is reported for its task alone, and retried by the policy
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    marker_path = str(tmp_path / "retry.marker")
+    runner = TaskRunner(run_flaky_task, processes=2, timeout=2, retries=1)
+    results = dict(runner.run(["a", "exception", "crash", "timeout", marker_path]))
+
+    assert results == {"a": "A", marker_path: marker_path.upper()}
+    assert {argument: failure["kind"] for argument, failure in runner.failures.items()} == {
+        "exception": "exception", "crash": "crash", "timeout": "timeout"}
+    assert runner.failures["exception"]["error_type"] == "ValueError"
+    assert "raise ValueError" in runner.failures["exception"]["traceback"]
+    assert runner.failures["crash"]["message"].endswith("code 3")
+    assert runner.failures["timeout"]["attempts"] == 2
+    assert runner.failures["timeout"]["wall_seconds"] >= 2
+    assert all(receive_seconds >= 0 for _, receive_seconds in runner.receive_times.values())
+    assert set(results) <= set(runner.receive_times)
+
+
+def test_task_runner_stopped_early() -> None:
+    """Test that the tasks still running are stopped when the results are no longer consumed
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    runner = TaskRunner(run_flaky_task, processes=2)
+    results = runner.run(["a", "timeout"])
+
+    assert next(results) == ("a", "A")
+
+    processes = [task["process"] for task in runner.running.values()]
+    results.close()
+
+    assert not runner.running
+    assert [process.is_alive() for process in processes] == [False]
+
+
+def test_series_with_failed_saves(tmp_path: pathlib.Path) -> None:
+    """Test that a series leaves out the saves that fail to load and reports why
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    document = save_paths[2].read_bytes()
+    save_paths[2].unlink()
+
+    # Two truncated copies of a save share their probed size, but cannot be compared
+    for index in [3, 4]:
+        (tmp_path / f"synthetic {index}.rws.gz").write_bytes(gzip.compress(document)[:100])
+
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant"], retries=1)
+
+    assert sorted(series.dictionary) == ["synthetic 1.rws", "synthetic 2.rws"]
+    assert sorted(series.errors) == ["synthetic 3.rws.gz", "synthetic 4.rws.gz"]
+    assert series.errors["synthetic 3.rws.gz"]["kind"] == "exception"
+    assert series.errors["synthetic 3.rws.gz"]["error_type"] == "EOFError"
+    assert series.errors["synthetic 3.rws.gz"]["attempts"] == 2
+    assert len(series.tick_index) == 2
+
+    # A save written again in full loads once the series ingests it
+    (tmp_path / "synthetic 3.rws.gz").write_bytes(gzip.compress(document))
+    series.ingest([tmp_path / "synthetic 3.rws.gz"])
+
+    assert list(series.errors) == ["synthetic 4.rws.gz"]
+    assert len(series.tick_index) == 3
+
+    # Tasks sent to spawned worker processes only carry the paths of the saves
+    assert pickle.loads(pickle.dumps(series)).dictionary == {
+        save_base_name: {"path": save_file_data["path"]}
+        for save_base_name, save_file_data in series.dictionary.items()
+    }
@@ -0,0 +1,274 @@
+"""Test watching the saves directory and ingesting new or rewritten saves into a live SaveSeries"""
+
+import os
+import pathlib
+import shutil
+import struct
+import threading
+import time
+
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.watch import INOTIFY_AVAILABLE, INOTIFY_EVENT_FORMAT, IN_Q_OVERFLOW, InotifyBackend
+from save.watch import PollingBackend, SaveWatcher, get_watch_backend
+
+
+def poll_until_ingested(watcher: SaveWatcher, timeout: float = 10.0) -> list:
+    """Poll the watcher until it ingests saves or the timeout passes
+
+    Parameters:
+    watcher (SaveWatcher): The watcher to poll
+    timeout (float): The maximum number of seconds to wait
+
+    Returns:
+    list: The base names of the ingested saves
+    """
+    deadline = time.monotonic() + timeout
+    save_base_names = []
+
+    while not save_base_names and time.monotonic() < deadline:
+        save_base_names = watcher.poll(timeout=0.5)
+
+    return save_base_names
+
+
+@pytest.mark.parametrize("backend", ["inotify", "polling"])
+def test_save_watcher(backend: str, tmp_path: pathlib.Path) -> None:
+    """Test that new and rewritten saves are ingested and the subscribers notified
+
+    Parameters:
+    backend (str): The name of the watch backend
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    staging_path = tmp_path / "staging"
+    save_dir_path = tmp_path / "saves"
+    staging_path.mkdir()
+    save_dir_path.mkdir()
+    staged_paths = synthetic.write_series(staging_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                          file_name_format="synthetic {}.rws")
+    shutil.copy(staged_paths[0], save_dir_path)
+    series = SaveSeries(save_dir_path, r"synthetic\s\d{1,10}", datasets=["plant", "weather"])
+    watcher = SaveWatcher(series, backend=backend, settle_seconds=0)
+    notifications = []
+    watcher.subscribe(lambda notified_series, names: notifications.append(names))
+
+    # Files outside the series are ignored, while a new save is appended to the series
+    (save_dir_path / "other.rws").write_text("<savegame />", encoding="utf_8")
+    shutil.copy(staged_paths[1], save_dir_path)
+
+    assert poll_until_ingested(watcher) == ["synthetic 2.rws"]
+    assert notifications == [["synthetic 2.rws"]]
+    assert series.data.plant["time_ticks"].nunique() == 2
+
+    # A rewritten save replaces the save of the same name
+    shutil.copy(staged_paths[2], save_dir_path / "synthetic 1.rws")
+
+    assert poll_until_ingested(watcher) == ["synthetic 1.rws"]
+    assert len(series.dictionary) == 2
+    assert series.data.weather["time_ticks"].nunique() == 2
+    assert series.latest_save.data.file_base_name == "synthetic 1.rws"
+    watcher.stop()
+
+
+def test_save_watcher_thread(tmp_path: pathlib.Path) -> None:
+    """Test ingesting saves in the background thread until the watcher is stopped
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    save_paths[1].rename(tmp_path / "staged.xml")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["weather"])
+    watcher = SaveWatcher(series)
+    ingested = threading.Event()
+    watcher.subscribe(lambda notified_series, names: ingested.set())
+    watcher.start(timeout=0.1)
+
+    # Moving a complete save into the directory is detected as well
+    (tmp_path / "staged.xml").rename(save_paths[1])
+
+    assert ingested.wait(timeout=30)
+    watcher.stop()
+    assert watcher.thread is None
+    assert len(series.data.weather.index) == 2
+
+
+def test_save_watcher_failed_batch(monkeypatch: pytest.MonkeyPatch,
+                                   tmp_path: pathlib.Path) -> None:
+    """Test that the thread keeps watching after a batch fails to ingest, recording its error
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Makes ingesting the first batch fail (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 3, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+
+    for save_path in save_paths[1:]:
+        save_path.rename(save_path.with_suffix(".xml"))
+
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["weather"])
+    ingest = series.ingest
+
+    def ingest_after_failure(paths: list) -> list:
+        """Fail to ingest the first batch, then ingest the saves of each batch
+
+        Parameters:
+        paths (list): The paths of the saves of the batch
+
+        Returns:
+        list: The base names of the ingested saves
+        """
+        if not series.errors:
+            raise OSError("The batch failed")
+
+        return ingest(paths)
+
+    monkeypatch.setattr(series, "ingest", ingest_after_failure)
+    watcher = SaveWatcher(series, backend="polling", settle_seconds=0)
+    ingested = threading.Event()
+    watcher.subscribe(lambda notified_series, names: ingested.set())
+    watcher.start(timeout=0.1)
+    save_paths[1].with_suffix(".xml").rename(save_paths[1])
+
+    while not series.errors:
+        time.sleep(0.1)
+
+    save_paths[2].with_suffix(".xml").rename(save_paths[2])
+
+    assert ingested.wait(timeout=30)
+    watcher.stop()
+
+    with watcher.lock:
+        assert list(series.errors) == ["synthetic 2.rws"]
+        assert series.errors["synthetic 2.rws"]["message"] == "The batch failed"
+        assert sorted(series.dictionary) == ["synthetic 1.rws", "synthetic 3.rws"]
+        assert len(series.data.weather.index) == 2
+
+
+def test_save_watcher_failed_rewrite(monkeypatch: pytest.MonkeyPatch,
+                                     tmp_path: pathlib.Path) -> None:
+    """Test that a rewritten save that fails to ingest keeps its earlier snapshot in the series
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Makes loading the saves of a batch raise (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant", "weather"])
+    watcher = SaveWatcher(series, backend="polling", settle_seconds=0)
+    weather = series.data.weather.copy()
+    plant_history_size = series.get_plant_history().nbytes
+
+    def assert_unchanged() -> None:
+        """Assert that the series still holds both earlier snapshots
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        assert sorted(series.dictionary) == ["synthetic 1.rws", "synthetic 2.rws"]
+        assert series.latest_save.data.file_base_name == "synthetic 2.rws"
+        assert len(series.tick_index) == 2
+        assert series.get_plant_history().nbytes == plant_history_size
+        pandas.testing.assert_frame_equal(series.data.weather, weather)
+
+    # A save that fails to load on its own is recorded and the rest of the batch is ingested
+    save_paths[1].write_text("<savegame>", encoding="utf_8")
+
+    assert poll_until_ingested(watcher) == ["synthetic 2.rws"]
+    assert series.errors["synthetic 2.rws"]["kind"] == "exception"
+    assert_unchanged()
+
+    # A batch that fails to ingest as a whole leaves the series as it was
+    monkeypatch.setattr(series, "load_save_data", lambda save_base_names: 1 / 0)
+    save_paths[1].write_text("<savegame />", encoding="utf_8")
+
+    assert not poll_until_ingested(watcher, timeout=2)
+    assert series.errors["synthetic 2.rws"]["error_type"] == "ZeroDivisionError"
+    assert_unchanged()
+    watcher.stop()
+
+
+def test_polling_backend_settle(tmp_path: pathlib.Path) -> None:
+    """Test that a file is only reported once it stops changing, and only once per change
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_path = tmp_path / "autosave 1.rws"
+    backend = PollingBackend(tmp_path, settle_seconds=0)
+    save_path.write_bytes(b"<savegame>")
+
+    assert not backend.scan()
+
+    with open(save_path, "ab") as save_file:
+        save_file.write(b"</savegame>")
+
+    assert not backend.scan()
+    assert backend.scan() == [save_path]
+    assert not backend.poll(timeout=0.3)
+    backend.close()
+
+
+def test_get_watch_backend(tmp_path: pathlib.Path) -> None:
+    """Test selecting the watch backend and the error raised for a missing directory
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    backend = get_watch_backend(tmp_path)
+
+    assert backend.name == ("inotify" if INOTIFY_AVAILABLE else "polling")
+    backend.close()
+
+    with pytest.raises(OSError):
+        InotifyBackend(tmp_path / "missing")
+
+
+@pytest.mark.skipif(not INOTIFY_AVAILABLE, reason="inotify is only available on Linux")
+def test_inotify_backend_overflow(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    """Test that every file of the directory is reported when the inotify event queue overflows
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Replaces the events read with an overflow event (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    backend = InotifyBackend(tmp_path)
+    (tmp_path / "autosave 2.rws").write_bytes(b"<savegame />")
+    (tmp_path / "autosave 1.rws").write_bytes(b"<savegame />")
+    (tmp_path / "saves").mkdir()
+    monkeypatch.setattr(os, "read", lambda file_descriptor, size: struct.pack(
+        INOTIFY_EVENT_FORMAT, -1, IN_Q_OVERFLOW, 0, 0))
+
+    assert backend.poll(timeout=1) == [tmp_path / "autosave 1.rws", tmp_path / "autosave 2.rws"]
+    monkeypatch.undo()
+    backend.close()
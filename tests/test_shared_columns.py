@@ -0,0 +1,222 @@
+"""Test moving the extracted columns of saves from worker processes through shared memory"""
+
+import multiprocessing.shared_memory
+import os
+import pathlib
+import pickle
+import time
+
+import numpy
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import INTERNED_COLUMNS
+from save import Save
+from save import SaveSeries
+from save.tasks import CURRENT_TASK, TaskRunner, run_task
+from save.transport import SharedColumns, release_task_segments
+
+
+def share_and_fail(argument: tuple) -> SharedColumns:
+    """Write columns to shared memory, record the segment's name, then fail in the given way
+
+    Parameters:
+    argument (tuple): The kind of failure, or "result" to succeed, and the path to record the name
+
+    Returns:
+    SharedColumns: The columns, if the task succeeds
+    """
+    kind, path = argument
+    shared_columns = SharedColumns({"weather": {"weather_current": ["Clear"]}})
+    pathlib.Path(path).write_text(shared_columns.segment_name, encoding="utf_8")
+
+    if kind == "exception":
+        raise ValueError("The task failed")
+
+    if kind == "crash":
+        os._exit(3)
+
+    if kind == "timeout":
+        time.sleep(60)
+
+    return shared_columns
+
+
+def test_shared_columns_round_trip() -> None:
+    """Test that the columns read in the parent match those written by the worker
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    dataset_columns = {
+        "pawn": {
+            "pawn_id": ["Thing_Human1", "Thing_Human2", None],
+            "pawn_name_first": ["Sören", "", "Zoë 🌱"],
+            "pawn_name_nick": [None, "Ana", None],
+            "pawn_title": [None, None, None],
+        },
+        "weather": {"weather_current": [], "weather_last": []},
+    }
+    interned_columns = {"pawn": ["pawn_id", "pawn_title"], "weather": ["weather_current"]}
+    shared_columns = pickle.loads(pickle.dumps(SharedColumns(dataset_columns, interned_columns)))
+    segment_name = shared_columns.segment_name
+
+    assert len(shared_columns) == 2
+    assert shared_columns.get_row_count("pawn") == 3
+    assert shared_columns.is_interned("pawn", "pawn_id")
+    assert not shared_columns.is_interned("pawn", "pawn_name_first")
+    assert shared_columns.read_codes("pawn", "pawn_id")[1].tolist() == [0, 1, -1]
+    assert {
+        dataset_name: {column_name: list(values) for column_name, values in columns.items()}
+        for dataset_name, columns in shared_columns.items()
+    } == dataset_columns
+
+    # Numeric columns are stored as typed arrays, with the missing values masked
+    numeric_columns = pickle.loads(pickle.dumps(SharedColumns(
+        {"plant": {"plant_growth": ["0.25", None, "1"], "plant_age": [None, "2500", "60000"]}},
+        numeric_columns={"plant": {"plant_growth": "float64", "plant_age": "int64"}})))
+    plant_columns = numeric_columns["plant"]
+
+    assert plant_columns["plant_growth"].dtype == numpy.float64
+    assert plant_columns["plant_growth"].tolist() == [0.25, None, 1.0]
+    assert plant_columns["plant_age"].dtype == numpy.int64
+    assert plant_columns["plant_age"].tolist() == [None, 2500, 60000]
+
+    # The segment is freed once the parent no longer references the columns
+    del shared_columns
+
+    with pytest.raises(FileNotFoundError):
+        multiprocessing.shared_memory.SharedMemory(name=segment_name)
+
+
+def test_shared_columns_series(test_data_directory: pathlib.Path,
+                               test_save_file_regex: str) -> None:
+    """Test that the series and save DataFrames built from shared memory match concatenation
+
+    Parameters:
+    test_data_directory (pathlib.Path): The directory containing test input data (fixture)
+    test_save_file_regex (str): The regex pattern matching the test input data files (fixture)
+
+    Returns:
+    None
+    """
+    series = SaveSeries(test_data_directory, test_save_file_regex)
+    standalone_saves = [Save(entry["path"]) for entry in series.dictionary.values()]
+
+    snapshots = series.get_snapshots(0, len(series.tick_index))
+
+    # The interned columns of the series are categorical, but hold the same values, and the mod
+    # rows also hold the version of their mod list
+    for dataset_name in ["mod", "pawn", "plant", "weather"]:
+        series_dataframe = snapshots[dataset_name].astype(
+            {column_name: object for column_name in INTERNED_COLUMNS.get(dataset_name, [])})\
+            .drop(columns=["mod_list_version"], errors="ignore")
+        pandas.testing.assert_frame_equal(series_dataframe, pandas.concat(
+            [save.data[dataset_name] for save in standalone_saves]))
+
+    assert str(series.data.plant["plant_growth"].dtype) == "float64"
+    assert str(series.data.plant["plant_age"].dtype) == "Int64"
+
+    # Each save still generates its own DataFrames from its shared columns on first access
+    for entry, standalone_save in zip(series.dictionary.values(), standalone_saves):
+        pandas.testing.assert_frame_equal(entry["save"].data.plant, standalone_save.data.plant)
+
+    # Aggregating again reads the shared columns again
+    plant_dataframe = series.data.plant
+    series.aggregate_dataframes()
+    pandas.testing.assert_frame_equal(series.data.plant, plant_dataframe)
+
+
+def test_shared_columns_read_before_aggregation(tmp_path: pathlib.Path) -> None:
+    """Test that a series aggregates the saves whose DataFrames were generated after loading
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    save_paths[1].rename(tmp_path / "staged.xml")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant", "weather"])
+    (tmp_path / "staged.xml").rename(save_paths[1])
+    series.dictionary["synthetic 2.rws"] = {"path": save_paths[1]}
+
+    # Reading a save's DataFrames as it is yielded keeps the columns the series aggregates
+    for save in series.iter_saves(["synthetic 2.rws"]):
+        plant_dataframe = save.data.plant.copy()
+        series.dictionary[save.data.file_base_name]["save"] = save
+
+    series.aggregate_dataframes()
+
+    assert series.tick_index.offsets["plant"][-1] == len(series.data.plant.index)
+    pandas.testing.assert_frame_equal(series.get_snapshots(1, 2)["plant"].astype(
+        {column_name: object for column_name in INTERNED_COLUMNS["plant"]}), plant_dataframe)
+    pandas.testing.assert_frame_equal(series.latest_save.data.plant, plant_dataframe)
+
+
+def test_shared_columns_failed_tasks(monkeypatch: pytest.MonkeyPatch,
+                                     tmp_path: pathlib.Path) -> None:
+    """Test that the segments of tasks that failed, or were stopped, are freed by the parent
+
+    Parameters:
+    monkeypatch (pytest.MonkeyPatch): Patches exiting and sleeping, which the task does (fixture)
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    arguments = [(kind, str(tmp_path / kind)) for kind in ["exception", "crash", "timeout"]]
+    runner = TaskRunner(share_and_fail, processes=3, timeout=2, cleanup=release_task_segments)
+
+    assert not list(runner.run(arguments))
+    assert sorted(runner.failures) == sorted(arguments)
+
+    # The consumer stops once the first task succeeds, while the other holds its segment
+    stopped_arguments = [("result", str(tmp_path / "result")), ("timeout", str(tmp_path / "stop"))]
+    results = TaskRunner(share_and_fail, processes=2, cleanup=release_task_segments) \
+        .run(stopped_arguments)
+
+    assert list(next(results)[1]["weather"]["weather_current"]) == ["Clear"]
+
+    # Wait for the stalled task to write its segment
+    while True:
+        time.sleep(0.1)
+
+        if (tmp_path / "stop").exists():
+            break
+
+    results.close()
+
+    for _, path in arguments + stopped_arguments[1:]:
+        with pytest.raises(FileNotFoundError):
+            multiprocessing.shared_memory.SharedMemory(
+                name=pathlib.Path(path).read_text(encoding="utf_8"))
+
+    # A task run in this process names its segment after its ID, so that it can be freed by it
+    monkeypatch.setitem(CURRENT_TASK, "task_id", None)
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    run_task(share_and_fail, ("exception", str(tmp_path / "exception")), writer, "test")
+
+    assert reader.recv()[0] == "exception"
+    assert (tmp_path / "exception").read_text(encoding="utf_8") == "rimhistory_test_0"
+
+    release_task_segments("test")
+
+    with pytest.raises(FileNotFoundError):
+        multiprocessing.shared_memory.SharedMemory(name="rimhistory_test_0")
+
+    # The crashing and stalling tasks run in the worker processes above
+    monkeypatch.setitem(CURRENT_TASK, "task_id", None)
+    monkeypatch.setattr(os, "_exit", lambda code: None)
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    for kind in ["crash", "timeout"]:
+        shared_columns = share_and_fail((kind, str(tmp_path / kind)))
+
+        assert list(shared_columns["weather"]["weather_current"]) == ["Clear"]
@@ -0,0 +1,64 @@
+"""Test the synthetic save generator used for benchmarks and scale tests"""
+
+import logging
+import pathlib
+
+import pytest
+
+from benchmarks import synthetic
+from save import Save
+from save import SaveSeries
+
+
+def test_synthetic_save_is_deterministic() -> None:
+    """Test that the same scale and seed always generate the same save
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    scale = synthetic.SCALE_PRESETS["tiny"]
+    first_xml = synthetic.SyntheticColony(scale=scale, seed=7).get_save_xml()
+
+    assert first_xml == synthetic.SyntheticColony(scale=scale, seed=7).get_save_xml()
+    assert first_xml != synthetic.SyntheticColony(scale=scale, seed=8).get_save_xml()
+
+
+@pytest.mark.parametrize("file_extension", [".rws", ".rws.gz"])
+def test_synthetic_save_series(file_extension: str, tmp_path: pathlib.Path) -> None:
+    """Test loading a synthetic series of saves with the Save and SaveSeries classes
+
+    Parameters:
+    file_extension (str): The file extension of the save files, which controls compression
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    scale = {**synthetic.SCALE_PRESETS["tiny"], "map_count": 2, "plant_count": 301}
+    save_paths = synthetic.write_series(save_dir_path=tmp_path, series_length=3, scale=scale,
+                                        file_name_format="synthetic {}" + file_extension)
+    saves = [Save(path_to_save_file=save_path) for save_path in save_paths]
+    logging.debug("Synthetic plant data =\n%s", saves[0].data.plant.head())
+
+    for save in saves:
+        assert len(save.data.plant.index) == scale["plant_count"]
+        assert len(save.data.mod.index) == scale["mod_count"]
+        assert set(save.data.plant["plant_map_id"]) == {"0", "1"}
+        assert save.data.pawn["pawn_id"].str.startswith("Thing_Android").all()
+
+    # The saves are in chronological order and tales accumulate as time passes
+    game_time_ticks = [save.data.game_time_ticks for save in saves]
+    assert game_time_ticks == sorted(game_time_ticks)
+    assert len(saves[0].data.pawn.index) < len(saves[-1].data.pawn.index)
+
+    # Most plants survive from one save to the next, keeping their IDs
+    first_plant_ids = set(saves[0].data.plant["plant_id"])
+    second_plant_ids = set(saves[1].data.plant["plant_id"])
+    assert 0.5 * len(first_plant_ids) < len(first_plant_ids & second_plant_ids) \
+        < len(first_plant_ids)
+
+    series = SaveSeries(save_dir_path=tmp_path, save_file_regex_pattern=r"synthetic\s\d")
+    assert len(series.data.plant.index) == 3 * scale["plant_count"]
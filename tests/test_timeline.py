@@ -0,0 +1,111 @@
+"""Test querying the snapshots of a series by in-game time"""
+
+import pathlib
+
+import numpy
+import pandas
+import pytest
+
+from benchmarks import synthetic
+from save import SaveSeries
+from save.timeline import TICKS_PER_DAY, TickIndex
+
+
+def test_tick_index() -> None:
+    """Test the binary searches of the tick index and the conversion of times to dates
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+    tick_index = TickIndex([100, 200, 200, 500], {"plant": [1, 2, 0, 3]}, game_start_ticks=50)
+
+    assert len(tick_index) == 4
+    assert tick_index.get_range(150, 500) == (1, 4)
+    assert tick_index.get_as_of(numpy.array([99, 100, 499])).tolist() == [-1, 0, 2]
+    assert [tick_index.get_nearest(ticks) for ticks in [0, 150, 151, 200, 351, 900]] == \
+        [0, 0, 2, 2, 3, 3]
+    assert tick_index.get_row_slice("plant", 1, 3) == slice(1, 3)
+    assert [rows.tolist() for rows in tick_index.get_rows("plant", numpy.array([0, 3, 0]))] == \
+        [[0, 3, 4, 5, 0], [1, 3, 1]]
+    assert tick_index.get_grid(200).tolist() == [150, 350]
+
+    dates = tick_index.get_game_dates([3_600_000 * 2 + 900_000 + 60_000 * 3 + 2500 * 5 - 50])
+
+    assert dates.to_dict("records") == [{"year": 5502, "quadrum": "Jugust", "day": 4, "hour": 5}]
+    assert tick_index.get_time_ticks(5502, "Jugust", 4, 5) == 8_292_450
+
+
+def test_series_time_queries(tmp_path: pathlib.Path) -> None:
+    """Test that time queries of a series match boolean masks over its rows
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 4, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+
+    # Name the saves against their in-game order, which the series follows instead
+    staged_paths = [save_path.rename(tmp_path / f"staged {index}.xml")
+                    for index, save_path in enumerate(save_paths)]
+
+    for save_path, staged_path in zip(save_paths, reversed(staged_paths)):
+        staged_path.rename(save_path)
+
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant", "weather"])
+    time_ticks = series.tick_index.time_ticks
+    plants = series.data.plant
+
+    assert list(series.dictionary) == [f"synthetic {index}.rws" for index in [4, 3, 2, 1]]
+    assert series.latest_save.data.file_base_name == "synthetic 1.rws"
+    assert plants["time_ticks"].is_monotonic_increasing
+    pandas.testing.assert_frame_equal(
+        series.between(time_ticks[1], time_ticks[2] + 1).plant,
+        plants[plants["time_ticks"].between(time_ticks[1], time_ticks[2] + 1)])
+    assert series.as_of(time_ticks[2] - 1).weather["time_ticks"].tolist() == [time_ticks[1]]
+    assert series.nearest(time_ticks[2] - 1).weather["time_ticks"].tolist() == [time_ticks[2]]
+
+    with pytest.raises(KeyError):
+        series.as_of(time_ticks[0] - 1)
+
+    # Each sample holds the latest snapshot as of its time, starting at the first midnight
+    samples = series.resample(TICKS_PER_DAY // 2).weather
+
+    assert (samples["sample_ticks"] + series.tick_index.game_start_ticks).mod(TICKS_PER_DAY // 2)\
+        .eq(0).all()
+    assert samples["time_ticks"].tolist() == \
+        time_ticks[series.tick_index.get_as_of(samples["sample_ticks"].to_numpy())].tolist()
+
+    for sample_ticks, rows in series.resample(TICKS_PER_DAY).plant.groupby("sample_ticks"):
+        pandas.testing.assert_frame_equal(rows.drop(columns="sample_ticks"),
+                                          series.as_of(sample_ticks).plant)
+
+
+def test_series_equal_ticks(tmp_path: pathlib.Path) -> None:
+    """Test that the queries of a single snapshot return one save of several of the same time
+
+    Parameters:
+    tmp_path (pathlib.Path): The path used to stage files needed for testing (fixture)
+
+    Returns:
+    None
+    """
+    save_paths = synthetic.write_series(tmp_path, 2, scale=synthetic.SCALE_PRESETS["tiny"],
+                                        file_name_format="synthetic {}.rws")
+    document = save_paths[1].read_text(encoding="utf_8")
+    (tmp_path / "synthetic 3.rws").write_text(
+        document.replace("<curWeatherAge>", "<curWeatherAge>1", 1), encoding="utf_8")
+    series = SaveSeries(tmp_path, r"synthetic\s\d{1,10}", datasets=["plant", "weather"])
+    time_ticks = series.tick_index.time_ticks
+    last_weather = series.get_snapshots(2, 3).weather
+
+    assert time_ticks[1] == time_ticks[2]
+
+    for snapshot in [series.as_of(time_ticks[2]), series.nearest(time_ticks[2] + 1)]:
+        pandas.testing.assert_frame_equal(snapshot.weather, last_weather)
+        assert len(snapshot.plant.index) == len(series.latest_save.data.plant.index)
@@ -0,0 +1,485 @@
+"""Serve the summary report and chart data of series of saves from a local HTTP server
+
+Each configured save directory is loaded once into a SaveSeries, which stays in memory while the
+server runs, so a request never parses a save. A watcher per series waits for new saves in a
+background thread and ingests them, parsing each save in the series' worker processes, while the
+series is locked against rendering. A batch of saves that fails to ingest is logged and listed in
+the errors of the series, and the watcher carries on.
+
+Rendered fragments, i.e. the report and each chart, are cached per series with an ETag until the
+series ingests saves, and viewers that request a fragment while it renders wait for the same render,
+so many viewers cause one render per fragment and change of the series. A viewer that already has
+the fragment gets a 304 Not Modified response by sending its ETag in If-None-Match.
+
+Routes:
+    /: The series and the URLs of their fragments, as JSON
+    /series/<name>/report: The summary report of the series, as HTML
+    /series/<name>/charts/<chart>: A chart of the report, as Plotly JSON
+"""
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import http
+import json
+import logging
+import urllib.parse
+
+from save import SaveSeries
+from save.datasets import APPROXIMATE_DATASET_NAMES
+from save.watch import SaveWatcher
+from view import summary_report
+
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+WATCH_TIMEOUT_SECONDS = 0.5
+
+
+def get_etag(body: bytes) -> str:
+    """Return the ETag of the body of a response
+
+    Parameters:
+    body (bytes): The body of the response
+
+    Returns:
+    str: The quoted hexadecimal BLAKE2b digest of the body
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def get_response(status: http.HTTPStatus, headers: dict = None, body: bytes = b"") -> bytes:
+    """Return an HTTP/1.1 response, which closes the connection
+
+    Parameters:
+    status (http.HTTPStatus): The status of the response
+    headers (dict): The headers of the response, other than the length of the body
+    body (bytes): The body of the response, which may be left out, e.g. for a HEAD request
+
+    Returns:
+    bytes: The status line, headers and body of the response
+    """
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+
+    for name, value in {**(headers or {}), "Connection": "close"}.items():
+        lines.append(f"{name}: {value}")
+
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def read_headers(reader: asyncio.StreamReader) -> dict:
+    """Read the headers of a request, up to the empty line before its body
+
+    Parameters:
+    reader (asyncio.StreamReader): The stream of the request, after its request line
+
+    Returns:
+    dict: The value of each header, keyed by its lower case name
+    """
+    headers = {}
+
+    while True:
+        line = await reader.readline()
+
+        if not line.strip():
+            return headers
+
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+def render_fragment(series: SaveSeries, fragment_name: str) -> tuple:
+    """Render the report or a chart of a series
+
+    Parameters:
+    series (SaveSeries): The series of saves
+    fragment_name (str): report, or the name of a chart in summary_report.CHARTS
+
+    Returns:
+    tuple: The content type and body of the fragment
+    """
+    if fragment_name == "report":
+        return HTML_CONTENT_TYPE, summary_report.render_summary_report(series).encode()
+
+    return JSON_CONTENT_TYPE, summary_report.CHARTS[fragment_name](series).to_json().encode()
+
+
+class FragmentCache:
+    """The rendered fragments of each series, with the generation of the series they show"""
+    def __init__(self) -> None:
+        """Initialize an empty FragmentCache object
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.fragments = {}
+        self.renders = {}
+        self.render_count = 0
+
+    async def get(self, key: tuple, generation: int, render: callable) -> dict:
+        """Return a fragment, rendering it unless it is cached or already rendering
+
+        Parameters:
+        key (tuple): The name of the series and of the fragment
+        generation (int): The number of times the series has ingested saves
+        render (callable): The coroutine function rendering the content type and body
+
+        Returns:
+        dict: The content type, body and ETag of the fragment
+        """
+        cached = self.fragments.get(key)
+
+        if cached is not None and cached["generation"] == generation:
+            return cached
+
+        if (key, generation) not in self.renders:
+            self.renders[(key, generation)] = asyncio.ensure_future(
+                self.render(key, generation, render))
+
+        # A viewer that disconnects must not cancel the render the other viewers wait for
+        return await asyncio.shield(self.renders[(key, generation)])
+
+    async def render(self, key: tuple, generation: int, render: callable) -> dict:
+        """Render a fragment and cache it
+
+        Parameters:
+        key (tuple): The name of the series and of the fragment
+        generation (int): The number of times the series has ingested saves
+        render (callable): The coroutine function rendering the content type and body
+
+        Returns:
+        dict: The content type, body and ETag of the fragment
+        """
+        self.render_count += 1
+
+        try:
+            content_type, body = await render()
+        finally:
+            del self.renders[(key, generation)]
+
+        self.fragments[key] = {
+            "generation": generation,
+            "content_type": content_type,
+            "body": body,
+            "etag": get_etag(body),
+        }
+
+        return self.fragments[key]
+
+
+class ReportServer:
+    """A local HTTP server of the reports of series of saves, kept up to date as they are written"""
+    def __init__(self, series_options: dict, host: str = "127.0.0.1", port: int = 8000,
+                 watch_options: dict = None) -> None:
+        """Initialize the ReportServer object, loading no series until it starts
+
+        Parameters:
+        series_options (dict): The keyword arguments of each SaveSeries, such as save_dir_path and
+            save_file_regex_pattern, keyed by the name of the series in the URLs
+        host (str): The address to listen on
+        port (int): The port to listen on, or 0 for any free port
+        watch_options (dict): The keyword arguments of each SaveWatcher, such as backend
+
+        Returns:
+        None
+        """
+        self.series_options = series_options
+        self.address = (host, port)
+        self.watch_options = watch_options or {}
+        self.states = {}
+        self.cache = FragmentCache()
+        self.server = None
+        self.stopped = asyncio.Event()
+
+    async def start(self) -> tuple:
+        """Load each series, then listen for requests and watch for new saves
+
+        Parameters:
+        None
+
+        Returns:
+        tuple: The host and port the server listens on
+        """
+        loop = asyncio.get_running_loop()
+        self.stopped.clear()
+
+        for name, options in self.series_options.items():
+            logging.info("Loading the series %s", name)
+            series = await loop.run_in_executor(None, functools.partial(SaveSeries, **options))
+            self.states[name] = {
+                "series": series,
+                "watcher": SaveWatcher(series, **self.watch_options),
+                "lock": asyncio.Lock(),
+                "generation": 0,
+            }
+
+        self.server = await asyncio.start_server(self.handle_connection, *self.address)
+
+        for name, state in self.states.items():
+            state["watch_task"] = asyncio.ensure_future(self.watch(name))
+
+        address = self.server.sockets[0].getsockname()[:2]
+        logging.info("Serving reports on http://%s:%d/", *address)
+
+        return address
+
+    async def stop(self) -> None:
+        """Stop listening for requests and watching for saves
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.stopped.set()
+        await asyncio.gather(*[state["watch_task"] for state in self.states.values()])
+        self.server.close()
+        await self.server.wait_closed()
+
+        for state in self.states.values():
+            state["watcher"].stop()
+
+    async def serve_forever(self) -> None:
+        """Start the server and serve requests until it is stopped
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        await self.start()
+        await self.stopped.wait()
+
+    async def watch(self, name: str) -> None:
+        """Ingest the saves written into the directory of a series until the server stops
+
+        Parameters:
+        name (str): The name of the series
+
+        Returns:
+        None
+        """
+        loop = asyncio.get_running_loop()
+        state = self.states[name]
+
+        while not self.stopped.is_set():
+            save_paths = await loop.run_in_executor(None, state["watcher"].get_save_paths,
+                                                    WATCH_TIMEOUT_SECONDS)
+
+            if not save_paths:
+                continue
+
+            async with state["lock"]:
+                try:
+                    await loop.run_in_executor(None, state["series"].ingest, save_paths)
+                except Exception as error:  # pylint: disable=broad-except
+                    state["watcher"].record_failure(save_paths, error)
+
+                state["generation"] += 1
+
+    async def get_fragment(self, name: str, fragment_name: str) -> dict:
+        """Return the report or a chart of a series, rendered in a thread once per generation
+
+        Parameters:
+        name (str): The name of the series
+        fragment_name (str): report, or the name of a chart in summary_report.CHARTS
+
+        Returns:
+        dict: The content type, body and ETag of the fragment
+        """
+        state = self.states[name]
+
+        async def render() -> tuple:
+            """Render the fragment while the series is not ingesting saves
+
+            Parameters:
+            None
+
+            Returns:
+            tuple: The content type and body of the fragment
+            """
+            async with state["lock"]:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, render_fragment, state["series"], fragment_name)
+
+        return await self.cache.get((name, fragment_name), state["generation"], render)
+
+    async def get_index(self) -> dict:
+        """Return the series served, with the number of saves and the URLs of each
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The saves, errors and fragment URLs of each series, keyed by its name
+        """
+        index = {}
+
+        for name, state in self.states.items():
+            # The series is read while it is not ingesting saves
+            async with state["lock"]:
+                index[name] = {
+                    "saves": len(state["series"].dictionary),
+                    "errors": sorted(state["series"].errors),
+                }
+
+            index[name].update({
+                "report": f"/series/{name}/report",
+                "charts": {chart: f"/series/{name}/charts/{chart}"
+                           for chart in summary_report.CHARTS},
+            })
+
+        return index
+
+    def get_route(self, segments: list) -> tuple:
+        """Return the series and fragment of the path of a request
+
+        Parameters:
+        segments (list): The non-empty segments of the path
+
+        Returns:
+        tuple: The name of the series and of the fragment, or None if the path is not a fragment
+        """
+        if len(segments) == 3 and segments[2] == "report":
+            fragment_name = "report"
+        elif len(segments) == 4 and segments[2] == "charts" \
+                and segments[3] in summary_report.CHARTS:
+            fragment_name = segments[3]
+        else:
+            return None
+
+        if segments[0] != "series" or segments[1] not in self.states:
+            return None
+
+        return segments[1], fragment_name
+
+    async def respond(self, request_line: bytes, headers: dict) -> bytes:
+        """Return the response to a request
+
+        Parameters:
+        request_line (bytes): The method, target and version of the request
+        headers (dict): The headers of the request, keyed by their lower case name
+
+        Returns:
+        bytes: The response
+        """
+        parts = request_line.decode("latin-1").split()
+
+        if len(parts) != 3:
+            return get_response(http.HTTPStatus.BAD_REQUEST)
+
+        method, target, _ = parts
+
+        if method not in ("GET", "HEAD"):
+            return get_response(http.HTTPStatus.METHOD_NOT_ALLOWED, {"Allow": "GET, HEAD"})
+
+        segments = [segment for segment in urllib.parse.urlsplit(target).path.split("/") if segment]
+        route = self.get_route(segments)
+
+        if segments and route is None:
+            return get_response(http.HTTPStatus.NOT_FOUND)
+
+        if route is None:
+            body = json.dumps(await self.get_index()).encode()
+            fragment = {"content_type": JSON_CONTENT_TYPE, "body": body, "etag": get_etag(body)}
+        else:
+            fragment = await self.get_fragment(*route)
+
+        response_headers = {"ETag": fragment["etag"], "Cache-Control": "no-cache"}
+
+        if headers.get("if-none-match") == fragment["etag"]:
+            return get_response(http.HTTPStatus.NOT_MODIFIED, response_headers)
+
+        response_headers.update({"Content-Type": fragment["content_type"],
+                                 "Content-Length": len(fragment["body"])})
+
+        return get_response(http.HTTPStatus.OK, response_headers,
+                            fragment["body"] if method == "GET" else b"")
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Read a request from a connection, send the response and close the connection
+
+        Parameters:
+        reader (asyncio.StreamReader): The stream of the request
+        writer (asyncio.StreamWriter): The stream of the response
+
+        Returns:
+        None
+        """
+        request_line = b""
+
+        try:
+            request_line = await reader.readline()
+            headers = await read_headers(reader)
+            writer.write(await self.respond(request_line, headers))
+            await writer.drain()
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Failed to respond to %r", request_line)
+            writer.write(get_response(http.HTTPStatus.INTERNAL_SERVER_ERROR))
+        finally:
+            writer.close()
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    """Return the parser of the command line arguments of the server
+
+    Parameters:
+    None
+
+    Returns:
+    argparse.ArgumentParser: The argument parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m view.server",
+        description="Serve the summary report and charts of series of RimWorld saves")
+    parser.add_argument("--series", nargs=3, action="append", required=True,
+                        metavar=("NAME", "DIRECTORY", "REGEX"),
+                        help="A series of saves to serve, which may be given more than once")
+    parser.add_argument("--host", default="127.0.0.1", help="The address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="The port to listen on")
+    parser.add_argument("--watch-backend", default="auto", choices=["auto", "inotify", "polling"],
+                        help="How to detect new saves")
+    parser.add_argument("--approximate", action="store_true",
+                        help="Keep counts and a sample of the plants instead of every plant row")
+
+    return parser
+
+
+def main(arguments: list = None) -> int:
+    """Serve the series given on the command line until interrupted
+
+    Parameters:
+    arguments (list): The command line arguments, or None to read them from sys.argv
+
+    Returns:
+    int: The exit status
+    """
+    options = get_argument_parser().parse_args(arguments)
+    server = ReportServer(
+        series_options={
+            name: {"save_dir_path": directory, "save_file_regex_pattern": regex,
+                   "datasets": APPROXIMATE_DATASET_NAMES if options.approximate else None}
+            for name, directory, regex in options.series
+        },
+        host=options.host,
+        port=options.port,
+        watch_options={"backend": options.watch_backend},
+    )
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logging.info("Stopped serving reports")
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -5,10 +5,16 @@ import pathlib
 import dominate
 from dominate.util import raw
 from dominate.tags import attr, div, h1, h2, h3, li, link, p, ul
-import pandas
-import plotly.express
 
 from save import SaveSeries
+from save.datasets import APPROXIMATE_DATASET_NAMES
+from save.lazy_import import lazy_import
+from save.sketch import get_quantile_error
+
+# Charting and DataFrame libraries are only imported once a report is actually rendered
+pandas = lazy_import("pandas")
+plotly_express = lazy_import("plotly.express")
+plotly_graph_objects = lazy_import("plotly.graph_objects")
 
 
 def get_environment_section(series: SaveSeries) -> None:
@@ -41,7 +47,7 @@ def get_environment_section(series: SaveSeries) -> None:
             li(raw(pawn_temperature_string))
 
 
-def get_histogram_html(df: pandas.core.frame.DataFrame, x_axis_field: str, labels: dict) -> str:
+def get_histogram_html(df: "pandas.core.frame.DataFrame", x_axis_field: str, labels: dict) -> str:
     """Return the HTML for a histogram chart
 
     Parameters:
@@ -52,28 +58,21 @@ def get_histogram_html(df: pandas.core.frame.DataFrame, x_axis_field: str, label
     Returns:
     str: A histogram chart HTML
     """
-    fig = plotly.express.histogram(df, x=x_axis_field, labels=labels)
+    fig = plotly_express.histogram(df, x=x_axis_field, labels=labels)
     fig.update_layout(bargap=0.05, yaxis_title_text="Count")
 
     return fig.to_html(full_html=False)
 
 
-def generate_summary_report(save_dir_path: pathlib.Path, file_regex_pattern: str,
-                            output_path: pathlib.Path) -> None:
-    """Generate an HTML report with a list of the installed mods found
+def render_summary_report(series: SaveSeries) -> str:
+    """Return the HTML of the summary report of a series
 
     Parameters:
-    save_dir_path (pathlib.Path): The directory where the series of RimWorld save files is stored
-    file_regex_pattern (str): The regex pattern used to select a set of matching RimWorld save files
-    output_path (pathlib.Path): The file path where the report should be created
+    series (SaveSeries): The series of saves to report on
 
     Returns:
-    None
+    str: The HTML document of the report
     """
-    series = SaveSeries(
-        save_dir_path=save_dir_path,
-        save_file_regex_pattern=file_regex_pattern
-    )
     save = series.latest_save
     doc = dominate.document(title='RimWorld Save Game Summary Report')
     current_pawn_df = save.data.pawn.query("(current_record == True) and \
@@ -109,11 +108,131 @@ def generate_summary_report(save_dir_path: pathlib.Path, file_regex_pattern: str
                 for _, pawn in current_pawn_df.iterrows():
                     li(f"{pawn['pawn_name_full']}, age {pawn['pawn_biological_age']}")
 
-            get_plant_section(series=series)
+            if "plant" in series.data:
+                get_plant_section(series=series)
+            else:
+                get_plant_sketch_section(series=series)
             get_environment_section(series=series)
 
+    return str(doc)
+
+
+def generate_summary_report(save_dir_path: pathlib.Path, file_regex_pattern: str,
+                            output_path: pathlib.Path, approximate: bool = False) -> None:
+    """Generate an HTML report with a list of the installed mods found
+
+    Parameters:
+    save_dir_path (pathlib.Path): The directory where the series of RimWorld save files is stored
+    file_regex_pattern (str): The regex pattern used to select a set of matching RimWorld save files
+    output_path (pathlib.Path): The file path where the report should be created
+    approximate (bool): Keep counts and a sample of the plants instead of every plant row, in
+        bounded memory, see save.sketch
+
+    Returns:
+    None
+    """
+    series = SaveSeries(
+        save_dir_path=save_dir_path,
+        save_file_regex_pattern=file_regex_pattern,
+        datasets=APPROXIMATE_DATASET_NAMES if approximate else None
+    )
+
     with open(output_path, "w", encoding="utf_8") as output_file:
-        output_file.write(str(doc))
+        output_file.write(render_summary_report(series))
+
+
+def get_plant_counts(series: SaveSeries) -> "pandas.core.frame.DataFrame":
+    """Return the number of plants of each species in each save, which is exact in either mode
+
+    Parameters:
+    series (SaveSeries): The SaveSeries object containing the plant data, or its plant counts
+
+    Returns:
+    pandas.core.frame.DataFrame: The time_ticks, plant_definition and plant_count of each species
+        in each save
+    """
+    if "plant" not in series.data:
+        return series.data.plant_species[["time_ticks", "plant_definition", "plant_count"]]
+
+    return series.data.plant[["time_ticks", "plant_definition", "plant_id"]]\
+        .groupby(["time_ticks", "plant_definition"], observed=True)\
+        .agg(plant_count=("plant_id", "count"))\
+        .reset_index()
+
+
+def get_plant_population_figure(series: SaveSeries) -> "plotly_graph_objects.Figure":
+    """Return the chart of the total plant population over time
+
+    Parameters:
+    series (SaveSeries): The SaveSeries object containing the plant data
+
+    Returns:
+    plotly.graph_objects.Figure: The line chart
+    """
+    plant_agg_df = get_plant_counts(series)\
+        .groupby(["time_ticks"])\
+        .agg({"plant_count": "sum"})
+
+    return plotly_express.line(
+        plant_agg_df,
+        title="Plant population over time",
+        markers=True,
+        labels={"time_ticks": "Time", "plant_count": "Plant population"}
+    )
+
+
+def get_plant_species_figure(series: SaveSeries) -> "plotly_graph_objects.Figure":
+    """Return the chart of the plant population of each species over time
+
+    Parameters:
+    series (SaveSeries): The SaveSeries object containing the plant data
+
+    Returns:
+    plotly.graph_objects.Figure: The line chart, with a line per species
+    """
+    return plotly_express.line(
+        get_plant_counts(series),
+        x="time_ticks",
+        y="plant_count",
+        title="Plant population by species over time",
+        markers=True,
+        color="plant_definition",
+        labels={"time_ticks": "Time", "plant_count": "Plant population"}
+    )
+
+
+def get_plant_lifecycle_figure(series: SaveSeries) -> "plotly_graph_objects.Figure":
+    """Return the chart of the plants spawned and removed between consecutive saves
+
+    Parameters:
+    series (SaveSeries): The SaveSeries object containing the plant data
+
+    Returns:
+    plotly.graph_objects.Figure: The line chart, with a line per event, or none if there was
+        no event or the series only keeps counts of the plants, which cannot tell plants apart
+    """
+    if "plant" not in series.data:
+        plant_lifecycle_df = pandas.DataFrame(columns=["time_ticks"]).set_index("time_ticks")
+    else:
+        plant_lifecycle_df = series.get_plant_lifecycle()\
+            .get_spawns_and_removals()\
+            .groupby(["time_ticks"])\
+            .sum()
+
+    return plotly_express.line(
+        plant_lifecycle_df,
+        title="Plant spawns and removals since the previous save",
+        markers=True,
+        labels={"time_ticks": "Time", "value": "Plants", "variable": "Event"}
+    )
+
+
+# The charts of the report, which can also be served on their own, keyed by their name
+CHARTS = {
+    "plant_population": get_plant_population_figure,
+    "plant_species": get_plant_species_figure,
+    "plant_lifecycle": get_plant_lifecycle_figure,
+}
 
 
 def get_plant_section(series: SaveSeries) -> None:
@@ -163,33 +282,50 @@ def get_plant_section(series: SaveSeries) -> None:
     p(raw(series_plant_df.tail().to_html()))
     p(raw(series_plant_df.describe().to_html()))
 
-    # Plant chart #1 - Total population
-    plant_agg_df = series_plant_df\
-        .groupby(["time_ticks"])\
-        .agg({"plant_id": "count"})
-    fig = plotly.express.line(
-        plant_agg_df,
-        title="Plant population over time",
-        markers=True,
-        labels={"time_ticks": "Time", "plant_id": "Plant population"}
-    )
-    raw(fig.to_html(full_html=False))
+    raw(get_plant_population_figure(series).to_html(full_html=False))
+    raw(get_plant_species_figure(series).to_html(full_html=False))
 
-    # Plant chart #2 - By species
-    plant_agg_by_species_df = series_plant_df[
-        ["time_ticks", "plant_definition", "plant_id"]
-    ]
-    plant_agg_by_species_df = plant_agg_by_species_df\
-        .groupby(["time_ticks", "plant_definition"])\
-        .agg({"plant_id": "count"})\
-        .reset_index()
-    fig = plotly.express.line(
-        plant_agg_by_species_df,
-        x="time_ticks",
-        y="plant_id",
-        title="Plant population by species over time",
-        markers=True,
-        color="plant_definition",
-        labels={"time_ticks": "Time", "plant_id": "Plant population"}
+    fig = get_plant_lifecycle_figure(series)
+
+    # The chart has no lines until plants spawn or are removed between saves
+    if fig.data:
+        raw(fig.to_html(full_html=False))
+
+
+def get_plant_sketch_section(series: SaveSeries) -> None:
+    """Build the plant section of the report from the plant counts and sample of approximate mode
+
+    Parameters:
+    series (SaveSeries): The SaveSeries object containing the plant sketch datasets
+
+    Returns:
+    None
+    """
+    save = series.latest_save
+    species_df = save.data.plant_species.sort_values("plant_count", ascending=False)
+    sample_df = save.data.plant_sample
+    plant_count = int(species_df["plant_count"].sum())
+    quantile_error = get_quantile_error(len(sample_df.index), plant_count)
+    h2(f"Plants ({plant_count})")
+    p(f"Approximate mode: the plant counts are exact, while the tables of plants describe a sample "
+      f"of {len(sample_df.index)} plants, whose quantiles are within {quantile_error:.1%} of their "
+      "rank among all plants with 95% confidence")
+
+    with ul():
+        for _, species in species_df.head(20).iterrows():
+            li(f"{species['plant_definition']} - {species['plant_count']}")
+
+    p(raw(sample_df.head().to_html()))
+    p(raw(sample_df.tail().to_html()))
+    p(raw(sample_df.describe().to_html()))
+    p(raw(species_df.set_index("plant_definition")[["plant_count"]].to_html()))
+    fig = plotly_express.bar(
+        save.data.plant_growth,
+        x="plant_growth_bin",
+        y="plant_count",
+        labels={"plant_growth_bin": "Plant growth (%)", "plant_count": "Count"}
     )
+    fig.update_layout(bargap=0.05)
     raw(fig.to_html(full_html=False))
+    raw(get_plant_population_figure(series).to_html(full_html=False))
+    raw(get_plant_species_figure(series).to_html(full_html=False))